@@ -1,16 +1,24 @@
 from fastapi import APIRouter
 
 from app.api.routes.health import router as health_router
+from app.api.routes.metrics import router as metrics_router
 from app.api.routes.auth import router as auth_router
 from app.api.routes.nutrition import router as nutrition_router
 from app.api.routes.exercise import router as exercise_router
 from app.api.routes.profile import router as profile_router
 from app.api.routes.weights import router as weights_router
+from app.api.routes.jobs import router as jobs_router
+from app.api.routes.batch import router as batch_router
+from app.api.routes.dashboard import router as dashboard_router
 
 api_router = APIRouter()
 api_router.include_router(health_router, tags=["health"])
+api_router.include_router(metrics_router, tags=["metrics"])
 api_router.include_router(auth_router, prefix="/auth", tags=["auth"])
 api_router.include_router(nutrition_router, tags=["nutrition"])
 api_router.include_router(exercise_router, prefix="/nutrition", tags=["exercises"])
 api_router.include_router(profile_router, tags=["profile"])
 api_router.include_router(weights_router, tags=["weights"])
+api_router.include_router(jobs_router, tags=["jobs"])
+api_router.include_router(dashboard_router, tags=["dashboard"])
+api_router.include_router(batch_router, tags=["batch"])
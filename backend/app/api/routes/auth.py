@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from datetime import timedelta
 
 from app.database import get_db
-from app.schemas.user import UserRegister, UserLogin, Token, UserResponse
-from app.services.user import create_user, get_user_by_username
-from app.services.auth import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.schemas.user import UserRegister, UserLogin, Token, UserResponse, RefreshTokenRequest
+from app.services.user import create_user, get_user_by_username, get_user_by_id
+from app.services.auth import (
+    verify_password_async,
+    get_password_hash_async,
+    password_needs_rehash,
+    create_access_token,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+)
+from app.services.refresh_tokens import issue_refresh_token, revoke_refresh_token, rotate_refresh_token
+from app.services.warmup import configured_warm_set, warm_user_views
 
 router = APIRouter()
 
+# Register and login are async so they can await bcrypt on the password hash
+# pool without holding a request thread; their DB work goes to the threadpool.
+
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     """Register a new user"""
     # Check if username already exists
-    existing_user = get_user_by_username(db, user_data.username)
+    existing_user = await run_in_threadpool(get_user_by_username, db, user_data.username)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -22,15 +34,20 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
         )
 
     # Create user
-    user = create_user(db, user_data)
+    hashed_password = await get_password_hash_async(user_data.password)
+    user = await run_in_threadpool(create_user, db, user_data, hashed_password)
     return user
 
 
 @router.post("/login", response_model=Token)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(
+    user_data: UserLogin,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
     """Login user and return JWT token"""
     # Get user
-    user = get_user_by_username(db, user_data.username)
+    user = await run_in_threadpool(get_user_by_username, db, user_data.username)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,17 +56,55 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
         )
 
     # Verify password (case-sensitive)
-    if not verify_password(user_data.password, user.hashed_password):
+    if not await verify_password_async(user_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Create access token
+    # Upgrade hashes made with a different work factor while we have the password
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash_async(user_data.password)
+
+    # Create access token, plus a refresh token so the session outlives it without bcrypt
+    user_id = user.id
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
+    refresh_token = await run_in_threadpool(issue_refresh_token, db, user_id)
+    await run_in_threadpool(db.commit)
+
+    # Warm the dashboard views once the token has been sent
+    warm_set = configured_warm_set()
+    if warm_set:
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+        background_tasks.add_task(warm_user_views, user_id, session_factory, warm_set)
+
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+@router.post("/refresh", response_model=Token)
+def refresh(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access token and a rotated refresh token"""
+    user_id, refresh_token = rotate_refresh_token(db, request.refresh_token)
+    user = get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    access_token = create_access_token(
+        data={"sub": user.username},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
 
-    return {"access_token": access_token, "token_type": "bearer"}
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Revoke a refresh token (and every token rotated from the same login)"""
+    revoke_refresh_token(db, request.refresh_token)
@@ -0,0 +1,174 @@
+"""``POST /batch``: several GETs answered in one round trip.
+
+The dashboard needs half a dozen independent reads on load. Sent one by one,
+each pays for a request through the whole middleware stack, a token decode
+and user lookup, and a pooled connection checkout. A batch authenticates
+once and hands the signed-in user to every sub-request's
+``get_current_user``, dispatches the sub-requests straight to the router
+(middleware already ran for the batch itself), and shares DB sessions
+between them through ``get_db``.
+
+Sub-requests run on ``BATCH_CONCURRENCY`` lanes at once. A SQLAlchemy
+session must not be used from two threads at the same time, so each lane
+runs its share of the items one after another on its own session: the first
+lane reuses the batch request's session and the others open one each on the
+same engine. With ``BATCH_CONCURRENCY=1`` the whole batch runs on a single
+session.
+
+Each item gets its own status code; one failing sub-request (404, 400, even
+a 500) does not fail the batch or the items after it on the same session. Sub-response bodies are spliced into the batch response
+as-is rather than parsed and encoded again.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import AsyncExitStack
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, Request, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.types import Message, Scope
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.user import User
+from app.schemas.batch import BatchItem, BatchRequest, BatchResponse
+from app.utils.request_context import BatchContext, current_batch
+from app.utils.serialization import dumps
+from app.api.routes.profile import get_current_user
+
+logger = logging.getLogger(__name__)
+
+BATCH_CONCURRENCY = max(1, int(os.getenv("BATCH_CONCURRENCY", "4")))
+
+# Per-request state of the batch itself that must not leak into sub-requests
+_BATCH_SCOPE_KEYS = (
+    "route",
+    "endpoint",
+    "path_params",
+    "fastapi_astack",
+    "fastapi_inner_astack",
+    "fastapi_function_astack",
+    "fastapi_middleware_astack",
+)
+
+router = APIRouter(tags=["batch"])
+
+
+class _Captured:
+    __slots__ = ("status", "content_type", "chunks")
+
+    def __init__(self):
+        self.status = 500
+        self.content_type = b""
+        self.chunks: list[bytes] = []
+
+
+def _error(status_code: int, detail: str) -> _Captured:
+    captured = _Captured()
+    captured.status = status_code
+    captured.content_type = b"application/json"
+    captured.chunks = [dumps({"detail": detail})]
+    return captured
+
+
+def _sub_scope(parent: Scope, item: BatchItem) -> Scope:
+    url = urlsplit(item.path)
+    scope = {key: value for key, value in parent.items() if key not in _BATCH_SCOPE_KEYS}
+    scope.update(
+        method=item.method,
+        path=url.path,
+        raw_path=url.path.encode(),
+        query_string=url.query.encode(),
+        # Only credentials carry over; the batch's own body headers do not apply
+        headers=[(name, value) for name, value in parent["headers"] if name == b"authorization"],
+    )
+    return scope
+
+
+async def _dispatch(request: Request, item: BatchItem) -> _Captured:
+    captured = _Captured()
+    delivered = False
+
+    async def receive() -> Message:
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Sub-requests are never disconnected; only streaming responses wait here
+        await asyncio.Future()
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            captured.status = message["status"]
+            for name, value in message.get("headers", []):
+                if name == b"content-type":
+                    captured.content_type = value
+        elif message["type"] == "http.response.body":
+            captured.chunks.append(message.get("body", b""))
+
+    scope = _sub_scope(request.scope, item)
+    try:
+        async with AsyncExitStack() as stack:
+            scope["fastapi_middleware_astack"] = stack
+            await request.app.router(scope, receive, send)
+    except StarletteHTTPException as exc:
+        # Raised by the router itself for unknown paths and methods
+        return _error(exc.status_code, exc.detail)
+    except Exception:
+        logger.exception("Batch sub-request GET %s failed", item.path)
+        return _error(500, "Internal Server Error")
+    return captured
+
+
+async def _run_lane(request: Request, items: list[tuple[int, BatchItem]], context: BatchContext, results: list):
+    current_batch.set(context)
+    for index, item in items:
+        results[index] = captured = await _dispatch(request, item)
+        if captured.status >= 500:
+            # A failed statement can leave the lane's session needing a rollback
+            # (an aborted transaction on PostgreSQL); the next item must not inherit it
+            await run_in_threadpool(context.db.rollback)
+
+
+def _encode(item: BatchItem, captured: _Captured) -> bytes:
+    body = b"".join(captured.chunks)
+    if not captured.content_type.startswith(b"application/json"):
+        body = dumps(body.decode("utf-8", "replace")) if body else b"null"
+    return b'{"id":%s,"status":%d,"body":%s}' % (dumps(item.id), captured.status, body or b"null")
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Run independent GET sub-requests as the current user and return every response"""
+    items = list(enumerate(batch.requests))
+    lanes = min(BATCH_CONCURRENCY, len(items))
+    sessions = [db] + [Session(bind=db.get_bind(), autoflush=False) for _ in range(lanes - 1)]
+    results: list = [None] * len(items)
+    try:
+        await asyncio.gather(
+            *(
+                _run_lane(
+                    request,
+                    items[lane::lanes],
+                    BatchContext(user if lane_db is db else lane_db.merge(user, load=False), lane_db),
+                    results,
+                )
+                for lane, lane_db in enumerate(sessions)
+            )
+        )
+    finally:
+        for lane_db in sessions[1:]:
+            await run_in_threadpool(lane_db.close)
+
+    content = b'{"responses":[' + b",".join(
+        _encode(item, captured) for item, captured in zip(batch.requests, results)
+    ) + b"]}"
+    return Response(content=content, media_type="application/json")
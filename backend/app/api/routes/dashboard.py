@@ -0,0 +1,26 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.user import User
+from app.schemas.dashboard import DashboardResponse
+from app.services.views import get_dashboard_view
+from app.utils.serialization import serialized
+from app.utils.time import pst_today
+from app.api.routes.profile import get_current_user
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("", response_model=DashboardResponse)
+@serialized(DashboardResponse)
+def get_dashboard(
+    target_date: Optional[date] = Query(default=None, alias="date"),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Daily summary, goals, weekly comparison and recent weights for one day (default today)"""
+    return get_dashboard_view(user, target_date or pst_today(), db)
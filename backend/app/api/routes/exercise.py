@@ -7,15 +7,23 @@ from app.models.exercise import ExerciseEntry
 from app.models.user import User
 from app.schemas.exercise import ExerciseEntryCreate, ExerciseEntryUpdate, ExerciseEntryResponse
 from app.services.auth import decode_token
+from app.services.invalidation import publish, user_day_topic
 from app.services.user import get_user_by_username
+from app.utils.request_context import current_batch
+from app.utils.server_timing import AUTH, timed_function
 
 router = APIRouter(prefix="/exercises", tags=["exercises"])
 
 
+@timed_function(AUTH)
 def get_current_user(
     authorization: Optional[str] = Header(None), db: Session = Depends(get_db)
 ) -> User:
     """Extract current user from Bearer token"""
+    batch = current_batch.get()
+    if batch is not None:
+        # Sub-request of POST /batch, which has already authenticated
+        return batch.user
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -64,6 +72,7 @@ def create_exercise_entry(
     db.add(db_exercise)
     db.commit()
     db.refresh(db_exercise)
+    publish(user_day_topic(user.id, db_exercise.date))
     return db_exercise
 
 
@@ -105,6 +114,7 @@ def update_exercise_entry(
 
     db.commit()
     db.refresh(db_exercise)
+    publish(user_day_topic(user.id, db_exercise.date))
     return db_exercise
 
 
@@ -123,6 +133,8 @@ def delete_exercise_entry(
     if not db_exercise:
         raise HTTPException(status_code=404, detail="Exercise entry not found")
 
+    exercise_date = db_exercise.date
     db.delete(db_exercise)
     db.commit()
+    publish(user_day_topic(user.id, exercise_date))
     return None
@@ -1,4 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.services.readiness import UNREADY, get_readiness
 
 router = APIRouter()
 
@@ -6,3 +11,14 @@ router = APIRouter()
 @router.get("/health")
 def health_check() -> dict:
     return {"status": "ok"}
+
+
+@router.get("/health/ready")
+def readiness_check(db: Session = Depends(get_db)) -> JSONResponse:
+    """Dependency probes: ready/degraded answer 200, unready (database down) 503"""
+    report = get_readiness().report(db)
+    return JSONResponse(
+        report,
+        status_code=503 if report["status"] == UNREADY else 200,
+        headers={"Cache-Control": "no-store"},
+    )
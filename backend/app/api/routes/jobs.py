@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import desc
+from sqlalchemy.orm import Session, defer
+
+from app.database import get_db
+from app.models.job import Job
+from app.models.user import User
+from app.schemas.job import JobResponse, JobSummary
+from app.api.routes.profile import get_current_user
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("", response_model=list[JobSummary])
+def list_jobs(
+    limit: int = Query(default=20, ge=1, le=100),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Most recent background jobs started by the current user.
+
+    Results (a whole data export, for one) are only returned by ``GET /jobs/{id}``.
+    """
+    return (
+        db.query(Job)
+        .options(defer(Job.result))
+        .filter(Job.user_id == user.id)
+        .order_by(desc(Job.id))
+        .limit(limit)
+        .all()
+    )
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: int,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Poll a background job; ``result`` is filled in once it has succeeded"""
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == user.id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    return job
@@ -0,0 +1,21 @@
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import Response
+
+from app.utils.metrics import CONTENT_TYPE, REGISTRY
+
+# When set, scrapers must send "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(authorization: Optional[str] = Header(None)) -> Response:
+    """Prometheus text exposition for this worker"""
+    if METRICS_TOKEN and not secrets.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
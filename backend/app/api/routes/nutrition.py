@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
 from sqlalchemy.orm import Session
 from datetime import date, datetime
 from typing import Optional
@@ -14,26 +14,50 @@ from app.schemas.food_entry import (
     UsdaFoodSearchResponse,
     UsdaFoodSearchResult,
     UsdaFoodCreate,
+    UsdaPrefetchRequest,
     UsdaFoodDetailsResponse,
     NutritionTotals,
+    MealType,
 )
 from app.schemas.custom_food import CustomFoodCreate, CustomFoodResponse
+from app.schemas.quick_food import QuickFoodResponse
+from app.schemas.job import JobResponse
 from app.models.food_entry import FoodItem, CalorieEntry
 from app.models.custom_food import CustomFood
 from app.models.user import User
-from app.services.nutrition import NutritionService
 from app.services.auth import decode_token
 from app.services.user import get_user_by_username
-from app.services.usda import UsdaService
+from app.services.usda import DEGRADABLE_STATUSES, USDA_PREFETCH_JOB, UsdaService
+from app.services.jobs import enqueue
+from app.services.views import SUMMARY_SECTIONS, get_daily_summary_view
+from app.services.quick_foods import get_quick_foods, record_food_use
+from app.services.invalidation import (
+    FOOD_ITEMS_TOPIC,
+    publish,
+    user_custom_foods_topic,
+    user_day_topic,
+)
+from app.utils.fieldsets import ALL_ITEMS, FieldSet, split_list
+from app.utils.serialization import Sparse, serialized
+from app.utils.request_context import current_batch
+from app.utils.server_timing import AUTH, timed_function
 from app.utils.time import pst_today
 
 router = APIRouter(prefix="/nutrition", tags=["nutrition"])
 
+# Nested parts of each summary entry that ``?include=`` can leave out
+ENTRY_DETAILS = {"food_item", "totals"}
+
 
+@timed_function(AUTH)
 def get_current_user(
     authorization: Optional[str] = Header(None), db: Session = Depends(get_db)
 ) -> User:
     """Extract current user from Bearer token for request auth."""
+    batch = current_batch.get()
+    if batch is not None:
+        # Sub-request of POST /batch, which has already authenticated
+        return batch.user
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,14 +91,36 @@ def get_current_user(
 
 
 @router.get("/daily", response_model=DailyNutritionSummary)
+@serialized(DailyNutritionSummary)
 def get_daily_nutrition(
     date_param: Optional[str] = Query(default=None, alias="date"),
+    fields: Optional[str] = Query(
+        default=None, description="Comma-separated fields to return, e.g. `goals,remaining.calories`"
+    ),
+    include: Optional[str] = Query(
+        default=None, description="Per-entry details to return: `food_item`, `totals` (default both)"
+    ),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     """Get daily nutrition summary for a user"""
     target_date = date.fromisoformat(date_param) if date_param else pst_today()
-    return NutritionService.calculate_daily_nutrition(user.id, target_date, db, user)
+    if fields is None and include is None:
+        return get_daily_summary_view(user, target_date, db)
+
+    selected = FieldSet(DailyNutritionSummary, fields)
+    details = split_list(include)
+    if details is not None and not set(details) <= ENTRY_DETAILS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"include must be a subset of: {', '.join(sorted(ENTRY_DETAILS))}",
+        )
+    summary = get_daily_summary_view(user, target_date, db, sections=selected.requested(SUMMARY_SECTIONS))
+    exclude = None
+    if details is not None and ENTRY_DETAILS - set(details):
+        left_out = {name: True for name in ENTRY_DETAILS - set(details)}
+        exclude = {"meals": {ALL_ITEMS: {"entries": {ALL_ITEMS: left_out}}}}
+    return Sparse(summary, include=selected.include, exclude=exclude)
 
 
 
@@ -102,8 +148,10 @@ def create_calorie_entry(
         date=entry_data.date or pst_today(),
     )
     db.add(entry)
+    record_food_use(db, user.id, entry_data.food_item_id, entry_data.meal_type)
     db.commit()
     db.refresh(entry)
+    publish(user_day_topic(user.id, entry.date))
     return entry
 
 
@@ -140,6 +188,7 @@ def update_calorie_entry(
 
     db.commit()
     db.refresh(entry)
+    publish(user_day_topic(user.id, entry.date))
     return entry
 
 
@@ -160,12 +209,15 @@ def delete_calorie_entry(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Calorie entry not found",
         )
+    entry_date = entry.date
     db.delete(entry)
     db.commit()
+    publish(user_day_topic(user.id, entry_date))
     return None
 
 
 @router.get("/food-items", response_model=list[FoodItemResponse])
+@serialized(list[FoodItemResponse])
 def get_food_items(db: Session = Depends(get_db)):
     """Get all available food items"""
     return db.query(FoodItem).all()
@@ -181,13 +233,30 @@ def create_food_item(
     db.add(food_item)
     db.commit()
     db.refresh(food_item)
+    publish(FOOD_ITEMS_TOPIC)
     return food_item
 
 
 @router.get("/usda/search", response_model=UsdaFoodSearchResponse)
-def search_usda_foods(query: str):
-    """Search USDA FoodData Central"""
-    data = UsdaService.search_foods(query=query)
+def search_usda_foods(query: str, db: Session = Depends(get_db)):
+    """Search USDA FoodData Central, falling back to imported foods while USDA is down"""
+    try:
+        data = UsdaService.search_foods(query=query)
+    except HTTPException as exc:
+        if exc.status_code not in DEGRADABLE_STATUSES:
+            raise
+        results = [
+            UsdaFoodSearchResult(
+                fdc_id=int(food_item.external_id),
+                description=food_item.name,
+                serving_size=food_item.serving_size_grams,
+                serving_size_unit="g",
+            )
+            for food_item in UsdaService.search_local(db, query)
+            if food_item.external_id and food_item.external_id.isdigit()
+        ]
+        return UsdaFoodSearchResponse(results=results, degraded=True)
+
     results = []
     for food in data.get("foods", []):
         results.append(
@@ -204,9 +273,30 @@ def search_usda_foods(query: str):
 
 
 @router.get("/usda/{fdc_id}/details", response_model=UsdaFoodDetailsResponse)
-def get_usda_food_details(fdc_id: int):
+def get_usda_food_details(fdc_id: int, db: Session = Depends(get_db)):
     """Get detailed nutritional information for a USDA food item (per 100g)"""
-    food = UsdaService.get_food(fdc_id)
+    try:
+        food = UsdaService.get_food(fdc_id)
+    except HTTPException as exc:
+        food_item = UsdaService.get_local_food(db, fdc_id) if exc.status_code in DEGRADABLE_STATUSES else None
+        if not food_item:
+            raise
+        return UsdaFoodDetailsResponse(
+            fdc_id=fdc_id,
+            description=food_item.name,
+            serving_size=100.0,
+            serving_size_unit="g",
+            nutrients_per_100g=NutritionTotals(
+                calories=food_item.calories,
+                protein_g=food_item.protein_g or 0,
+                carbs_g=food_item.carbs_g or 0,
+                fat_g=food_item.fat_g or 0,
+                fiber_g=food_item.fiber_g or 0,
+                sodium_mg=food_item.sodium_mg or 0,
+            ),
+            degraded=True,
+        )
+
     nutrients = UsdaService.extract_nutrients(food)
     serving_size_grams = UsdaService.get_serving_size_grams(food) or 100.0
     nutrients_per_100g = UsdaService.normalize_per_100g(nutrients, serving_size_grams)
@@ -235,54 +325,66 @@ def create_food_item_from_usda(
     db: Session = Depends(get_db),
 ):
     """Create a food item from USDA FoodData Central"""
-    existing = (
-        db.query(FoodItem)
-        .filter(
-            FoodItem.source == "usda",
-            FoodItem.external_id == str(food_data.fdc_id),
-        )
-        .first()
-    )
+    existing = UsdaService.get_local_food(db, food_data.fdc_id)
     if existing:
         return existing
 
-    food = UsdaService.get_food(food_data.fdc_id)
-    nutrients = UsdaService.extract_nutrients(food)
-    serving_size_grams = UsdaService.get_serving_size_grams(food) or 100.0
-    nutrients = UsdaService.normalize_per_100g(nutrients, serving_size_grams)
-
-    food_item = FoodItem(
-        name=food.get("description") or "USDA Food",
-        serving_size="100 g",
-        serving_size_grams=100.0,
-        source="usda",
-        external_id=str(food_data.fdc_id),
-        calories=nutrients["calories"],
-        protein_g=nutrients["protein_g"],
-        carbs_g=nutrients["carbs_g"],
-        fat_g=nutrients["fat_g"],
-        fiber_g=nutrients["fiber_g"],
-        sodium_mg=nutrients["sodium_mg"],
-    )
-    db.add(food_item)
-    db.commit()
-    db.refresh(food_item)
+    food_item = UsdaService.import_food(db, food_data.fdc_id)
+    publish(FOOD_ITEMS_TOPIC)
     return food_item
 
 
+@router.post(
+    "/food-items/usda/prefetch", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED
+)
+def prefetch_usda_food_items(
+    request: UsdaPrefetchRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Queue import of several USDA foods in the background; poll the returned job"""
+    job = enqueue(db, USDA_PREFETCH_JOB, {"fdc_ids": list(dict.fromkeys(request.fdc_ids))}, user_id=user.id)
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
+
+
+@router.get("/quick-foods", response_model=list[QuickFoodResponse])
+def get_quick_foods_endpoint(
+    meal_type: Optional[MealType] = None,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Get the user's most recently and frequently logged foods"""
+    return get_quick_foods(db, user.id, meal_type)
+
+
 @router.get("/custom-foods", response_model=list[CustomFoodResponse])
+@serialized(list[CustomFoodResponse])
 def get_custom_foods(
+    fields: Optional[str] = Query(
+        default=None, description="Comma-separated fields to return, e.g. `id,name,unit`"
+    ),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     """Get all custom foods for the current user"""
-    custom_foods = (
+    query = (
         db.query(CustomFood)
         .filter(CustomFood.user_id == user.id)
         .order_by(CustomFood.name)
-        .all()
     )
-    return custom_foods
+    selected = FieldSet(list[CustomFoodResponse], fields)
+    if selected.paths is None:
+        return query.all()
+
+    # Load just the requested columns instead of whole rows
+    columns = sorted(selected.requested(CustomFoodResponse.model_fields))
+    rows = query.with_entities(*(getattr(CustomFood, name) for name in columns)).all()
+    return Sparse(
+        [CustomFoodResponse.model_construct(**dict(zip(columns, row))) for row in rows],
+        include=selected.include,
+    )
 
 
 @router.post("/custom-foods", response_model=CustomFoodResponse)
@@ -307,6 +409,7 @@ def create_custom_food(
     db.add(custom_food)
     db.commit()
     db.refresh(custom_food)
+    publish(user_custom_foods_topic(user.id))
     return custom_food
 
 
@@ -341,6 +444,7 @@ def update_custom_food(
 
     db.commit()
     db.refresh(custom_food)
+    publish(user_custom_foods_topic(user.id))
     return custom_food
 
 
@@ -363,4 +467,5 @@ def delete_custom_food(
         )
     db.delete(custom_food)
     db.commit()
+    publish(user_custom_foods_topic(user.id))
     return None
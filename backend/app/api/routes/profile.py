@@ -1,37 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, Header, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
 from sqlalchemy.orm import Session
 from typing import Optional
-from datetime import date, timedelta
 
 from app.database import get_db
+from app.models.job import Job
 from app.models.user import User
-from app.models.food_entry import CalorieEntry
-from app.models.exercise import ExerciseEntry
-from app.schemas.user import UserResponse, UserUpdate
+from app.schemas.user import NutritionGoalsResponse, UserResponse, UserUpdate
+from app.schemas.weekly_comparison import WeeklyComparisonResponse
+from app.schemas.job import JobResponse
 from app.services.auth import decode_token
 from app.services.user import get_user_by_username
-from app.services.calculations import get_nutrition_goals
-from app.utils.time import pst_today
-from pydantic import BaseModel
+from app.services.invalidation import publish, user_profile_topic
+from app.services.goals import SOURCE_DEFAULT, get_user_goals, refresh_user_goals
+from app.services.views import get_weekly_comparison_view
+from app.services.exports import EXPORT_JOB
+from app.services.jobs import QUEUED, RUNNING, enqueue
+from app.utils.serialization import serialized
+from app.utils.request_context import current_batch
+from app.utils.server_timing import AUTH, timed_function
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
 
-class NutritionGoalsResponse(BaseModel):
-    """Response model for nutrition goals"""
-    bmr: int  # Basal Metabolic Rate
-    tdee: int  # Total Daily Energy Expenditure
-    calories: int  # Daily calorie target based on goal
-    protein: int  # Daily protein in grams
-    carbs: int  # Daily carbs in grams
-    fat: int  # Daily fat in grams
-    goal: str  # lose, maintain, or gain
-
-
+@timed_function(AUTH)
 def get_current_user(
     authorization: Optional[str] = Header(None), db: Session = Depends(get_db)
 ) -> User:
     """Extract current user from Bearer token"""
+    batch = current_batch.get()
+    if batch is not None:
+        # Sub-request of POST /batch, which has already authenticated
+        return batch.user
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -112,175 +111,63 @@ def update_profile(
     if user_update.custom_fat_percent is not None:
         user.custom_fat_percent = user_update.custom_fat_percent
 
+    refresh_user_goals(user)
     db.commit()
     db.refresh(user)
+    publish(user_profile_topic(user.id))
     return user
 
 
 @router.get("/nutrition-goals", response_model=NutritionGoalsResponse)
-def get_nutrition_goals_endpoint(user: User = Depends(get_current_user)):
+def get_nutrition_goals_endpoint(
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """Get calculated nutrition goals for the current user"""
-
-    # If user has custom nutrition settings enabled, return custom values
-    if user.use_custom_nutrition and user.custom_calories:
-        # Calculate macros based on custom percentages
-        protein_percent = user.custom_protein_percent or 0.25
-        carbs_percent = user.custom_carbs_percent or 0.50
-        fat_percent = user.custom_fat_percent or 0.25
-
-        protein_calories = user.custom_calories * protein_percent
-        carbs_calories = user.custom_calories * carbs_percent
-        fat_calories = user.custom_calories * fat_percent
-
-        protein_grams = round(protein_calories / 4)  # 4 cal per gram
-        carbs_grams = round(carbs_calories / 4)  # 4 cal per gram
-        fat_grams = round(fat_calories / 9)  # 9 cal per gram
-
-        return NutritionGoalsResponse(
-            bmr=0,  # Custom mode doesn't calculate BMR
-            tdee=0,  # Custom mode doesn't calculate TDEE
-            calories=user.custom_calories,
-            protein=protein_grams,
-            carbs=carbs_grams,
-            fat=fat_grams,
-            goal=user.goal or "maintain"
-        )
+    goals = get_user_goals(user, db)
 
     # Check if user has required profile information for calculated goals
-    if not all([user.sex, user.age, user.height, user.weight]):
+    if goals["source"] == SOURCE_DEFAULT:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Please complete your profile (sex, age, height, weight) to see nutrition goals"
         )
 
-    goals = get_nutrition_goals(
-        sex=user.sex,
-        age=user.age,
-        height=user.height,
-        weight=user.weight,
-        goal=user.goal or "maintain"
-    )
-
     return NutritionGoalsResponse(
         bmr=goals["bmr"],
         tdee=goals["tdee"],
         calories=goals["calories"],
-        protein=goals["protein"],
-        carbs=goals["carbs"],
-        fat=goals["fat"],
+        protein=goals["protein_g"],
+        carbs=goals["carbs_g"],
+        fat=goals["fat_g"],
         goal=user.goal or "maintain"
     )
 
 
-class WeeklyAverages(BaseModel):
-    """Weekly average nutrition and exercise data"""
-    calories: float
-    carbs: float
-    protein: float
-    fats: float
-    exercise: float
-
-
-class WeeklyComparisonResponse(BaseModel):
-    """Response model for weekly comparison"""
-    current_week: WeeklyAverages
-    last_week: WeeklyAverages
-    current_week_start: date
-    current_week_end: date
-    last_week_start: date
-    last_week_end: date
-
-
 @router.get("/weekly-comparison", response_model=WeeklyComparisonResponse)
+@serialized(WeeklyComparisonResponse)
 def get_weekly_comparison(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get weekly comparison of nutrition and exercise data"""
-    today = pst_today()
-
-    # Calculate current week (Monday to Sunday)
-    current_week_start = today - timedelta(days=today.weekday())  # Monday
-    current_week_end = current_week_start + timedelta(days=6)  # Sunday
+    return get_weekly_comparison_view(user, db)
 
-    # Calculate last week (Monday to Sunday)
-    last_week_start = current_week_start - timedelta(days=7)
-    last_week_end = last_week_start + timedelta(days=6)
 
-    # Get data for current week
-    current_week_data = _calculate_week_averages(
-        user.id, current_week_start, current_week_end, db
-    )
-
-    # Get data for last week
-    last_week_data = _calculate_week_averages(
-        user.id, last_week_start, last_week_end, db
-    )
-
-    return WeeklyComparisonResponse(
-        current_week=current_week_data,
-        last_week=last_week_data,
-        current_week_start=current_week_start,
-        current_week_end=current_week_end,
-        last_week_start=last_week_start,
-        last_week_end=last_week_end
-    )
-
-
-def _calculate_week_averages(
-    user_id: int,
-    start_date: date,
-    end_date: date,
-    db: Session
-) -> WeeklyAverages:
-    """Calculate average daily nutrition and exercise for a week (only days with data)"""
-    # Get all calorie entries for the week
-    entries = db.query(CalorieEntry).filter(
-        CalorieEntry.user_id == user_id,
-        CalorieEntry.date >= start_date,
-        CalorieEntry.date <= end_date
-    ).all()
-
-    # Get all exercise entries for the week
-    exercises = db.query(ExerciseEntry).filter(
-        ExerciseEntry.user_id == user_id,
-        ExerciseEntry.date >= start_date,
-        ExerciseEntry.date <= end_date
-    ).all()
-
-    # Track unique dates with nutrition data
-    nutrition_dates = set()
-
-    # Calculate totals
-    total_calories = 0
-    total_carbs = 0
-    total_protein = 0
-    total_fats = 0
-
-    for entry in entries:
-        nutrition_dates.add(entry.date)
-        entry_totals = entry.get_totals()
-        total_calories += entry_totals["calories"]
-        total_carbs += entry_totals["carbs_g"]
-        total_protein += entry_totals["protein_g"]
-        total_fats += entry_totals["fat_g"]
-
-    # Track unique dates with exercise data
-    exercise_dates = set()
-    total_exercise = 0
-    for ex in exercises:
-        exercise_dates.add(ex.date)
-        total_exercise += ex.calories_burned
-
-    # Count days with nutrition data (0 if no data)
-    num_nutrition_days = len(nutrition_dates) if nutrition_dates else 1
-    # Count days with exercise data (0 if no data)
-    num_exercise_days = len(exercise_dates) if exercise_dates else 1
-
-    return WeeklyAverages(
-        calories=round(total_calories / num_nutrition_days, 1),
-        carbs=round(total_carbs / num_nutrition_days, 1),
-        protein=round(total_protein / num_nutrition_days, 1),
-        fats=round(total_fats / num_nutrition_days, 1),
-        exercise=round(total_exercise / num_exercise_days, 1)
+@router.post("/export", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def export_profile_data(
+    response: Response,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Queue a full export of the user's data; poll the returned job for the result"""
+    # Repeated clicks join the export already in progress
+    job = (
+        db.query(Job)
+        .filter(Job.user_id == user.id, Job.kind == EXPORT_JOB, Job.status.in_((QUEUED, RUNNING)))
+        .first()
     )
+    if not job:
+        job = enqueue(db, EXPORT_JOB, user_id=user.id)
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func, extract, case
 from typing import List, Optional
@@ -9,6 +9,11 @@ from app.database import get_db
 from app.models.weight_entry import WeightEntry
 from app.models.user import User
 from app.schemas.weight_entry import WeightEntryCreate, WeightEntryResponse, WeightTrendData
+from app.services.goals import refresh_user_goals
+from app.services.invalidation import publish, user_profile_topic, user_weights_topic
+from app.services.views import get_latest_weight_view
+from app.utils.fieldsets import FieldSet
+from app.utils.serialization import Sparse, serialized
 from app.api.routes.profile import get_current_user
 
 router = APIRouter(prefix="/weights", tags=["weights"])
@@ -39,8 +44,10 @@ def create_weight_entry(
         ).order_by(desc(WeightEntry.date)).first()
         if latest_entry:
             user.weight = int(latest_entry.weight)
+            refresh_user_goals(user)
             db.commit()
 
+        publish(user_weights_topic(user.id), user_profile_topic(user.id))
         return existing
 
     # Create new entry
@@ -59,18 +66,22 @@ def create_weight_entry(
     ).order_by(desc(WeightEntry.date)).first()
     if latest_entry:
         user.weight = int(latest_entry.weight)
+        refresh_user_goals(user)
         db.commit()
 
+    publish(user_weights_topic(user.id), user_profile_topic(user.id))
     return new_entry
 
 
 @router.get("/history", response_model=List[WeightTrendData])
+@serialized(List[WeightTrendData])
 def get_weight_history(
     days: Optional[int] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     aggregation: Optional[str] = None,
     limit: Optional[int] = None,
+    fields: Optional[str] = Query(default=None, description="Comma-separated fields to return: date, weight, change"),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -80,7 +91,10 @@ def get_weight_history(
     - start_date & end_date: Custom date range
     - aggregation: "week", "month", "quarter", or "year" for aggregated data
     - limit: Get last N date entries (only latest entry per date)
+    - fields: Only return these fields of each point (change is then only computed if listed)
     """
+    selected = FieldSet(List[WeightTrendData], fields)
+    with_change = "change" in selected
 
     # Handle aggregated views
     if aggregation == "week":
@@ -118,7 +132,7 @@ def get_weight_history(
                 change=None
             ))
 
-        return result
+        return Sparse(result, include=selected.include)
 
     elif aggregation == "month":
         # Monthly averages for current year only (Jan-Dec)
@@ -151,7 +165,7 @@ def get_weight_history(
                     change=None
                 ))
 
-        return result
+        return Sparse(result, include=selected.include)
 
     elif aggregation == "quarter":
         # Quarterly averages for previous year, current year, and next year
@@ -186,7 +200,7 @@ def get_weight_history(
                 change=None
             ))
 
-        return result
+        return Sparse(result, include=selected.include)
 
     elif aggregation == "year":
         # Yearly averages for all available years
@@ -211,7 +225,7 @@ def get_weight_history(
                 change=None
             ))
 
-        return result
+        return Sparse(result, include=selected.include)
 
     # Handle limit: get last N date entries (latest entry per date)
     if limit:
@@ -238,7 +252,7 @@ def get_weight_history(
         result = []
         for i, entry in enumerate(entries):
             change = None
-            if i > 0:
+            if with_change and i > 0:
                 change = round(entry.weight - entries[i-1].weight, 2)
 
             result.append(WeightTrendData(
@@ -247,10 +261,10 @@ def get_weight_history(
                 change=change
             ))
 
-        return result
+        return Sparse(result, include=selected.include)
 
     # Default: daily data points
-    query = db.query(WeightEntry).filter(WeightEntry.user_id == user.id)
+    query = db.query(WeightEntry.date, WeightEntry.weight).filter(WeightEntry.user_id == user.id)
 
     if start_date and end_date:
         query = query.filter(
@@ -271,7 +285,7 @@ def get_weight_history(
     result = []
     for i, entry in enumerate(entries):
         change = None
-        if i > 0:
+        if with_change and i > 0:
             change = round(entry.weight - entries[i-1].weight, 2)
 
         result.append(WeightTrendData(
@@ -280,7 +294,7 @@ def get_weight_history(
             change=change
         ))
 
-    return result
+    return Sparse(result, include=selected.include)
 
 
 @router.get("/latest", response_model=Optional[WeightEntryResponse])
@@ -289,11 +303,7 @@ def get_latest_weight(
     db: Session = Depends(get_db)
 ):
     """Get the most recent weight entry"""
-    latest = db.query(WeightEntry).filter(
-        WeightEntry.user_id == user.id
-    ).order_by(desc(WeightEntry.date)).first()
-
-    return latest
+    return get_latest_weight_view(user, db)
 
 
 @router.delete("/{weight_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -325,6 +335,8 @@ def delete_weight_entry(
         user.weight = int(latest_entry.weight)
     else:
         user.weight = None
+    refresh_user_goals(user)
     db.commit()
 
+    publish(user_weights_topic(user.id), user_profile_topic(user.id))
     return None
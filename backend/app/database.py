@@ -2,6 +2,8 @@ import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from app.utils.request_context import current_batch
+
 # Database URL from environment variable (production) or SQLite (development)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./health_tracking.db")
 
@@ -24,6 +26,11 @@ Base = declarative_base()
 
 def get_db():
     """Dependency for getting database session"""
+    batch = current_batch.get()
+    if batch is not None:
+        # Inside POST /batch: reuse the batch's session, which it closes itself
+        yield batch.db
+        return
     db = SessionLocal()
     try:
         yield db
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import os
@@ -5,15 +7,77 @@ import os
 from dotenv import load_dotenv
 
 from app.api.router import api_router
+from app.middleware import (
+    CompressionMiddleware,
+    IdempotencyMiddleware,
+    LoadSheddingMiddleware,
+    MetricsMiddleware,
+    MsgpackMiddleware,
+    ProfilingMiddleware,
+    RateLimitMiddleware,
+    ServerTimingMiddleware,
+)
 from app.database import engine, Base
-from app.models import user, food_entry, exercise, weight_entry, custom_food  # noqa: F401
+from app.models import user, food_entry, exercise, weight_entry, custom_food, quick_food, refresh_token, job, idempotency_key  # noqa: F401
+from app.services.invalidation import get_bus
+from app.services.jobs import get_job_pool
+from app.services.metrics import install_metrics
+from app.services.password_hasher import configure_hasher
+from app.services.slow_queries import configure_slow_query_log
+from app.utils.serialization import DEFAULT_RESPONSE_CLASS
 
 load_dotenv()
 
+# Time SQL statements and expose service stats at /metrics
+install_metrics()
+configure_slow_query_log()
+
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Health Tracking API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Settle the bcrypt work factor before the first sign-in
+    configure_hasher()
+    # Listen for cache invalidations published by other workers
+    bus = get_bus()
+    bus.start()
+    # Run queued background jobs (exports, USDA prefetches) in this worker
+    jobs = get_job_pool()
+    jobs.start()
+    yield
+    jobs.stop()
+    bus.stop()
+
+
+app = FastAPI(
+    title="Health Tracking API",
+    lifespan=lifespan,
+    default_response_class=DEFAULT_RESPONSE_CLASS,
+)
+
+# Replay stored responses for retried POSTs carrying an Idempotency-Key (innermost,
+# so stored bodies are plain JSON and re-encoded per retry)
+app.add_middleware(IdempotencyMiddleware)
+
+# On-demand (admin) and 1-in-N sampling profiles of request handling
+app.add_middleware(ProfilingMiddleware)
+
+# Serve/accept MessagePack when clients ask for it
+app.add_middleware(MsgpackMiddleware)
+
+# gzip/brotli large bodies (outside msgpack so packed responses are compressed too)
+app.add_middleware(CompressionMiddleware)
+
+# Server-Timing breakdown when SERVER_TIMING_ENABLED (outside msgpack/compression to include them)
+app.add_middleware(ServerTimingMiddleware)
+
+# Cap concurrent requests per route group, shedding overflow with 503
+app.add_middleware(LoadSheddingMiddleware)
+
+# Throttle sign-ins and writes; added before CORS so 429s still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
 
 # CORS middleware for frontend
 app.add_middleware(
@@ -24,4 +88,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so latency covers every other middleware and 429s are counted
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router)
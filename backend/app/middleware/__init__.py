@@ -0,0 +1,20 @@
+from app.middleware.compression import CompressionMiddleware, no_compression
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.middleware.load_shedding import LoadSheddingMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.msgpack import MsgpackMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.server_timing import ServerTimingMiddleware
+
+__all__ = [
+    "CompressionMiddleware",
+    "IdempotencyMiddleware",
+    "LoadSheddingMiddleware",
+    "MetricsMiddleware",
+    "MsgpackMiddleware",
+    "ProfilingMiddleware",
+    "RateLimitMiddleware",
+    "ServerTimingMiddleware",
+    "no_compression",
+]
@@ -0,0 +1,160 @@
+import os
+import zlib
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "5"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/msgpack", "text/", "application/javascript")
+
+
+def no_compression(endpoint: Callable) -> Callable:
+    """Endpoint decorator: never compress this route's responses"""
+    endpoint.compress_response = False
+    return endpoint
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """Best supported encoding the client accepts: br, then gzip"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._compressor.process
+            self._flush = self._compressor.finish
+        else:
+            # wbits 16+ writes a gzip header and trailer
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = self._compressor.compress
+            self._flush = self._compressor.flush
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compress(data)
+        return out + self._flush() if final else out
+
+
+class CompressionMiddleware:
+    """gzip/brotli response compression.
+
+    Bodies are buffered until ``min_size`` bytes; smaller responses go out
+    untouched, larger ones are compressed (streamed when the app streams).
+    Only textual and msgpack content types are compressed, and never when
+    the response already has a Content-Encoding, sets
+    ``Cache-Control: no-transform`` or its route is marked ``no_compression``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        min_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(self, scope, encoding, send))
+
+
+class _CompressingSend:
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, encoding: str, send: Send):
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self.send = send
+        self.start: Message | None = None
+        self.buffer = b""
+        self.compressor: _Compressor | None = None
+        self.passthrough = False
+
+    def _should_compress(self, start: Message) -> bool:
+        route = self.scope.get("route")
+        endpoint = getattr(route, "endpoint", None)
+        if getattr(endpoint, "compress_response", True) is False:
+            return False
+        headers = Headers(raw=start["headers"])
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+            return False
+        return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            if self._should_compress(message):
+                self.start = message
+            else:
+                self.passthrough = True
+                await self.send(message)
+            return
+        if self.passthrough or message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            self.buffer += body
+            if more_body and len(self.buffer) < self.middleware.min_size:
+                return
+            if not more_body and len(self.buffer) < self.middleware.min_size:
+                MutableHeaders(scope=self.start).add_vary_header("Accept-Encoding")
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": self.buffer})
+                return
+            body, self.buffer = self.buffer, b""
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            compressed = self.compressor.compress(body, final=not more_body)
+            headers = MutableHeaders(scope=self.start)
+            headers["content-encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["content-length"]
+            else:
+                headers["content-length"] = str(len(compressed))
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        compressed = self.compressor.compress(body, final=not more_body)
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
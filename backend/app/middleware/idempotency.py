@@ -0,0 +1,150 @@
+import os
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.auth import decode_token
+from app.services.idempotency import (
+    IN_PROGRESS,
+    MAX_KEY_LENGTH,
+    MISMATCH,
+    REPLAY,
+    IdempotencyStore,
+    StoredResponse,
+    get_idempotency_store,
+    request_fingerprint,
+)
+
+IDEMPOTENCY_ENABLED = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() in {"1", "true", "yes"}
+
+REPLAYED_HEADER = b"idempotent-replayed"
+
+# Responses that carry credentials (access and refresh tokens) are never stored
+EXCLUDED_PREFIXES = ("/auth/",)
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def caller_id(scope: Scope) -> str | None:
+    """Whose key space a request's key lives in: the token's username, or None when signed out"""
+    authorization = _header(scope, b"authorization")
+    if authorization and authorization.lower().startswith("bearer "):
+        return decode_token(authorization[7:])
+    return None
+
+
+class IdempotencyMiddleware:
+    """Replays the stored response for a retried POST with the same ``Idempotency-Key``.
+
+    The first request with a key runs normally and its response (anything
+    below 500) is stored. A retry with the same key and request gets the
+    stored response with ``Idempotent-Replayed: true``; the same key with a
+    different request is rejected with 422, and a retry while the first
+    request is still running with 409. Server errors are not stored, so a
+    retry after one runs the request again. POSTs without the header are
+    unaffected.
+
+    Keys are scoped to the signed-in user. Anonymous requests (and ones with
+    an invalid token, which the route rejects anyway) have no key space of
+    their own and run normally, as does ``/auth/*``, whose responses hold
+    tokens that must not be kept in the store.
+
+    Sits inside compression and msgpack handling, so the stored body is the
+    plain response and is re-encoded for whichever client retries.
+    """
+
+    def __init__(self, app: ASGIApp, store: IdempotencyStore | None = None, enabled: bool = IDEMPOTENCY_ENABLED):
+        self.app = app
+        self.store = store
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        key = _header(scope, b"idempotency-key")
+        caller = None
+        if key is not None and not scope["path"].startswith(EXCLUDED_PREFIXES):
+            caller = caller_id(scope)
+        if caller is None:
+            await self.app(scope, receive, send)
+            return
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        store = self.store or get_idempotency_store()
+        fingerprint = request_fingerprint(scope["method"], scope["path"], scope.get("query_string", b""), body)
+        state, stored = await run_in_threadpool(store.begin, caller, key, fingerprint)
+
+        if state == REPLAY:
+            headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers]
+            headers.append((REPLAYED_HEADER, b"true"))
+            await send({"type": "http.response.start", "status": stored.status_code, "headers": headers})
+            await send({"type": "http.response.body", "body": stored.body})
+            return
+        if state == MISMATCH:
+            response = JSONResponse(
+                {"detail": "Idempotency-Key was already used for a different request"}, status_code=422
+            )
+            await response(scope, receive, send)
+            return
+        if state == IN_PROGRESS:
+            response = JSONResponse(
+                {"detail": "A request with this Idempotency-Key is still being processed"},
+                status_code=409,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = 500
+        headers: list[list[str]] = []
+        chunks: list[bytes] = []
+
+        async def recording_send(message: Message) -> None:
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [
+                    [name.decode("latin-1"), value.decode("latin-1")] for name, value in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, recording_send)
+        except BaseException:
+            await run_in_threadpool(store.release, caller, key)
+            raise
+        if status_code >= 500:
+            await run_in_threadpool(store.release, caller, key)
+        else:
+            await run_in_threadpool(store.complete, caller, key, StoredResponse(status_code, headers, b"".join(chunks)))
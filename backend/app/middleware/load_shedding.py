@@ -0,0 +1,48 @@
+import time
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services.load_shedding import LOAD_SHED_RETRY_AFTER, ConcurrencyLimiter, get_concurrency_limiter
+from app.services.metrics import load_queue_wait, load_shed
+
+
+class LoadSheddingMiddleware:
+    """Holds each request's route-group slot for its whole response.
+
+    Requests that cannot get a slot (queue full, or waited too long) get
+    503 + Retry-After without touching the threadpool.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: ConcurrencyLimiter | None = None):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiter or get_concurrency_limiter()
+        group = limiter.group_for(scope["method"], scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        shed_reason = await limiter.acquire(group)
+        load_queue_wait.labels(group.name).observe(time.perf_counter() - started)
+        if shed_reason is not None:
+            load_shed.labels(group.name, shed_reason).inc()
+            response = JSONResponse(
+                {"detail": "Server busy, try again shortly"},
+                status_code=503,
+                headers={"Retry-After": str(LOAD_SHED_RETRY_AFTER)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(group)
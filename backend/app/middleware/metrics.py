@@ -0,0 +1,45 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics import http_request_duration, http_requests
+from app.utils.request_context import current_scope
+
+# Requests that matched no route (404s, or rejected before routing) share one
+# label so unknown paths cannot grow the series without bound
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """Counts requests and records latency per route template and status.
+
+    The route label is the matched path template (``/weights/{weight_id}``),
+    read from the scope once the app has routed the request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def metrics_send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, metrics_send)
+        finally:
+            current_scope.reset(token)
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            http_requests.labels(method, route, str(status_code)).inc()
+            http_request_duration.labels(method, route).observe(time.perf_counter() - started)
@@ -0,0 +1,138 @@
+import time
+
+import pydantic_core
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.content_negotiation import (
+    MSGPACK_MEDIA_TYPE,
+    is_msgpack,
+    msgpack_available,
+    packb,
+    prefers_msgpack,
+    unpackb,
+    wants_msgpack,
+)
+from app.utils import server_timing
+from app.utils.serialization import dumps
+
+READ_METHODS = {"GET", "HEAD"}
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class MsgpackMiddleware:
+    """Serves ``Accept: application/msgpack`` reads and accepts msgpack bodies.
+
+    Request bodies sent as msgpack are transcoded to JSON before routing, so
+    endpoints and their validation are unchanged. JSON responses to reads
+    that prefer msgpack are transcoded on the way out; endpoints using
+    ``serialized`` pack their models directly and are passed through as-is.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if is_msgpack(_header(scope, b"content-type")):
+            if not msgpack_available():
+                response = JSONResponse({"detail": "MessagePack is not supported"}, status_code=415)
+                await response(scope, receive, send)
+                return
+            try:
+                scope, receive = await self._json_request(scope, receive)
+            except ValueError:
+                response = JSONResponse({"detail": "Invalid MessagePack body"}, status_code=400)
+                await response(scope, receive, send)
+                return
+
+        if scope["method"] not in READ_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        negotiate = msgpack_available() and prefers_msgpack(_header(scope, b"accept"))
+        token = wants_msgpack.set(negotiate)
+        try:
+            await self.app(scope, receive, self._msgpack_send(send) if negotiate else self._vary_send(send))
+        finally:
+            wants_msgpack.reset(token)
+
+    async def _json_request(self, scope: Scope, receive: Receive) -> tuple[Scope, Receive]:
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        try:
+            json_body = dumps(unpackb(body)) if body else b""
+        except Exception as exc:
+            raise ValueError("Invalid MessagePack body") from exc
+
+        headers = [(k, v) for k, v in scope["headers"] if k not in (b"content-type", b"content-length")]
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(json_body)).encode())]
+        sent = False
+
+        async def json_receive() -> Message:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": json_body, "more_body": False}
+            return await receive()
+
+        return {**scope, "headers": headers}, json_receive
+
+    @staticmethod
+    def _vary_send(send: Send) -> Send:
+        async def vary_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).add_vary_header("Accept")
+            await send(message)
+
+        return vary_send
+
+    @staticmethod
+    def _msgpack_send(send: Send) -> Send:
+        start: Message | None = None
+        chunks: list[bytes] = []
+
+        async def msgpack_send(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.add_vary_header("Accept")
+                if (headers.get("content-type") or "").startswith("application/json"):
+                    start = message  # hold back until the body is complete
+                    return
+                await send(message)
+                return
+
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            started = time.perf_counter()
+            packed = packb(pydantic_core.from_json(body)) if body else b""
+            server_timing.record(server_timing.SERIALIZATION, time.perf_counter() - started)
+            headers = MutableHeaders(scope=start)
+            headers["content-type"] = MSGPACK_MEDIA_TYPE
+            headers["content-length"] = str(len(packed))
+            await send(start)
+            await send({"type": "http.response.body", "body": packed, "more_body": False})
+
+        return msgpack_send
@@ -0,0 +1,135 @@
+import itertools
+import os
+import re
+import time
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.auth import decode_token
+from app.utils.profiling import ProfileDirectory, SamplingProfiler
+
+# Usernames allowed to profile a request with "X-Profile: 1" or "?profile=1"
+PROFILING_ADMINS = {name.strip() for name in os.getenv("PROFILING_ADMINS", "").split(",") if name.strip()}
+# Profile every Nth request to PROFILE_DIR (0 disables sampling)
+PROFILE_SAMPLE_EVERY = int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+TRUTHY = {"1", "true", "yes"}
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def profile_requested(scope: Scope) -> bool:
+    if (_header(scope, b"x-profile") or "").lower() in TRUTHY:
+        return True
+    query = scope.get("query_string", b"")
+    if b"profile" not in query:
+        return False
+    return parse_qs(query.decode("latin-1")).get("profile", [""])[-1].lower() in TRUTHY
+
+
+def is_profiling_admin(scope: Scope, admins: set[str]) -> bool:
+    authorization = _header(scope, b"authorization")
+    if not admins or not authorization or not authorization.lower().startswith("bearer "):
+        return False
+    return decode_token(authorization[7:]) in admins
+
+
+def _profile_name(scope: Scope, status_code: int, duration: float) -> str:
+    route = getattr(scope.get("route"), "path", scope["path"])
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    return f"{int(time.time() * 1000)}-{scope['method']}-{slug}-{status_code}-{int(duration * 1000)}ms.folded"
+
+
+class ProfilingMiddleware:
+    """Sampling-profiles requests on demand and 1-in-N to a local directory.
+
+    A profiling admin adding ``X-Profile: 1`` or ``?profile=1`` gets the
+    request's collapsed stacks back instead of its body (the original status
+    is in ``X-Profile-Status``). With ``sample_every`` set, every Nth request
+    is profiled and written to ``directory``, keeping the newest ``keep``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        admins: set[str] | None = None,
+        sample_every: int = PROFILE_SAMPLE_EVERY,
+        directory: str = PROFILE_DIR,
+        keep: int = PROFILE_KEEP,
+        interval_ms: float = PROFILE_INTERVAL_MS,
+    ):
+        self.app = app
+        self.admins = PROFILING_ADMINS if admins is None else admins
+        self.sample_every = sample_every
+        self.directory = ProfileDirectory(directory, keep)
+        self.interval = interval_ms / 1000
+        self._requests = itertools.count(1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self.admins and profile_requested(scope) and is_profiling_admin(scope, self.admins):
+            await self._profile_to_response(scope, receive, send)
+            return
+        if self.sample_every and next(self._requests) % self.sample_every == 0:
+            await self._profile_to_directory(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    async def _profile_to_response(self, scope: Scope, receive: Receive, send: Send) -> None:
+        status_code = 500
+
+        async def discard(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        profiler = SamplingProfiler(self.interval).start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        body = profiler.collapsed().encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"cache-control", b"no-store"),
+                (b"x-profile-status", str(status_code).encode()),
+                (b"x-profile-samples", str(profiler.sample_count).encode()),
+                (b"x-profile-duration-ms", str(round(profiler.duration * 1000, 1)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _profile_to_directory(self, scope: Scope, receive: Receive, send: Send) -> None:
+        status_code = 500
+
+        async def recording_send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        profiler = SamplingProfiler(self.interval).start()
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            profiler.stop()
+            if profiler.samples:
+                name = _profile_name(scope, status_code, profiler.duration)
+                await run_in_threadpool(self.directory.write, name, profiler.collapsed())
@@ -0,0 +1,93 @@
+import logging
+import math
+import os
+from functools import lru_cache
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services.auth import decode_token
+from app.services.rate_limit import RateLimiter, RouteGroup, get_limiter
+
+logger = logging.getLogger(__name__)
+
+# Behind a proxy (Render) every request comes from the proxy's address
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in {"1", "true", "yes"}
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def client_ip(scope: Scope) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = _header(scope, b"x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+@lru_cache(maxsize=4096)
+def _token_subject(token: str) -> str | None:
+    # Only picks the bucket; the route still fully validates the token
+    return decode_token(token)
+
+
+def client_key(scope: Scope, group: RouteGroup) -> str:
+    if group.per_user:
+        authorization = _header(scope, b"authorization")
+        if authorization and authorization.lower().startswith("bearer "):
+            username = _token_subject(authorization[7:])
+            if username:
+                return f"user:{username}"
+    return f"ip:{client_ip(scope)}"
+
+
+class RateLimitMiddleware:
+    """Rejects requests over their route group's token-bucket limit with 429.
+
+    Requests outside every group pass straight through. A shared (Redis)
+    bucket store is called from the threadpool so a slow or unreachable Redis
+    never stalls the event loop. If the store fails, requests are let through
+    rather than turned away.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter | None = None):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiter or get_limiter()
+        group = limiter.group_for(scope["method"], scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            if getattr(limiter.store, "shared", False):
+                wait = await run_in_threadpool(limiter.check, group, client_key(scope, group))
+            else:
+                # In-memory buckets answer in microseconds; a thread hop would cost more
+                wait = limiter.check(group, client_key(scope, group))
+        except Exception:
+            logger.exception("Rate limit check failed; allowing request")
+            wait = 0
+        if wait:
+            response = JSONResponse(
+                {"detail": "Too many requests"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,42 @@
+import os
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.server_timing import RequestTimings, current_timings
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+
+class ServerTimingMiddleware:
+    """Adds a ``Server-Timing`` header (auth, db, usda, serialization, app, total).
+
+    Disabled by default; when off requests pass straight through. Sits
+    outside the msgpack and compression middlewares, which hold the response
+    start back until the body is final, so their work is in the total.
+    """
+
+    def __init__(self, app: ASGIApp, enabled: bool = SERVER_TIMING_ENABLED):
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+
+        async def timing_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.header())
+                # Let the (cross-origin) frontend read the breakdown
+                headers["Timing-Allow-Origin"] = "*"
+            await send(message)
+
+        token = current_timings.set(timings)
+        try:
+            await self.app(scope, receive, timing_send)
+        finally:
+            current_timings.reset(token)
@@ -3,5 +3,9 @@ from app.models.food_entry import FoodItem, CalorieEntry
 from app.models.exercise import ExerciseEntry
 from app.models.weight_entry import WeightEntry
 from app.models.custom_food import CustomFood
+from app.models.quick_food import QuickFood
+from app.models.refresh_token import RefreshToken
+from app.models.job import Job
+from app.models.idempotency_key import IdempotencyKey
 
-__all__ = ["User", "FoodItem", "CalorieEntry", "ExerciseEntry", "WeightEntry", "CustomFood"]
+__all__ = ["User", "FoodItem", "CalorieEntry", "ExerciseEntry", "WeightEntry", "CustomFood", "QuickFood", "RefreshToken", "Job", "IdempotencyKey"]
@@ -6,6 +6,9 @@ from enum import Enum
 from app.database import Base
 from app.utils.time import pst_today
 
+# Units in which an entry's quantity is grams rather than servings
+GRAM_UNITS = ("g", "gram", "grams")
+
 
 class MealType(str, Enum):
     BREAKFAST = "breakfast"
@@ -55,7 +58,7 @@ class CalorieEntry(Base):
         """Calculate total nutrition for this entry"""
         unit = (self.unit or "serving").lower()
         # Normalize by gram-based serving size when quantity is in grams.
-        if unit in {"g", "gram", "grams"} and self.food_item.serving_size_grams:
+        if unit in GRAM_UNITS and self.food_item.serving_size_grams:
             multiplier = self.quantity / self.food_item.serving_size_grams
         else:
             multiplier = self.quantity
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, LargeBinary, UniqueConstraint
+from datetime import datetime
+
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """Response recorded for a POST sent with an Idempotency-Key (see app/services/idempotency.py)"""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("caller", "key", name="uq_idempotency_caller_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    # Always the signed-in username from the bearer token: anonymous and /auth/*
+    # requests are never stored, so keys are never shared between callers
+    caller = Column(String(150), nullable=False)
+    key = Column(String(255), nullable=False)
+    # SHA-256 of method, path, query string and body
+    request_hash = Column(String(64), nullable=False)
+    # Null while the first request is still being handled
+    status_code = Column(Integer, nullable=True)
+    headers = Column(JSON, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Another request may take over an unfinished key after locked_until
+    locked_until = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, JSON
+from datetime import datetime
+
+from app.database import Base
+
+
+class Job(Base):
+    """Background job queued in the database (see app/services/jobs.py)"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers look for due jobs by status and run time
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(64), nullable=False)
+    # Owner allowed to read the job through the API; None for system jobs
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String(16), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    # Not picked up before this time (set for delayed jobs and retry back-off)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # The worker holding a running job; another may take it over after lease_expires_at
+    locked_by = Column(String(64), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index, UniqueConstraint, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.database import Base
+from app.models.food_entry import MealType
+
+
+class QuickFood(Base):
+    """Per-user index of recently and frequently logged foods, by meal type"""
+    __tablename__ = "quick_foods"
+    __table_args__ = (
+        UniqueConstraint("user_id", "food_item_id", "meal_type", name="uq_quick_food"),
+        Index("ix_quick_foods_user_meal_score", "user_id", "meal_type", "score"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    food_item_id = Column(Integer, ForeignKey("food_items.id"), nullable=False)
+    meal_type = Column(SQLEnum(MealType), nullable=False)
+    # log2 of the time-decayed use count (see app/services/quick_foods.py)
+    score = Column(Float, nullable=False)
+    use_count = Column(Integer, nullable=False, default=1)
+    last_used_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Relationships
+    food_item = relationship("FoodItem")
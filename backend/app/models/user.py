@@ -22,6 +22,18 @@ class User(Base):
     custom_carbs_percent = Column(Float, nullable=True)
     custom_fat_percent = Column(Float, nullable=True)
 
+    # Resolved nutrition goals, refreshed whenever their inputs change
+    goals_version = Column(Integer, nullable=True)
+    goals_source = Column(String, nullable=True)  # custom, calculated, default
+    goal_bmr = Column(Integer, nullable=True)
+    goal_tdee = Column(Integer, nullable=True)
+    goal_calories = Column(Integer, nullable=True)
+    goal_protein_g = Column(Integer, nullable=True)
+    goal_carbs_g = Column(Integer, nullable=True)
+    goal_fat_g = Column(Integer, nullable=True)
+    goal_fiber_g = Column(Integer, nullable=True)
+    goal_sodium_mg = Column(Integer, nullable=True)
+
     # Relationships
     calorie_entries = relationship("CalorieEntry", back_populates="user")
     exercise_entries = relationship("ExerciseEntry", back_populates="user")
@@ -1,4 +1,4 @@
-from app.schemas.user import UserRegister, UserLogin, UserResponse, UserUpdate, Token, TokenData
+from app.schemas.user import UserRegister, UserLogin, UserResponse, UserUpdate, Token, TokenData, RefreshTokenRequest
 from app.schemas.food_entry import (
     FoodItemCreate,
     FoodItemResponse,
@@ -10,6 +10,11 @@ from app.schemas.food_entry import (
 from app.schemas.exercise import ExerciseEntryCreate, ExerciseEntryResponse
 from app.schemas.weight_entry import WeightEntryCreate, WeightEntryResponse
 from app.schemas.custom_food import CustomFoodCreate, CustomFoodResponse
+from app.schemas.quick_food import QuickFoodResponse
+from app.schemas.weekly_comparison import WeeklyAverages, WeeklyComparisonResponse
+from app.schemas.job import JobResponse, JobSummary
+from app.schemas.batch import BatchRequest, BatchResponse
+from app.schemas.dashboard import DashboardResponse
 
 __all__ = [
     "UserRegister",
@@ -18,6 +23,7 @@ __all__ = [
     "UserUpdate",
     "Token",
     "TokenData",
+    "RefreshTokenRequest",
     "FoodItemCreate",
     "FoodItemResponse",
     "CalorieEntryCreate",
@@ -30,4 +36,12 @@ __all__ = [
     "WeightEntryResponse",
     "CustomFoodCreate",
     "CustomFoodResponse",
+    "QuickFoodResponse",
+    "WeeklyAverages",
+    "WeeklyComparisonResponse",
+    "JobResponse",
+    "JobSummary",
+    "BatchRequest",
+    "BatchResponse",
+    "DashboardResponse",
 ]
@@ -0,0 +1,27 @@
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+MAX_BATCH_REQUESTS = 20
+
+
+class BatchItem(BaseModel):
+    """One sub-request; ``path`` may carry a query string (``/nutrition/daily?date=2025-01-31``)"""
+    id: Optional[str] = Field(None, max_length=64)
+    method: Literal["GET"] = "GET"
+    path: str = Field(..., pattern=r"^/", max_length=2048)
+
+
+class BatchRequest(BaseModel):
+    requests: list[BatchItem] = Field(..., min_length=1, max_length=MAX_BATCH_REQUESTS)
+
+
+class BatchItemResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    """Sub-responses in request order, each with its own status code"""
+    responses: list[BatchItemResponse]
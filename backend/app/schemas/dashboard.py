@@ -0,0 +1,19 @@
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.schemas.food_entry import DailyNutritionSummary
+from app.schemas.user import NutritionGoalsResponse
+from app.schemas.weekly_comparison import WeeklyComparisonResponse
+from app.schemas.weight_entry import WeightEntryResponse, WeightTrendData
+
+
+class DashboardResponse(BaseModel):
+    """Everything the dashboard shows for one day, in one response"""
+    date: date
+    summary: DailyNutritionSummary
+    goals: Optional[NutritionGoalsResponse] = None  # None until the profile is complete
+    weekly_comparison: WeeklyComparisonResponse  # the weeks around ``date``
+    latest_weight: Optional[WeightEntryResponse] = None
+    weight_trend: list[WeightTrendData]  # most recent weigh-ins, oldest first
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import date as Date
 from enum import Enum
 
@@ -110,12 +110,17 @@ class UsdaFoodSearchResult(BaseModel):
 
 class UsdaFoodSearchResponse(BaseModel):
     results: list[UsdaFoodSearchResult]
+    degraded: bool = False  # USDA unavailable; results come from local data only
 
 
 class UsdaFoodCreate(BaseModel):
     fdc_id: int
 
 
+class UsdaPrefetchRequest(BaseModel):
+    fdc_ids: list[int] = Field(..., min_length=1, max_length=200)
+
+
 class UsdaFoodDetailsResponse(BaseModel):
     fdc_id: int
     description: str
@@ -124,3 +129,4 @@ class UsdaFoodDetailsResponse(BaseModel):
     serving_size: float | None = None
     serving_size_unit: str | None = None
     nutrients_per_100g: NutritionTotals
+    degraded: bool = False  # USDA unavailable; served from the local copy
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class JobSummary(BaseModel):
+    """Status of a background job, as listed by ``GET /jobs`` (without its result)"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    kind: str
+    status: str  # queued, running, succeeded, failed
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class JobResponse(JobSummary):
+    """Status of a background job; ``result`` is set once it has succeeded"""
+
+    result: Optional[Any] = None
@@ -0,0 +1,13 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+from app.schemas.food_entry import FoodItemResponse, MealType
+
+
+class QuickFoodResponse(BaseModel):
+    food_item: FoodItemResponse
+    meal_type: MealType
+    use_count: int
+    last_used_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -46,10 +46,27 @@ class UserUpdate(BaseModel):
     custom_fat_percent: Optional[float] = None
 
 
+class NutritionGoalsResponse(BaseModel):
+    """Response model for nutrition goals"""
+    bmr: int  # Basal Metabolic Rate
+    tdee: int  # Total Daily Energy Expenditure
+    calories: int  # Daily calorie target based on goal
+    protein: int  # Daily protein in grams
+    carbs: int  # Daily carbs in grams
+    fat: int  # Daily fat in grams
+    goal: str  # lose, maintain, or gain
+
+
 class Token(BaseModel):
     """Schema for JWT token response"""
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshTokenRequest(BaseModel):
+    """Schema for exchanging or revoking a refresh token"""
+    refresh_token: str
 
 
 class TokenData(BaseModel):
@@ -0,0 +1,21 @@
+from datetime import date
+from pydantic import BaseModel
+
+
+class WeeklyAverages(BaseModel):
+    """Weekly average nutrition and exercise data"""
+    calories: float
+    carbs: float
+    protein: float
+    fats: float
+    exercise: float
+
+
+class WeeklyComparisonResponse(BaseModel):
+    """Response model for weekly comparison"""
+    current_week: WeeklyAverages
+    last_week: WeeklyAverages
+    current_week_start: date
+    current_week_end: date
+    last_week_start: date
+    last_week_end: date
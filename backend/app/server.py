@@ -0,0 +1,248 @@
+"""Production server: preloaded, pre-forked uvicorn workers.
+
+    python -m app.server [--workers N] [--port 8000]
+
+The parent process imports the app once (routes, models, Pydantic
+validators and serializers, the OpenAPI schema), settles the bcrypt cost,
+then ``gc.freeze()``s everything it allocated so the forked workers share
+those pages copy-on-write instead of each building and later touching its
+own copy. It binds the listening socket and forks ``WEB_CONCURRENCY``
+workers, each a uvicorn server on the shared socket running its own
+lifespan (invalidation bus, threads and DB connections are per worker).
+
+Workers exit gracefully after ``MAX_REQUESTS`` (plus up to
+``MAX_REQUESTS_JITTER`` so they do not all recycle at once) and are
+replaced, as are crashed workers. Signals to the parent:
+
+- ``SIGTERM``/``SIGINT``: stop accepting, let in-flight requests finish for
+  up to ``GRACEFUL_TIMEOUT`` seconds, then exit
+- ``SIGHUP``: replace the workers one at a time without dropping requests
+- ``SIGTTIN``/``SIGTTOU``: add/remove a worker
+"""
+
+import argparse
+import gc
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Optional
+
+import uvicorn
+
+logger = logging.getLogger("app.server")
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(min(4, os.cpu_count() or 1))))
+MAX_REQUESTS = int(os.getenv("MAX_REQUESTS", "10000"))
+MAX_REQUESTS_JITTER = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+GRACEFUL_TIMEOUT = float(os.getenv("GRACEFUL_TIMEOUT", "30"))
+
+# A worker that dies sooner than this after starting counts as a crash loop
+MIN_WORKER_LIFETIME = 1.0
+
+
+def preload():
+    """Import and warm everything workers can share, then freeze it for copy-on-write"""
+    from app.database import engine
+    from app.main import app
+    from app.services.password_hasher import configure_hasher
+
+    # Routes compile their validators and serializers at import; the OpenAPI
+    # schema is built lazily, so build it once here rather than per worker
+    app.openapi()
+    configure_hasher()
+    # Never hand pooled connections (sockets) from the parent to the workers
+    engine.dispose()
+
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Arbiter:
+    """Forks workers on a shared socket and keeps the configured number running"""
+
+    def __init__(
+        self,
+        app,
+        sock: socket.socket,
+        workers: int = WEB_CONCURRENCY,
+        max_requests: int = MAX_REQUESTS,
+        max_requests_jitter: int = MAX_REQUESTS_JITTER,
+        graceful_timeout: float = GRACEFUL_TIMEOUT,
+        uvicorn_options: Optional[dict] = None,
+    ):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.uvicorn_options = uvicorn_options or {}
+        self.children: dict[int, float] = {}  # pid -> start time
+        self._signals: list[int] = []
+        self._stopping = False
+
+    # Worker side
+
+    def _run_worker(self) -> None:
+        # uvicorn installs its own SIGTERM/SIGINT handlers (graceful shutdown);
+        # the rest are the parent's business
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, signal.SIG_DFL)
+        for signum in (signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(signum, signal.SIG_IGN)
+        random.seed()
+        limit = None
+        if self.max_requests:
+            limit = self.max_requests + random.randint(0, self.max_requests_jitter)
+        config = uvicorn.Config(
+            self.app,
+            limit_max_requests=limit,
+            timeout_graceful_shutdown=self.graceful_timeout,
+            **self.uvicorn_options,
+        )
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    # Parent side
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker()
+            except BaseException:
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        logger.info("Started worker %s", pid)
+        return pid
+
+    def _reap(self) -> list[tuple[int, float]]:
+        exited = []
+        while self.children:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            started = self.children.pop(pid, None)
+            if started is not None:
+                exited.append((pid, time.monotonic() - started))
+        return exited
+
+    def _stop_worker(self, pid: int) -> None:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self.children.pop(pid, None)
+
+    def _wait_for(self, pids: set[int], timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        while pids & set(self.children) and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        for pid in pids & set(self.children):
+            logger.warning("Worker %s did not stop within %ss; killing it", pid, timeout)
+            os.kill(pid, signal.SIGKILL)
+        self._reap()
+
+    def rolling_restart(self) -> None:
+        for old in list(self.children):
+            self.spawn()
+            self._stop_worker(old)
+            self._wait_for({old}, self.graceful_timeout)
+
+    def stop(self) -> None:
+        self._stopping = True
+        pids = set(self.children)
+        for pid in pids:
+            self._stop_worker(pid)
+        self._wait_for(pids, self.graceful_timeout)
+
+    def _on_signal(self, signum, frame) -> None:
+        self._signals.append(signum)
+
+    def run(self) -> None:
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(signum, self._on_signal)
+        for _ in range(self.workers):
+            self.spawn()
+
+        while not self._stopping:
+            while self._signals:
+                signum = self._signals.pop(0)
+                if signum in (signal.SIGTERM, signal.SIGINT):
+                    logger.info("Shutting down %d workers", len(self.children))
+                    self.stop()
+                    return
+                if signum == signal.SIGHUP:
+                    logger.info("Replacing workers")
+                    self.rolling_restart()
+                elif signum == signal.SIGTTIN:
+                    self.workers += 1
+                elif signum == signal.SIGTTOU and self.workers > 1:
+                    self.workers -= 1
+
+            for pid, lifetime in self._reap():
+                if lifetime < MIN_WORKER_LIFETIME:
+                    logger.error("Worker %s exited after %.2fs; backing off", pid, lifetime)
+                    time.sleep(1)
+                else:
+                    logger.info("Worker %s exited (recycled); replacing it", pid)
+            while len(self.children) < self.workers:
+                self.spawn()
+            if len(self.children) > self.workers:
+                newest = max(self.children, key=self.children.get)
+                self._stop_worker(newest)
+                self._wait_for({newest}, self.graceful_timeout)
+            time.sleep(0.1)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the API with preloaded, pre-forked workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument(
+        "--max-requests", type=int, default=MAX_REQUESTS, help="recycle a worker after N requests (0: never)"
+    )
+    parser.add_argument("--max-requests-jitter", type=int, default=MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=float, default=GRACEFUL_TIMEOUT)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(process)d] %(levelname)s %(message)s")
+    app = preload()
+    sock = bind_socket(args.host, args.port)
+    logger.info("Listening on %s:%d with %d workers", args.host, args.port, args.workers)
+    Arbiter(
+        app,
+        sock,
+        workers=args.workers,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        graceful_timeout=args.graceful_timeout,
+    ).run()
+    sock.close()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
-import bcrypt
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from app.services.password_hasher import get_hasher
+
 # JWT settings
 SECRET_KEY = "your-secret-key-change-in-production"  # TODO: Move to env
 ALGORITHM = "HS256"
@@ -11,12 +12,27 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    return get_hasher().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return get_hasher().hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash without holding a request thread"""
+    return await get_hasher().verify_async(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without holding a request thread"""
+    return await get_hasher().hash_async(password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash uses a different cost than the configured one"""
+    return get_hasher().needs_rehash(hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -0,0 +1,425 @@
+"""Small caching layer for service functions.
+
+Each namespace is a ``Cache`` with its own TTL, size limit, eviction policy
+and statistics. Entries can carry tags; tags match the topics published on the
+invalidation bus, so a write such as ``user:5:profile`` drops every entry
+tagged with it in every worker.
+
+Backends:
+
+- ``memory`` (default): per-process dict with LRU or LFU eviction.
+- ``redis``: any Redis-protocol server at ``CACHE_REDIS_URL``, shared by all
+  workers (see ``app/services/cache_redis.py``).
+
+A cache is never required for correctness: a backend error on a read counts
+as a miss and a failed write is dropped, so an unreachable Redis makes
+requests slower rather than failing them.
+
+Service functions opt in with the ``cached`` decorator::
+
+    @cached("usda.food", ttl=3600, key=lambda fdc_id: fdc_id)
+    def get_food(fdc_id): ...
+"""
+
+import functools
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from pydantic import BaseModel
+
+from app.services.invalidation import ALL_TOPIC, get_bus
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+SERIALIZERS: dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "pickle": (
+        functools.partial(pickle.dumps, protocol=pickle.HIGHEST_PROTOCOL),
+        pickle.loads,
+    ),
+}
+
+
+def _approx_size(value: Any, depth: int = 0) -> int:
+    """Rough deep size of a cached value in bytes"""
+    size = sys.getsizeof(value)
+    if depth > 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(_approx_size(k, depth + 1) + _approx_size(v, depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_approx_size(item, depth + 1) for item in value)
+    elif isinstance(value, BaseModel):
+        size += _approx_size(value.__dict__, depth + 1)
+    return size
+
+
+class _LruPolicy:
+    def __init__(self):
+        self._order: OrderedDict[str, None] = OrderedDict()
+
+    def add(self, key: str) -> None:
+        self._order[key] = None
+
+    def touch(self, key: str) -> None:
+        self._order.move_to_end(key)
+
+    def remove(self, key: str) -> None:
+        self._order.pop(key, None)
+
+    def victim(self) -> str:
+        return next(iter(self._order))
+
+
+class _LfuPolicy:
+    """O(1) LFU: keys bucketed by use count, oldest first within a bucket"""
+
+    def __init__(self):
+        self._counts: dict[str, int] = {}
+        self._buckets: dict[int, OrderedDict[str, None]] = defaultdict(OrderedDict)
+        self._min_count = 0
+
+    def add(self, key: str) -> None:
+        self._counts[key] = 1
+        self._buckets[1][key] = None
+        self._min_count = 1
+
+    def touch(self, key: str) -> None:
+        count = self._counts[key]
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+        self._counts[key] = count + 1
+        self._buckets[count + 1][key] = None
+
+    def remove(self, key: str) -> None:
+        count = self._counts.pop(key, None)
+        if count is None:
+            return
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = min(self._buckets, default=0)
+
+    def victim(self) -> str:
+        return next(iter(self._buckets[self._min_count]))
+
+
+POLICIES = {"lru": _LruPolicy, "lfu": _LfuPolicy}
+
+
+class MemoryBackend:
+    """In-process store with TTL, tags and a bounded size"""
+
+    def __init__(self, max_size: int = 1024, policy: str = "lru"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.max_size = max_size
+        self.policy_name = policy
+        self._policy = POLICIES[policy]()
+        # key -> (value, expires_at, tags, size)
+        self._entries: dict[str, tuple[Any, Optional[float], tuple[str, ...], int]] = {}
+        self._tags: dict[str, set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.memory_bytes = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[1] is not None and entry[1] <= time.monotonic():
+                self._remove(key)
+                return MISSING
+            self._policy.touch(key)
+            return entry[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float], tags: Iterable[str], size: int) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        tags = tuple(tags)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and len(self._entries) >= self.max_size:
+                self._remove(self._policy.victim())
+                self.evictions += 1
+            self._entries[key] = (value, expires_at, tags, size)
+            self._policy.add(key)
+            self.memory_bytes += size
+            for tag in tags:
+                self._tags[tag].add(key)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def invalidate_tag(self, tag: str) -> int:
+        with self._lock:
+            keys = self._tags.pop(tag, ())
+            for key in list(keys):
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._policy = POLICIES[self.policy_name]()
+            self.memory_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        _, _, tags, size = self._entries.pop(key)
+        self._policy.remove(key)
+        self.memory_bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class Cache:
+    """A cache namespace: key/value access plus hit, miss and eviction counters"""
+
+    def __init__(
+        self,
+        namespace: str,
+        backend,
+        ttl: Optional[float] = None,
+        serializer: Optional[str] = None,
+    ):
+        self.namespace = namespace
+        self.backend = backend
+        self.ttl = ttl
+        if serializer is not None and serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown serializer: {serializer}")
+        self._dumps, self._loads = SERIALIZERS[serializer] if serializer else (None, None)
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.invalidations = 0
+        self.errors = 0
+        # get_or_set latency: time to answer from cache vs. to compute on a miss
+        self.hit_seconds = 0.0
+        self.compute_seconds = 0.0
+        self.computes = 0
+        self.timed_hits = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value = self.backend.get(str(key))
+            if value is not MISSING and self._loads:
+                value = self._loads(value)
+        except Exception as exc:
+            self._backend_error("get", exc)
+            value = MISSING
+        if value is MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        tags: Iterable[str] = (),
+    ) -> None:
+        if self._dumps:
+            stored = self._dumps(value)
+            size = len(stored)
+        else:
+            stored = value
+            size = _approx_size(value)
+        try:
+            self.backend.set(str(key), stored, ttl if ttl is not None else self.ttl, tags, size)
+        except Exception as exc:
+            self._backend_error("set", exc)
+            return
+        self.sets += 1
+
+    def _backend_error(self, operation: str, exc: Exception) -> None:
+        self.errors += 1
+        logger.warning("Cache %s %s failed: %s: %s", self.namespace, operation, exc.__class__.__name__, exc)
+
+    def get_or_set(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        ttl: Optional[float] = None,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        started = time.perf_counter()
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = compute()
+            self.set(key, value, ttl=ttl, tags=tags)
+            self.compute_seconds += time.perf_counter() - started
+            self.computes += 1
+        else:
+            self.hit_seconds += time.perf_counter() - started
+            self.timed_hits += 1
+        return value
+
+    def delete(self, key: Hashable) -> bool:
+        return self.backend.delete(str(key))
+
+    def invalidate_tag(self, tag: str) -> int:
+        removed = self.backend.invalidate_tag(tag)
+        self.invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def on_invalidation(self, topic: str) -> None:
+        """Invalidation bus subscriber"""
+        if topic == ALL_TOPIC:
+            self.clear()
+        else:
+            self.invalidate_tag(topic)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        try:
+            entries = len(self.backend)
+        except Exception as exc:
+            self._backend_error("len", exc)
+            entries = None
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "sets": self.sets,
+            "evictions": getattr(self.backend, "evictions", None),
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "entries": entries,
+            "memory_bytes": getattr(self.backend, "memory_bytes", None),
+            "avg_compute_ms": round(self.compute_seconds * 1000 / self.computes, 3) if self.computes else None,
+            "avg_hit_ms": round(self.hit_seconds * 1000 / self.timed_hits, 3) if self.timed_hits else None,
+        }
+
+
+_caches: dict[str, Cache] = {}
+_caches_lock = threading.Lock()
+
+
+def _create_backend(namespace: str, max_size: int, policy: str):
+    kind = os.getenv("CACHE_BACKEND", "memory").lower()
+    if kind == "redis":
+        from app.services.cache_redis import RedisBackend
+
+        return RedisBackend.from_url(
+            os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"), namespace
+        )
+    return MemoryBackend(max_size=max_size, policy=policy)
+
+
+def get_cache(
+    namespace: str,
+    ttl: Optional[float] = None,
+    max_size: int = 1024,
+    policy: str = "lru",
+    serializer: Optional[str] = None,
+) -> Cache:
+    """Return the cache for a namespace, creating it on first use"""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            backend = _create_backend(namespace, max_size, policy)
+            # Shared stores need bytes; default to pickle when none was chosen
+            if serializer is None and getattr(backend, "requires_serializer", False):
+                serializer = "pickle"
+            cache = Cache(namespace, backend, ttl=ttl, serializer=serializer)
+            # A shared store is invalidated once by the publishing worker
+            if not getattr(backend, "shared", False):
+                get_bus().subscribe("", cache.on_invalidation)
+            _caches[namespace] = cache
+        return cache
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    """Statistics for every cache namespace"""
+    return {namespace: cache.stats() for namespace, cache in sorted(_caches.items())}
+
+
+def cache_health() -> dict[str, Any]:
+    """Backend reachability and overall hit ratio, without scanning entries"""
+    caches = list(_caches.values())
+    hits = sum(cache.hits for cache in caches)
+    lookups = hits + sum(cache.misses for cache in caches)
+    health = {
+        "status": "ok",
+        "backend": os.getenv("CACHE_BACKEND", "memory").lower(),
+        "namespaces": len(caches),
+        "hit_ratio": round(hits / lookups, 4) if lookups else None,
+    }
+    ping = next((cache.backend.ping for cache in caches if hasattr(cache.backend, "ping")), None)
+    if ping is not None:
+        started = time.perf_counter()
+        try:
+            ping()
+            health["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        except Exception as exc:
+            health.update(status="down", error=exc.__class__.__name__)
+    return health
+
+
+def clear_all_caches() -> None:
+    for cache in list(_caches.values()):
+        cache.clear()
+
+
+def cached(
+    namespace: str,
+    key: Optional[Callable[..., Hashable]] = None,
+    tags: Optional[Callable[..., Iterable[str]]] = None,
+    ttl: Optional[float] = None,
+    max_size: int = 1024,
+    policy: str = "lru",
+    serializer: Optional[str] = None,
+):
+    """
+    Cache a function's return value.
+    - key: builds the cache key from the call arguments (default: their repr)
+    - tags: builds invalidation tags from the call arguments
+    Exceptions are not cached.
+    """
+    cache = get_cache(namespace, ttl=ttl, max_size=max_size, policy=policy, serializer=serializer)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if key else repr((args, sorted(kwargs.items())))
+            return cache.get_or_set(
+                cache_key,
+                lambda: fn(*args, **kwargs),
+                tags=tags(*args, **kwargs) if tags else (),
+            )
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
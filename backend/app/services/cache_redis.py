@@ -0,0 +1,185 @@
+"""Redis-protocol cache backend.
+
+Speaks RESP directly over a socket, so it works with Redis, Valkey, KeyDB or
+any compatible server without an extra client dependency. Entries live under
+``cache:{namespace}:{key}``; each tag is a set of member keys so a tag can be
+invalidated without scanning the keyspace.
+"""
+
+import socket
+import threading
+from typing import Any, Iterable, Optional
+from urllib.parse import unquote, urlparse
+
+from app.services.cache import MISSING
+
+
+class RespError(Exception):
+    """Error reply from the server"""
+
+
+class RespClient:
+    """Minimal thread-safe RESP client with one connection per thread"""
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        timeout: float = 1.0,
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @classmethod
+    def from_url(cls, url: str) -> "RespClient":
+        parsed = urlparse(url)
+        db = int(parsed.path.lstrip("/") or 0)
+        password = unquote(parsed.password) if parsed.password else None
+        return cls(parsed.hostname or "localhost", parsed.port or 6379, db, password)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = (sock, sock.makefile("rb"))
+            self._local.conn = conn
+            if self.password:
+                self._call(conn, [("AUTH", self.password)])
+            if self.db:
+                self._call(conn, [("SELECT", self.db)])
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+            self._local.conn = None
+
+    def execute(self, *args) -> Any:
+        return self.pipeline([args])[0]
+
+    def pipeline(self, commands: list[tuple]) -> list[Any]:
+        """Send several commands in one write and read all replies"""
+        try:
+            return self._call(self._connection(), commands)
+        except (OSError, ConnectionError):
+            # Drop the broken connection so the next call reconnects
+            self.close()
+            raise
+
+    def _call(self, conn, commands: list[tuple]) -> list[Any]:
+        sock, reader = conn
+        sock.sendall(b"".join(self._encode(command) for command in commands))
+        replies = [self._read(reader) for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    @staticmethod
+    def _encode(args: tuple) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read(self, reader) -> Any:
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            return RespError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self._read(reader) for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply: {line!r}")
+
+
+class RedisBackend:
+    """Cache store shared by all workers through a Redis-protocol server"""
+
+    # Values must be bytes, and eviction/expiry are handled by the server
+    requires_serializer = True
+    shared = True
+
+    # Tag sets outlive short-lived entries; stale members are harmless on DEL
+    TAG_TTL_SECONDS = 86400
+
+    def __init__(self, client: RespClient, namespace: str, prefix: str = "cache"):
+        self.client = client
+        self.prefix = f"{prefix}:{namespace}:"
+
+    @classmethod
+    def from_url(cls, url: str, namespace: str) -> "RedisBackend":
+        return cls(RespClient.from_url(url), namespace)
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def get(self, key: str) -> Any:
+        value = self.client.execute("GET", self._key(key))
+        return MISSING if value is None else value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float], tags: Iterable[str], size: int) -> None:
+        full_key = self._key(key)
+        command = ("SET", full_key, value, "PX", int(ttl * 1000)) if ttl else ("SET", full_key, value)
+        commands = [command]
+        for tag in tags:
+            commands.append(("SADD", self._tag_key(tag), full_key))
+            tag_ttl = max(ttl or 0, self.TAG_TTL_SECONDS)
+            commands.append(("PEXPIRE", self._tag_key(tag), int(tag_ttl * 1000)))
+        self.client.pipeline(commands)
+
+    def delete(self, key: str) -> bool:
+        return bool(self.client.execute("DEL", self._key(key)))
+
+    def ping(self) -> None:
+        self.client.execute("PING")
+
+    def invalidate_tag(self, tag: str) -> int:
+        members = self.client.execute("SMEMBERS", self._tag_key(tag)) or []
+        self.client.execute("DEL", self._tag_key(tag), *members)
+        return len(members)
+
+    def _scan(self):
+        cursor = b"0"
+        while True:
+            cursor, keys = self.client.execute("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", 500)
+            yield from keys
+            if cursor in (b"0", "0"):
+                return
+
+    def clear(self) -> None:
+        keys = list(self._scan())
+        if keys:
+            self.client.execute("DEL", *keys)
+
+    def __len__(self) -> int:
+        tag_prefix = self._tag_key("").encode()
+        return sum(1 for key in self._scan() if not key.startswith(tag_prefix))
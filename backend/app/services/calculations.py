@@ -1,5 +1,7 @@
 """Service for nutritional calculations (BMR, TDEE, macros)"""
 
+from app.services.cache import cached
+
 
 def calculate_bmr(sex: str, age: int, height: int, weight: int) -> float:
     """
@@ -101,6 +103,7 @@ def calculate_macros(calories: int, weight: int, goal: str) -> dict:
     }
 
 
+@cached("nutrition_goals", max_size=256)
 def get_nutrition_goals(sex: str, age: int, height: int, weight: int, goal: str) -> dict:
     """
     Get complete nutrition goals for a user
@@ -0,0 +1,114 @@
+"""The dashboard's views of one day, computed from one shared set of rows.
+
+Served separately, the daily summary, weekly comparison, latest weight and
+weight trend each query the same calorie entries, exercises and weights (the
+daily summary then lazy-loads every entry's food item). Here the rows are
+read once: the entries for both weeks around the day with their food items,
+that window's exercises and the last few weigh-ins. Each view is built from
+them in memory. Goals are stored on the user row, which authentication has
+already loaded, so a dashboard costs three queries.
+"""
+
+import os
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import desc
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.exercise import ExerciseEntry
+from app.models.food_entry import CalorieEntry
+from app.models.user import User
+from app.models.weight_entry import WeightEntry
+from app.schemas.dashboard import DashboardResponse
+from app.schemas.user import NutritionGoalsResponse
+from app.schemas.weight_entry import WeightEntryResponse, WeightTrendData
+from app.services.goals import SOURCE_DEFAULT, get_user_goals
+from app.services.nutrition import NutritionService
+from app.services.weekly_comparison import build_weekly_comparison, week_bounds
+
+# Weigh-ins in the dashboard's trend sparkline
+WEIGHT_TREND_POINTS = int(os.getenv("DASHBOARD_WEIGHT_TREND_POINTS", "7"))
+
+
+def build_dashboard(user: User, target_date: date, db: Session) -> DashboardResponse:
+    _, window_end, window_start, _ = week_bounds(target_date)
+
+    entries = (
+        db.query(CalorieEntry)
+        .options(joinedload(CalorieEntry.food_item))
+        .filter(
+            CalorieEntry.user_id == user.id,
+            CalorieEntry.date >= window_start,
+            CalorieEntry.date <= window_end,
+        )
+        .order_by(CalorieEntry.id)
+        .all()
+    )
+    exercises = (
+        db.query(ExerciseEntry)
+        .filter(
+            ExerciseEntry.user_id == user.id,
+            ExerciseEntry.date >= window_start,
+            ExerciseEntry.date <= window_end,
+        )
+        .order_by(ExerciseEntry.id)
+        .all()
+    )
+    weights = (
+        db.query(WeightEntry)
+        .filter(WeightEntry.user_id == user.id)
+        .order_by(desc(WeightEntry.date), desc(WeightEntry.id))
+        .limit(WEIGHT_TREND_POINTS)
+        .all()
+    )
+
+    goals = get_user_goals(user, db)
+    summary = NutritionService.summarize_day(
+        target_date,
+        [entry for entry in entries if entry.date == target_date],
+        [ex for ex in exercises if ex.date == target_date],
+        NutritionService.goals_totals(goals),
+    )
+
+    return DashboardResponse(
+        date=target_date,
+        summary=summary,
+        goals=_goals_response(user, goals),
+        weekly_comparison=build_weekly_comparison(target_date, entries, exercises),
+        latest_weight=WeightEntryResponse.model_validate(weights[0]) if weights else None,
+        weight_trend=_weight_trend(weights),
+    )
+
+
+def _goals_response(user: User, goals: dict) -> Optional[NutritionGoalsResponse]:
+    if goals["source"] == SOURCE_DEFAULT:
+        return None
+    return NutritionGoalsResponse(
+        bmr=goals["bmr"],
+        tdee=goals["tdee"],
+        calories=goals["calories"],
+        protein=goals["protein_g"],
+        carbs=goals["carbs_g"],
+        fat=goals["fat_g"],
+        goal=user.goal or "maintain",
+    )
+
+
+def _weight_trend(latest_first: list[WeightEntry]) -> list[WeightTrendData]:
+    """Latest weigh-in per date, oldest first, with the change from the previous one"""
+    entries = []
+    seen = set()
+    for entry in latest_first:
+        if entry.date not in seen:
+            seen.add(entry.date)
+            entries.append(entry)
+    entries.reverse()
+
+    result = []
+    for i, entry in enumerate(entries):
+        change = None
+        if i > 0:
+            change = round(entry.weight - entries[i - 1].weight, 2)
+        result.append(WeightTrendData(date=entry.date, weight=entry.weight, change=change))
+    return result
@@ -0,0 +1,64 @@
+"""Full data export for a user, built by a background job.
+
+Serializing every entry a user ever logged is too slow to do while a
+request waits, so ``POST /profile/export`` queues an ``export.user_data``
+job and the finished export is read from the job's result.
+"""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.custom_food import CustomFood
+from app.models.exercise import ExerciseEntry
+from app.models.food_entry import CalorieEntry
+from app.models.user import User
+from app.models.weight_entry import WeightEntry
+from app.schemas.custom_food import CustomFoodResponse
+from app.schemas.exercise import ExerciseEntryResponse
+from app.schemas.food_entry import CalorieEntryResponse
+from app.schemas.user import UserResponse
+from app.schemas.weight_entry import WeightEntryResponse
+from app.services.jobs import PermanentJobError, job_handler
+
+EXPORT_JOB = "export.user_data"
+
+
+def build_user_export(db: Session, user: User) -> dict[str, Any]:
+    """Profile, food entries, exercises, weights and custom foods as JSON-ready data"""
+    entries = (
+        db.query(CalorieEntry)
+        .options(joinedload(CalorieEntry.food_item))
+        .filter(CalorieEntry.user_id == user.id)
+        .order_by(CalorieEntry.date, CalorieEntry.id)
+        .all()
+    )
+    exercises = (
+        db.query(ExerciseEntry)
+        .filter(ExerciseEntry.user_id == user.id)
+        .order_by(ExerciseEntry.date, ExerciseEntry.id)
+        .all()
+    )
+    weights = db.query(WeightEntry).filter(WeightEntry.user_id == user.id).order_by(WeightEntry.date).all()
+    custom_foods = db.query(CustomFood).filter(CustomFood.user_id == user.id).order_by(CustomFood.name).all()
+
+    def dump(schema, rows):
+        return [schema.model_validate(row, from_attributes=True).model_dump(mode="json") for row in rows]
+
+    return {
+        "exported_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "profile": UserResponse.model_validate(user).model_dump(mode="json"),
+        "food_entries": dump(CalorieEntryResponse, entries),
+        "exercises": dump(ExerciseEntryResponse, exercises),
+        "weights": dump(WeightEntryResponse, weights),
+        "custom_foods": dump(CustomFoodResponse, custom_foods),
+    }
+
+
+@job_handler(EXPORT_JOB)
+def export_user_data(db: Session, job) -> dict[str, Any]:
+    user = db.query(User).filter(User.id == job.user_id).first()
+    if not user:
+        raise PermanentJobError("User not found")
+    return build_user_export(db, user)
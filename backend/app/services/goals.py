@@ -0,0 +1,122 @@
+"""Service for resolving and persisting a user's daily nutrition goals.
+
+Goals are resolved once whenever the inputs change (profile, custom nutrition
+settings or the latest logged weight) and stored on the user row, so read
+paths such as the daily summary never re-run the BMR/TDEE pipeline.
+"""
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.services.calculations import get_nutrition_goals
+
+# Bump whenever the resolution rules below change so stored goals are refreshed.
+GOALS_VERSION = 1
+
+# Default daily nutrition goals used while the user profile is incomplete
+DEFAULT_GOALS = {
+    "calories": 2000,
+    "protein_g": 150,
+    "carbs_g": 250,
+    "fat_g": 65,
+    "fiber_g": 25,
+    "sodium_mg": 2300,
+}
+
+# Generic recommendations not derived from the profile
+FIBER_GOAL_G = 25
+SODIUM_GOAL_MG = 2300
+
+SOURCE_CUSTOM = "custom"
+SOURCE_CALCULATED = "calculated"
+SOURCE_DEFAULT = "default"
+
+
+def compute_goals(user: User) -> dict:
+    """
+    Compute nutrition goals from the user's profile and custom settings
+    Returns: dict with source, bmr, tdee and daily nutrient targets
+    """
+    # Custom nutrition settings take priority over calculated goals
+    if user.use_custom_nutrition and user.custom_calories:
+        protein_percent = user.custom_protein_percent or 0.25
+        carbs_percent = user.custom_carbs_percent or 0.50
+        fat_percent = user.custom_fat_percent or 0.25
+
+        return {
+            "source": SOURCE_CUSTOM,
+            "bmr": 0,  # Custom mode doesn't calculate BMR
+            "tdee": 0,  # Custom mode doesn't calculate TDEE
+            "calories": user.custom_calories,
+            "protein_g": round(user.custom_calories * protein_percent / 4),  # 4 cal per gram
+            "carbs_g": round(user.custom_calories * carbs_percent / 4),  # 4 cal per gram
+            "fat_g": round(user.custom_calories * fat_percent / 9),  # 9 cal per gram
+            "fiber_g": FIBER_GOAL_G,
+            "sodium_mg": SODIUM_GOAL_MG,
+        }
+
+    # Use calculated goals if user profile is complete
+    if user.sex and user.age and user.height and user.weight:
+        goals = get_nutrition_goals(
+            sex=user.sex,
+            age=user.age,
+            height=user.height,
+            weight=user.weight,
+            goal=user.goal or "maintain",
+        )
+        return {
+            "source": SOURCE_CALCULATED,
+            "bmr": goals["bmr"],
+            "tdee": goals["tdee"],
+            "calories": goals["calories"],
+            "protein_g": goals["protein"],
+            "carbs_g": goals["carbs"],
+            "fat_g": goals["fat"],
+            "fiber_g": FIBER_GOAL_G,
+            "sodium_mg": SODIUM_GOAL_MG,
+        }
+
+    return {"source": SOURCE_DEFAULT, "bmr": 0, "tdee": 0, **DEFAULT_GOALS}
+
+
+def refresh_user_goals(user: User) -> dict:
+    """Resolve goals for the user and store them on the user row (caller commits)"""
+    goals = compute_goals(user)
+    user.goals_source = goals["source"]
+    user.goal_bmr = goals["bmr"]
+    user.goal_tdee = goals["tdee"]
+    user.goal_calories = goals["calories"]
+    user.goal_protein_g = goals["protein_g"]
+    user.goal_carbs_g = goals["carbs_g"]
+    user.goal_fat_g = goals["fat_g"]
+    user.goal_fiber_g = goals["fiber_g"]
+    user.goal_sodium_mg = goals["sodium_mg"]
+    user.goals_version = GOALS_VERSION
+    return goals
+
+
+def get_user_goals(user: User, db: Optional[Session] = None) -> dict:
+    """
+    Return the stored goals for a user.
+    Rows written before goals were persisted (or by an older GOALS_VERSION)
+    are resolved once here and saved when a session is provided.
+    """
+    if user.goals_version != GOALS_VERSION:
+        goals = refresh_user_goals(user)
+        if db is not None:
+            db.commit()
+        return goals
+
+    return {
+        "source": user.goals_source,
+        "bmr": user.goal_bmr,
+        "tdee": user.goal_tdee,
+        "calories": user.goal_calories,
+        "protein_g": user.goal_protein_g,
+        "carbs_g": user.goal_carbs_g,
+        "fat_g": user.goal_fat_g,
+        "fiber_g": user.goal_fiber_g,
+        "sodium_mg": user.goal_sodium_mg,
+    }
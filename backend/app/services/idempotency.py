@@ -0,0 +1,169 @@
+"""Stored responses for POST requests sent with an ``Idempotency-Key``.
+
+A mobile client on a flaky connection cannot tell whether a timed-out
+``POST /nutrition/entries`` was applied, so it retries with the same key.
+The first request records the key with a hash of the request and, once
+handled, the response; a retry within ``IDEMPOTENCY_TTL_HOURS`` gets that
+response back instead of logging the entry twice. Keys are per caller (the
+username in the bearer token), so two users cannot collide.
+
+Rows live in the database so a retry that lands on another worker, or after
+a restart, still finds them. Expired rows are simply ignored on lookup; at
+most once per ``IDEMPOTENCY_PRUNE_INTERVAL`` seconds a worker deletes them
+with one indexed DELETE.
+"""
+
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+# An unfinished key whose request died (worker crash) is released after this
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+IDEMPOTENCY_PRUNE_INTERVAL = float(os.getenv("IDEMPOTENCY_PRUNE_INTERVAL", "300"))
+
+MAX_KEY_LENGTH = 255
+
+STARTED = "started"
+REPLAY = "replay"
+IN_PROGRESS = "in_progress"
+MISMATCH = "mismatch"
+
+
+def request_fingerprint(method: str, path: str, query_string: bytes, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query_string, body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class StoredResponse:
+    __slots__ = ("status_code", "headers", "body")
+
+    def __init__(self, status_code: int, headers: list[list[str]], body: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+
+class IdempotencyStore:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        ttl_hours: float = IDEMPOTENCY_TTL_HOURS,
+        lock_seconds: float = IDEMPOTENCY_LOCK_SECONDS,
+        prune_interval: float = IDEMPOTENCY_PRUNE_INTERVAL,
+    ):
+        self.session_factory = session_factory
+        self.ttl = timedelta(hours=ttl_hours)
+        self.lock = timedelta(seconds=lock_seconds)
+        self.prune_interval = prune_interval
+        self._last_prune = float("-inf")
+
+    def begin(self, caller: str, key: str, request_hash: str) -> tuple[str, Optional[StoredResponse]]:
+        """Claim ``key`` for this request, or say why it cannot run (replay, in progress, mismatch)"""
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            self._maybe_prune(db, now)
+            record = (
+                db.query(IdempotencyKey)
+                .filter(IdempotencyKey.caller == caller, IdempotencyKey.key == key)
+                .first()
+            )
+            if record is not None:
+                abandoned = record.status_code is None and record.locked_until <= now
+                if record.expires_at > now and not abandoned:
+                    if record.request_hash != request_hash:
+                        return MISMATCH, None
+                    if record.status_code is None:
+                        return IN_PROGRESS, None
+                    return REPLAY, StoredResponse(record.status_code, record.headers or [], record.body or b"")
+                db.delete(record)
+                db.flush()
+
+            db.add(
+                IdempotencyKey(
+                    caller=caller,
+                    key=key,
+                    request_hash=request_hash,
+                    created_at=now,
+                    locked_until=now + self.lock,
+                    expires_at=now + self.ttl,
+                )
+            )
+            try:
+                db.commit()
+            except IntegrityError:
+                # A concurrent request with the same key got there first
+                db.rollback()
+                return IN_PROGRESS, None
+            return STARTED, None
+        finally:
+            db.close()
+
+    def complete(self, caller: str, key: str, response: StoredResponse) -> None:
+        db = self.session_factory()
+        try:
+            db.query(IdempotencyKey).filter(
+                IdempotencyKey.caller == caller, IdempotencyKey.key == key
+            ).update(
+                {
+                    IdempotencyKey.status_code: response.status_code,
+                    IdempotencyKey.headers: response.headers,
+                    IdempotencyKey.body: response.body,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def release(self, caller: str, key: str) -> None:
+        """Forget an unfinished key so the client's retry runs the request again"""
+        db = self.session_factory()
+        try:
+            db.query(IdempotencyKey).filter(
+                IdempotencyKey.caller == caller,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None),
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _maybe_prune(self, db: Session, now: datetime) -> None:
+        if time.monotonic() - self._last_prune < self.prune_interval:
+            return
+        self._last_prune = time.monotonic()
+        self.prune(db, now)
+
+    @staticmethod
+    def prune(db: Session, now: Optional[datetime] = None) -> int:
+        deleted = (
+            db.query(IdempotencyKey)
+            .filter(IdempotencyKey.expires_at <= (now or datetime.utcnow()))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+
+_store: Optional[IdempotencyStore] = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    global _store
+    if _store is None:
+        from app.database import SessionLocal
+
+        _store = IdempotencyStore(SessionLocal)
+    return _store
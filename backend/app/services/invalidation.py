@@ -0,0 +1,329 @@
+"""Cross-worker cache invalidation bus.
+
+Write handlers publish topics such as ``user:{id}:day:{date}`` after they
+commit; every worker's caches subscribe to topic prefixes and drop the
+affected entries. Backends:
+
+- ``local``: in-process only (single worker).
+- ``sqlite``: workers sharing a SQLite file append to an ``invalidation_events``
+  table and poll it for rows written by other workers.
+- ``postgres``: ``NOTIFY`` on publish and a dedicated ``LISTEN`` connection
+  per worker.
+
+The backend is chosen with ``INVALIDATION_BUS`` (``auto`` picks ``postgres``
+for PostgreSQL databases and ``local`` otherwise).
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+# Delivered to every subscriber when a worker may have missed messages
+ALL_TOPIC = "*"
+
+NOTIFY_CHANNEL = "cache_invalidation"
+
+
+def user_day_topic(user_id: int, day: date) -> str:
+    return f"user:{user_id}:day:{day.isoformat()}"
+
+
+def user_profile_topic(user_id: int) -> str:
+    return f"user:{user_id}:profile"
+
+
+def user_weights_topic(user_id: int) -> str:
+    return f"user:{user_id}:weights"
+
+
+def user_custom_foods_topic(user_id: int) -> str:
+    return f"user:{user_id}:custom-foods"
+
+
+FOOD_ITEMS_TOPIC = "food-items"
+
+
+class InvalidationBus:
+    """In-process bus; base class for the cross-worker backends"""
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._subscribers: list[tuple[str, Callable[[str], None]]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, prefix: str, callback: Callable[[str], None]) -> None:
+        """Call ``callback(topic)`` for every topic starting with ``prefix``"""
+        with self._lock:
+            self._subscribers.append((prefix, callback))
+
+    def unsubscribe(self, callback: Callable[[str], None]) -> None:
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s[1] != callback]
+
+    def publish(self, *topics: str) -> None:
+        """Invalidate topics in this worker and forward them to the others"""
+        for topic in topics:
+            self._dispatch(topic)
+        try:
+            self._forward(topics)
+        except Exception:
+            # The write already committed; other workers fall back to cache TTLs
+            logger.exception("Failed to forward invalidation for %s", topics)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def reset_after_fork(self) -> None:
+        """Become a distinct publisher in a forked child.
+
+        A bus created before ``fork()`` (the server preloads the app, and the
+        caches subscribe at import) would otherwise carry the parent's origin
+        into every worker, and each would drop the others' events as its own.
+        """
+        self.origin = uuid.uuid4().hex
+        self._lock = threading.Lock()
+
+    def _forward(self, topics: tuple[str, ...]) -> None:
+        pass
+
+    def _dispatch(self, topic: str) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for prefix, callback in subscribers:
+            if topic == ALL_TOPIC or topic.startswith(prefix):
+                try:
+                    callback(topic)
+                except Exception:
+                    logger.exception("Invalidation subscriber failed for %s", topic)
+
+
+class SqlitePollingBus(InvalidationBus):
+    """Bus for workers sharing one SQLite file, using a polling table"""
+
+    def __init__(self, path: str, poll_interval: float = 0.5, retention_seconds: float = 300):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self._last_id = 0
+        self._last_prune = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ensure_table()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def _ensure_table(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS invalidation_events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "topic TEXT NOT NULL, "
+                "origin TEXT NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+        finally:
+            conn.close()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        conn = self._connect()
+        try:
+            self._last_id = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM invalidation_events"
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="invalidation-poller", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval * 4)
+            self._thread = None
+
+    def reset_after_fork(self) -> None:
+        super().reset_after_fork()
+        # The poller thread did not survive the fork; start() reads the cursor afresh
+        self._last_id = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _forward(self, topics: tuple[str, ...]) -> None:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.executemany(
+                "INSERT INTO invalidation_events (topic, origin, created_at) VALUES (?, ?, ?)",
+                [(topic, self.origin, now) for topic in topics],
+            )
+            # Keep the table small; every live worker has long since read old rows
+            if now - self._last_prune > self.retention_seconds:
+                self._last_prune = now
+                conn.execute(
+                    "DELETE FROM invalidation_events WHERE created_at < ?",
+                    (now - self.retention_seconds,),
+                )
+        finally:
+            conn.close()
+
+    def poll(self) -> int:
+        """Dispatch events written by other workers; returns how many were read"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, topic, origin FROM invalidation_events WHERE id > ? ORDER BY id",
+                (self._last_id,),
+            ).fetchall()
+        finally:
+            conn.close()
+        for event_id, topic, origin in rows:
+            self._last_id = event_id
+            if origin != self.origin:
+                self._dispatch(topic)
+        return len(rows)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except sqlite3.Error:
+                logger.exception("Invalidation poll failed")
+                self._dispatch(ALL_TOPIC)
+
+
+class PostgresNotifyBus(InvalidationBus):
+    """Bus backed by PostgreSQL LISTEN/NOTIFY"""
+
+    def __init__(self, engine, channel: str = NOTIFY_CHANNEL):
+        super().__init__()
+        self.engine = engine
+        self.channel = channel
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="invalidation-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def reset_after_fork(self) -> None:
+        super().reset_after_fork()
+        # The listener thread (and its connection) stays with the parent
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _forward(self, topics: tuple[str, ...]) -> None:
+        with self.engine.connect() as conn:
+            for topic in topics:
+                payload = json.dumps({"origin": self.origin, "topic": topic})
+                conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": self.channel, "payload": payload},
+                )
+            conn.commit()
+
+    def _run(self) -> None:
+        import psycopg
+
+        dsn = self.engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(dsn, autocommit=True) as conn:
+                    conn.execute(f'LISTEN "{self.channel}"')
+                    while not self._stop.is_set():
+                        for notify in conn.notifies(timeout=1.0):
+                            self._handle(notify.payload)
+            except Exception:
+                logger.exception("Invalidation listener disconnected")
+                # Anything published while we were away is lost, so flush everything
+                self._dispatch(ALL_TOPIC)
+                self._stop.wait(1.0)
+
+    def _handle(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("origin") != self.origin:
+            self._dispatch(message.get("topic", ALL_TOPIC))
+
+
+def create_bus(kind: Optional[str] = None) -> InvalidationBus:
+    """Build the bus configured by INVALIDATION_BUS"""
+    from app.database import DATABASE_URL, engine
+
+    kind = (kind or os.getenv("INVALIDATION_BUS", "auto")).lower()
+    url = make_url(DATABASE_URL)
+    if kind == "auto":
+        kind = "postgres" if url.get_backend_name() == "postgresql" else "local"
+
+    if kind == "postgres":
+        return PostgresNotifyBus(engine)
+    if kind == "sqlite":
+        if url.get_backend_name() != "sqlite" or not url.database:
+            raise ValueError("INVALIDATION_BUS=sqlite requires a SQLite file DATABASE_URL")
+        interval = float(os.getenv("INVALIDATION_POLL_INTERVAL", "0.5"))
+        return SqlitePollingBus(url.database, poll_interval=interval)
+    return InvalidationBus()
+
+
+_bus: Optional[InvalidationBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_bus() -> InvalidationBus:
+    """Return the process-wide invalidation bus"""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = create_bus()
+    return _bus
+
+
+def _reset_after_fork() -> None:
+    global _bus_lock
+    _bus_lock = threading.Lock()
+    if _bus is not None:
+        _bus.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def publish(*topics: str) -> None:
+    """Publish invalidation topics on the process-wide bus"""
+    get_bus().publish(*topics)
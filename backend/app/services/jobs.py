@@ -0,0 +1,299 @@
+"""Database-backed background jobs.
+
+Work that should not hold a request open (data exports, USDA prefetches) is
+written to the ``jobs`` table by ``enqueue`` and answered with 202; the
+client polls ``GET /jobs/{id}`` for the status and result. Queued jobs
+survive restarts.
+
+Each worker process runs ``JOB_WORKERS`` threads that claim due jobs with a
+conditional UPDATE (so two processes never run the same attempt, on SQLite
+or PostgreSQL alike) and hold them under a ``JOB_LEASE_SECONDS`` lease. A job
+whose worker died is taken over once its lease expires, so the lease must
+outlast the slowest job. Failures are retried
+with exponential back-off (``JOB_RETRY_BASE_SECONDS`` doubling, capped at
+``JOB_RETRY_MAX_SECONDS``) up to the job's ``max_attempts``; handlers raise
+``PermanentJobError`` for failures a retry cannot fix. Finished jobs are
+deleted after ``JOB_RETENTION_DAYS``.
+
+Handlers are registered with ``@job_handler(kind)`` by the module owning the
+work and receive ``(db, job)``; their return value is stored as the result.
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.models.job import Job
+from app.services.metrics import job_duration, job_runs
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "900"))
+JOB_RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", "7"))
+
+# How often a pool deletes finished jobs past retention
+PRUNE_INTERVAL = 3600.0
+
+
+class PermanentJobError(Exception):
+    """A failure retrying cannot fix; the job fails without using its remaining attempts"""
+
+
+HANDLERS: dict[str, Callable[[Session, Job], Any]] = {}
+
+
+def job_handler(kind: str):
+    """Register ``fn(db, job)`` to run jobs of ``kind``"""
+
+    def decorator(fn):
+        HANDLERS[kind] = fn
+        return fn
+
+    return decorator
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[dict] = None,
+    user_id: Optional[int] = None,
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+    delay: float = 0.0,
+) -> Job:
+    """Queue a job (committing it) and wake this process's workers"""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind {kind!r}")
+    job = Job(
+        kind=kind,
+        user_id=user_id,
+        payload=payload or {},
+        status=QUEUED,
+        max_attempts=max_attempts,
+        run_at=datetime.utcnow() + timedelta(seconds=delay),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    get_job_pool().notify()
+    return job
+
+
+def retry_delay(attempts: int) -> float:
+    """Back-off before the next attempt, with jitter so retries do not arrive together"""
+    delay = min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(1.0, 1.25)
+
+
+def _due(now: datetime):
+    return or_(
+        and_(Job.status == QUEUED, Job.run_at <= now),
+        # A running job whose lease ran out: its worker crashed or was killed
+        and_(Job.status == RUNNING, Job.lease_expires_at < now),
+    )
+
+
+def claim(db: Session, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> Optional[Job]:
+    """Lease the next due job to ``worker_id``; None when nothing is due"""
+    now = datetime.utcnow()
+    candidates = db.query(Job.id).filter(_due(now)).order_by(Job.run_at, Job.id).limit(5).all()
+    for (job_id,) in candidates:
+        # Only one worker's UPDATE can match while the job is still due
+        claimed = (
+            db.query(Job)
+            .filter(Job.id == job_id, _due(now))
+            .update(
+                {
+                    Job.status: RUNNING,
+                    Job.locked_by: worker_id,
+                    Job.lease_expires_at: now + timedelta(seconds=lease_seconds),
+                    Job.attempts: Job.attempts + 1,
+                    Job.started_at: now,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            return db.get(Job, job_id)
+    return None
+
+
+def _finish(db: Session, job: Job, worker_id: str, values: dict) -> bool:
+    # Guarded by the lease holder, so a worker that lost its lease cannot overwrite the new attempt
+    updated = (
+        db.query(Job)
+        .filter(Job.id == job.id, Job.status == RUNNING, Job.locked_by == worker_id)
+        .update({**values, Job.locked_by: None, Job.lease_expires_at: None}, synchronize_session=False)
+    )
+    db.commit()
+    if not updated:
+        logger.warning("Job %s (%s) lost its lease to another worker; result dropped", job.id, job.kind)
+    return bool(updated)
+
+
+def run_job(db: Session, job: Job, worker_id: str) -> str:
+    """Run a claimed job and record the outcome: succeeded, retried or failed"""
+    handler = HANDLERS.get(job.kind)
+    retry = False
+    if handler is None:
+        error = f"Unknown job kind {job.kind!r}"
+    elif job.attempts > job.max_attempts:
+        # The worker running its final attempt died holding the lease
+        error = "Lease expired on the final attempt"
+    else:
+        started = time.perf_counter()
+        try:
+            result = handler(db, job)
+            error = None
+        except PermanentJobError as exc:
+            db.rollback()
+            error = str(exc) or exc.__class__.__name__
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+            error = f"{exc.__class__.__name__}: {exc}"
+            retry = job.attempts < job.max_attempts
+        job_duration.labels(job.kind).observe(time.perf_counter() - started)
+
+    now = datetime.utcnow()
+    if error is None:
+        outcome = SUCCEEDED
+        values = {Job.status: SUCCEEDED, Job.result: result, Job.error: None, Job.finished_at: now}
+    elif retry:
+        outcome = "retried"
+        values = {Job.status: QUEUED, Job.error: error, Job.run_at: now + timedelta(seconds=retry_delay(job.attempts))}
+    else:
+        outcome = FAILED
+        values = {Job.status: FAILED, Job.error: error, Job.finished_at: now}
+    _finish(db, job, worker_id, values)
+    job_runs.labels(job.kind, outcome).inc()
+    return outcome
+
+
+def prune_jobs(db: Session, retention_days: float = JOB_RETENTION_DAYS) -> int:
+    """Delete finished jobs older than the retention period"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = (
+        db.query(Job)
+        .filter(Job.status.in_((SUCCEEDED, FAILED)), Job.finished_at < cutoff)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
+
+
+class JobWorkerPool:
+    """Threads in this process that claim and run due jobs"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        workers: int = JOB_WORKERS,
+        poll_interval: float = JOB_POLL_INTERVAL,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._last_prune = 0.0
+
+    def start(self) -> None:
+        if self._threads or self.workers <= 0:
+            return
+        # Worker ids carry the pid, so they must be taken in the process that runs the threads
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop.clear()
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._run, args=(n,), name=f"job-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def run_once(self, worker: int = 0) -> Optional[str]:
+        """Claim and run one due job; returns its outcome, or None when nothing was due"""
+        worker_id = f"{self.name}:{worker}"
+        db = self.session_factory()
+        try:
+            job = claim(db, worker_id, self.lease_seconds)
+            if job is None:
+                return None
+            return run_job(db, job, worker_id)
+        finally:
+            db.close()
+
+    def run_pending(self) -> int:
+        """Run due jobs until none are left; returns how many ran"""
+        count = 0
+        while self.run_once() is not None:
+            count += 1
+        return count
+
+    def _maybe_prune(self) -> None:
+        if time.monotonic() - self._last_prune < PRUNE_INTERVAL:
+            return
+        self._last_prune = time.monotonic()
+        db = self.session_factory()
+        try:
+            prune_jobs(db)
+        finally:
+            db.close()
+
+    def _run(self, worker: int) -> None:
+        while not self._stop.is_set():
+            try:
+                if worker == 0:
+                    self._maybe_prune()
+                if self.run_once(worker) is not None:
+                    continue
+            except Exception:
+                logger.exception("Job worker %s failed", worker)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+
+_pool: Optional[JobWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_job_pool() -> JobWorkerPool:
+    """Return the process-wide job worker pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from app.database import SessionLocal
+
+                _pool = JobWorkerPool(SessionLocal)
+    return _pool
@@ -0,0 +1,225 @@
+"""Per-route-group concurrency limits with bounded queues.
+
+Sync handlers all share one threadpool (40 threads by default), so under a
+spike requests pile up in front of it until clients time out. Each route
+group instead admits at most ``limit`` requests at a time and lets up to
+``queue`` more wait (for at most ``LOAD_SHED_MAX_WAIT`` seconds); anything
+beyond is shed straight away with 503 + Retry-After.
+
+Cheap core endpoints (daily summary, entry writes) have priority: the
+low-priority groups (USDA proxy, sign-in, analytics) may only use
+``LOAD_SHED_CAPACITY - LOAD_SHED_RESERVE`` of the shared capacity, and freed
+slots go to waiting core requests first. Limits are ``"<limit>/<queue>"``,
+e.g. ``CONCURRENCY_USDA="8/16"``.
+
+Admission runs on the event loop, so the state needs no locks.
+"""
+
+import asyncio
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+HIGH = 0
+LOW = 1
+
+QUEUE_FULL = "queue_full"
+TIMEOUT = "timeout"
+
+LOAD_SHED_CAPACITY = int(os.getenv("LOAD_SHED_CAPACITY", "40"))
+LOAD_SHED_RESERVE = int(os.getenv("LOAD_SHED_RESERVE", "8"))
+LOAD_SHED_MAX_WAIT = float(os.getenv("LOAD_SHED_MAX_WAIT", "5"))
+LOAD_SHED_RETRY_AFTER = int(os.getenv("LOAD_SHED_RETRY_AFTER", "1"))
+
+
+@dataclass(frozen=True)
+class ConcurrencyGroup:
+    name: str
+    limit: int
+    queue: int
+    methods: frozenset
+    prefixes: tuple
+    priority: int
+
+    def matches(self, method: str, path: str) -> bool:
+        return method in self.methods and path.startswith(self.prefixes)
+
+
+def parse_concurrency(value: str) -> tuple[int, int]:
+    """Parse ``"<limit>/<queue>"`` into (limit, queue)"""
+    limit, _, queue = value.partition("/")
+    parsed = int(limit), int(queue or 0)
+    if parsed[0] <= 0 or parsed[1] < 0:
+        raise ValueError(f"Invalid concurrency limit {value!r}")
+    return parsed
+
+
+ALL_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE"})
+
+
+def configured_groups() -> list[ConcurrencyGroup]:
+    """Route groups in match order; requests matching none (health, metrics) are never limited"""
+    usda = parse_concurrency(os.getenv("CONCURRENCY_USDA", "8/16"))
+    auth = parse_concurrency(os.getenv("CONCURRENCY_AUTH", "8/32"))
+    analytics = parse_concurrency(os.getenv("CONCURRENCY_ANALYTICS", "8/16"))
+    core = parse_concurrency(os.getenv("CONCURRENCY_CORE", "32/128"))
+    return [
+        ConcurrencyGroup("usda", *usda, ALL_METHODS, ("/nutrition/usda", "/nutrition/food-items/usda"), LOW),
+        ConcurrencyGroup(
+            "auth", *auth, frozenset({"POST"}), ("/auth/login", "/auth/register", "/auth/refresh"), LOW
+        ),
+        ConcurrencyGroup(
+            "analytics",
+            *analytics,
+            frozenset({"GET"}),
+            ("/profile/weekly-comparison", "/weights/history", "/nutrition/food-items"),
+            LOW,
+        ),
+        ConcurrencyGroup(
+            "core",
+            *core,
+            ALL_METHODS,
+            ("/nutrition", "/profile", "/weights", "/exercises", "/auth", "/dashboard", "/batch"),
+            HIGH,
+        ),
+    ]
+
+
+class _GroupState:
+    __slots__ = ("in_flight", "waiters", "admitted", "shed")
+
+    def __init__(self):
+        self.in_flight = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.shed: dict[str, int] = {QUEUE_FULL: 0, TIMEOUT: 0}
+
+
+class ConcurrencyLimiter:
+    def __init__(
+        self,
+        groups: list[ConcurrencyGroup],
+        capacity: int = LOAD_SHED_CAPACITY,
+        reserve: int = LOAD_SHED_RESERVE,
+        max_wait: float = LOAD_SHED_MAX_WAIT,
+        enabled: bool = True,
+    ):
+        self.groups = groups
+        self.capacity = capacity
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.enabled = enabled
+        self.in_flight = 0
+        self._states = {group.name: _GroupState() for group in groups}
+        self._by_priority = sorted(groups, key=lambda group: group.priority)
+
+    def group_for(self, method: str, path: str) -> Optional[ConcurrencyGroup]:
+        if not self.enabled:
+            return None
+        for group in self.groups:
+            if group.matches(method, path):
+                return group
+        return None
+
+    def _has_room(self, group: ConcurrencyGroup) -> bool:
+        if self._states[group.name].in_flight >= group.limit:
+            return False
+        ceiling = self.capacity if group.priority == HIGH else self.capacity - self.reserve
+        return self.in_flight < ceiling
+
+    def _must_queue(self, group: ConcurrencyGroup) -> bool:
+        # Newcomers do not overtake their own group's queue, nor higher-priority
+        # requests queued for shared capacity (rather than their group's limit)
+        if self._states[group.name].waiters:
+            return True
+        for other in self._by_priority:
+            if other.priority >= group.priority:
+                break
+            state = self._states[other.name]
+            if state.waiters and state.in_flight < other.limit:
+                return True
+        return False
+
+    def _admit(self, group: ConcurrencyGroup) -> None:
+        state = self._states[group.name]
+        state.in_flight += 1
+        state.admitted += 1
+        self.in_flight += 1
+
+    async def acquire(self, group: ConcurrencyGroup) -> Optional[str]:
+        """Take a slot; returns None once admitted, else why the request was shed"""
+        state = self._states[group.name]
+        if not self._must_queue(group) and self._has_room(group):
+            self._admit(group)
+            return None
+        if len(state.waiters) >= group.queue:
+            state.shed[QUEUE_FULL] += 1
+            return QUEUE_FULL
+
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                return None  # granted a slot just as the wait ran out
+            self._discard(state, waiter)
+            state.shed[TIMEOUT] += 1
+            return TIMEOUT
+        except asyncio.CancelledError:
+            # Client went away; hand the slot on if it had already been granted
+            if waiter.done() and not waiter.cancelled():
+                self.release(group)
+            self._discard(state, waiter)
+            raise
+        return None
+
+    @staticmethod
+    def _discard(state: _GroupState, waiter: asyncio.Future) -> None:
+        try:
+            state.waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, group: ConcurrencyGroup) -> None:
+        self._states[group.name].in_flight -= 1
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        # Highest priority first, so freed capacity goes to core requests
+        for group in self._by_priority:
+            waiters = self._states[group.name].waiters
+            while waiters and self._has_room(group):
+                waiter = waiters.popleft()
+                if waiter.done():
+                    continue
+                self._admit(group)
+                waiter.set_result(None)
+
+    def stats(self) -> dict[str, dict]:
+        stats = {}
+        for group in self.groups:
+            state = self._states[group.name]
+            stats[group.name] = {
+                "limit": group.limit,
+                "queue": group.queue,
+                "in_flight": state.in_flight,
+                "waiting": len(state.waiters),
+                "admitted": state.admitted,
+                "shed": dict(state.shed),
+            }
+        return stats
+
+
+_limiter: Optional[ConcurrencyLimiter] = None
+
+
+def get_concurrency_limiter() -> ConcurrencyLimiter:
+    global _limiter
+    if _limiter is None:
+        enabled = os.getenv("LOAD_SHEDDING_ENABLED", "true").lower() in {"1", "true", "yes"}
+        _limiter = ConcurrencyLimiter(configured_groups(), enabled=enabled)
+    return _limiter
+
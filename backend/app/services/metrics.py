@@ -0,0 +1,209 @@
+"""Application metrics served at ``/metrics``.
+
+Request, query, USDA, password-hashing and background job latencies are
+recorded where they happen through the instruments below. Cache, pool, circuit breaker, hashing
+queue and warm-up figures already live in their services and are read at
+scrape time by the collectors registered in ``install_metrics``.
+"""
+
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.services.slow_queries import get_slow_query_log
+from app.utils import server_timing
+from app.utils.metrics import REGISTRY, CollectedMetric
+
+http_requests = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+http_request_duration = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+
+load_shed = REGISTRY.counter(
+    "load_shed_total", "Requests rejected with 503 by route-group concurrency limits", ("group", "reason")
+)
+load_queue_wait = REGISTRY.histogram(
+    "load_queue_wait_seconds", "Time spent waiting for a route-group concurrency slot", ("group",),
+    buckets=(0.0005, 0.005, 0.05, 0.25, 1.0, 2.5, 5.0, 10.0),
+)
+
+db_statements = REGISTRY.counter("db_statements_total", "SQL statements executed", ("operation",))
+db_statement_duration = REGISTRY.histogram(
+    "db_statement_duration_seconds", "SQL statement latency", ("operation",)
+)
+db_slow_statements = REGISTRY.counter(
+    "db_slow_statements_total", "SQL statements slower than SLOW_QUERY_MS (see the slow query log)"
+)
+
+usda_request_duration = REGISTRY.histogram(
+    "usda_request_duration_seconds", "USDA FoodData Central request latency", ("endpoint",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+usda_errors = REGISTRY.counter(
+    "usda_errors_total", "Failed USDA requests by kind (transport, server, throttled, client, decode)", ("endpoint", "kind")
+)
+
+password_hash_duration = REGISTRY.histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify time including queueing", ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+job_runs = REGISTRY.counter(
+    "job_runs_total", "Background job attempts by outcome (succeeded, retried, failed)", ("kind", "outcome")
+)
+job_duration = REGISTRY.histogram(
+    "job_duration_seconds", "Background job handler run time", ("kind",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0),
+)
+
+_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+_db_children = {
+    operation: (db_statements.labels(operation), db_statement_duration.labels(operation))
+    for operation in _OPERATIONS + ("OTHER",)
+}
+
+
+def _statement_children(statement: str):
+    operation = statement.lstrip()[:6].upper()
+    return _db_children.get(operation) or _db_children["OTHER"]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+    count, duration = _statement_children(statement)
+    count.inc()
+    duration.observe(elapsed)
+    server_timing.record(server_timing.DB, elapsed)
+    slow_queries = get_slow_query_log()
+    if elapsed >= slow_queries.threshold:
+        db_slow_statements.inc()
+        slow_queries.record(conn, statement, parameters, executemany, elapsed)
+
+
+def _cache_metrics():
+    from app.services.cache import cache_stats
+
+    stats = cache_stats()
+    families = [
+        ("cache_hits_total", "counter", "Cache hits", "hits"),
+        ("cache_misses_total", "counter", "Cache misses", "misses"),
+        ("cache_hit_ratio", "gauge", "Cache hits / lookups since start", "hit_ratio"),
+        ("cache_evictions_total", "counter", "Entries evicted to respect max size", "evictions"),
+        ("cache_errors_total", "counter", "Backend errors answered as a miss or a dropped write", "errors"),
+        ("cache_entries", "gauge", "Entries currently cached", "entries"),
+    ]
+    for name, kind, documentation, key in families:
+        yield CollectedMetric(
+            name, kind, documentation,
+            [(name, (("cache", namespace),), values[key]) for namespace, values in stats.items()
+             if values.get(key) is not None],
+        )
+
+
+def _pool_metrics():
+    from app.database import engine
+
+    pool = engine.pool
+    for name, method, documentation in (
+        ("db_pool_size", "size", "Configured connection pool size"),
+        ("db_pool_checked_out", "checkedout", "Connections currently in use"),
+        ("db_pool_overflow", "overflow", "Connections opened beyond the pool size"),
+    ):
+        if hasattr(pool, method):
+            yield CollectedMetric(name, "gauge", documentation, [(name, (), getattr(pool, method)())])
+
+
+def _usda_metrics():
+    from app.services.usda import UsdaService
+    from app.utils.circuit_breaker import OPEN
+
+    breaker = UsdaService.breaker_stats()
+    coalescing = UsdaService.coalescing_stats()
+    yield CollectedMetric(
+        "usda_circuit_open", "gauge", "1 while the USDA circuit breaker is open",
+        [("usda_circuit_open", (), 1 if breaker["state"] == OPEN else 0)],
+    )
+    yield CollectedMetric(
+        "usda_circuit_rejected_total", "counter", "USDA calls refused while the circuit was open",
+        [("usda_circuit_rejected_total", (), breaker["rejected"])],
+    )
+    yield CollectedMetric(
+        "usda_upstream_calls_total", "counter", "USDA calls made after coalescing identical lookups",
+        [("usda_upstream_calls_total", (), coalescing["executions"])],
+    )
+    yield CollectedMetric(
+        "usda_coalesced_total", "counter", "USDA lookups served by joining an in-flight call",
+        [("usda_coalesced_total", (), coalescing["coalesced"])],
+    )
+
+
+def _password_hash_metrics():
+    from app.services.password_hasher import get_hasher
+
+    stats = get_hasher().stats()
+    yield CollectedMetric("bcrypt_rounds", "gauge", "Configured bcrypt cost", [("bcrypt_rounds", (), stats["rounds"])])
+    yield CollectedMetric(
+        "password_hash_pending", "gauge", "Hashes queued or running",
+        [("password_hash_pending", (), stats["pending"])],
+    )
+    yield CollectedMetric(
+        "password_hash_rejected_total", "counter", "Sign-ins rejected because the hashing queue was full",
+        [("password_hash_rejected_total", (), stats["rejected"])],
+    )
+
+
+def _load_shedding_metrics():
+    from app.services.load_shedding import get_concurrency_limiter
+
+    stats = get_concurrency_limiter().stats()
+    for name, key, documentation in (
+        ("concurrency_in_flight", "in_flight", "Requests holding a route-group concurrency slot"),
+        ("concurrency_waiting", "waiting", "Requests queued for a route-group concurrency slot"),
+    ):
+        yield CollectedMetric(
+            name, "gauge", documentation, [(name, (("group", group),), values[key]) for group, values in stats.items()]
+        )
+
+
+def _warmup_metrics():
+    from app.services.warmup import warmup_stats
+
+    stats = warmup_stats()
+    yield CollectedMetric(
+        "login_warmup_runs_total", "counter", "Post-login view warm-ups started",
+        [("login_warmup_runs_total", (), stats["runs"])],
+    )
+    yield CollectedMetric(
+        "login_warmup_failures_total", "counter", "Post-login view warm-ups that raised",
+        [("login_warmup_failures_total", (), stats["failures"])],
+    )
+
+
+_installed = False
+
+
+def install_metrics() -> None:
+    """Hook SQLAlchemy statement timing (metrics, Server-Timing, slow query log)
+    and register scrape-time collectors (idempotent)"""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    for collector in (
+        _cache_metrics,
+        _pool_metrics,
+        _usda_metrics,
+        _password_hash_metrics,
+        _load_shedding_metrics,
+        _warmup_metrics,
+    ):
+        REGISTRY.add_collector(collector)
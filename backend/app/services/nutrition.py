@@ -1,7 +1,8 @@
 from datetime import date, datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session, joinedload
 
-from app.models.food_entry import CalorieEntry, MealType
+from app.models.food_entry import GRAM_UNITS, CalorieEntry, FoodItem, MealType
 from app.models.exercise import ExerciseEntry
 from app.models.user import User
 from app.schemas.food_entry import (
@@ -9,20 +10,13 @@ from app.schemas.food_entry import (
     MealSummary,
     DailyNutritionSummary,
 )
-from app.services.calculations import get_nutrition_goals
+from app.services.goals import DEFAULT_GOALS, get_user_goals
 
 
 
 class NutritionService:
-    # Default daily nutrition goals (can be personalized later based on user profile)
-    DEFAULT_GOALS = {
-        "calories": 2000,
-        "protein_g": 150,
-        "carbs_g": 250,
-        "fat_g": 65,
-        "fiber_g": 25,
-        "sodium_mg": 2300,
-    }
+    # Default daily nutrition goals used while the user profile is incomplete
+    DEFAULT_GOALS = DEFAULT_GOALS
 
     @staticmethod
     def calculate_daily_nutrition(
@@ -55,33 +49,126 @@ class NutritionService:
             .all()
         )
 
-        # Group entries by meal type
-        meals_by_type = {}
-        for meal_type in MealType:
-            meals_by_type[meal_type] = [
-                e for e in entries if e.meal_type == meal_type
-            ]
+        goals = NutritionService._resolve_goals(user, db)
+        return NutritionService.summarize_day(target_date, entries, exercises, goals)
 
-        # Calculate totals
+    @staticmethod
+    def summarize_day(
+        target_date: date,
+        entries: list[CalorieEntry],
+        exercises: list[ExerciseEntry],
+        goals: NutritionTotals,
+    ) -> DailyNutritionSummary:
+        """Build the daily summary from the day's already-loaded entries and exercises"""
         actual_intake = NutritionService._calculate_totals(entries)
-        # Build meals summary
+        actual_consumption = NutritionService._consumption(
+            ExerciseEntry.get_total_calories_burned(exercises)
+        )
+        return DailyNutritionSummary(
+            date=target_date,
+            goals=goals,
+            actual_intake=actual_intake,
+            actual_consumption=actual_consumption,
+            remaining=NutritionService._remaining(goals, actual_intake, actual_consumption),
+            meals=NutritionService._meal_summaries(entries),
+            exercises=NutritionService._serialize_exercises(exercises),
+        )
+
+    @staticmethod
+    def calculate_daily_sections(
+        user: User, target_date: date, db: Session, sections: set[str]
+    ) -> DailyNutritionSummary:
+        """Daily summary with only ``sections`` (top-level fields) computed.
+
+        Runs only the queries those sections need: none for ``goals``, SUM
+        aggregates for the totals, and row loads only for ``meals`` and
+        ``exercises``. The other fields are left unset, so encode the result
+        with an ``include`` that leaves them out.
+        """
+        entries = exercises = None
+        if "meals" in sections:
+            entries = (
+                db.query(CalorieEntry)
+                .options(joinedload(CalorieEntry.food_item))
+                .filter(CalorieEntry.user_id == user.id, CalorieEntry.date == target_date)
+                .all()
+            )
+        if "exercises" in sections:
+            exercises = (
+                db.query(ExerciseEntry)
+                .filter(ExerciseEntry.user_id == user.id, ExerciseEntry.date == target_date)
+                .all()
+            )
+
+        values = {"date": target_date}
+        if sections & {"goals", "remaining"}:
+            values["goals"] = NutritionService._resolve_goals(user, db)
+        if sections & {"actual_intake", "remaining"}:
+            values["actual_intake"] = (
+                NutritionService._calculate_totals(entries)
+                if entries is not None
+                else NutritionService._sum_intake(user.id, target_date, db)
+            )
+        if sections & {"actual_consumption", "remaining"}:
+            if exercises is not None:
+                burned = ExerciseEntry.get_total_calories_burned(exercises)
+            else:
+                burned = db.query(func.coalesce(func.sum(ExerciseEntry.calories_burned), 0)).filter(
+                    ExerciseEntry.user_id == user.id, ExerciseEntry.date == target_date
+                ).scalar()
+            values["actual_consumption"] = NutritionService._consumption(burned)
+        if "remaining" in sections:
+            values["remaining"] = NutritionService._remaining(
+                values["goals"], values["actual_intake"], values["actual_consumption"]
+            )
+        if entries is not None:
+            values["meals"] = NutritionService._meal_summaries(entries)
+        if exercises is not None:
+            values["exercises"] = NutritionService._serialize_exercises(exercises)
+        return DailyNutritionSummary.model_construct(**values)
+
+    @staticmethod
+    def _sum_intake(user_id: int, target_date: date, db: Session) -> NutritionTotals:
+        """The day's intake totals as one aggregate query (mirrors ``CalorieEntry.get_totals``)"""
+        gram_based = and_(
+            func.lower(func.coalesce(CalorieEntry.unit, "serving")).in_(GRAM_UNITS),
+            FoodItem.serving_size_grams.isnot(None),
+            FoodItem.serving_size_grams != 0,
+        )
+        multiplier = case(
+            (gram_based, CalorieEntry.quantity / FoodItem.serving_size_grams),
+            else_=CalorieEntry.quantity,
+        )
+        keys = ("calories", "protein_g", "carbs_g", "fat_g", "fiber_g", "sodium_mg")
+        row = (
+            db.query(*(func.coalesce(func.sum(getattr(FoodItem, key) * multiplier), 0) for key in keys))
+            .join(FoodItem, CalorieEntry.food_item)
+            .filter(CalorieEntry.user_id == user_id, CalorieEntry.date == target_date)
+            .one()
+        )
+        return NutritionTotals(**dict(zip(keys, row)))
+
+    @staticmethod
+    def _meal_summaries(entries: list[CalorieEntry]) -> list[MealSummary]:
+        """Entries grouped by meal type, in meal order, with per-meal totals"""
         meals = []
         for meal_type in MealType:
-            meal_entries = meals_by_type[meal_type]
+            meal_entries = [e for e in entries if e.meal_type == meal_type]
             if meal_entries:
-                meal_totals = NutritionService._calculate_totals(meal_entries)
                 meals.append(
                     MealSummary(
                         meal_type=meal_type,
                         entries=meal_entries,
-                        totals=meal_totals,
+                        totals=NutritionService._calculate_totals(meal_entries),
                     )
                 )
+        return meals
 
-        # Calculate exercise consumption
-        total_calories_burned = ExerciseEntry.get_total_calories_burned(exercises)
-        actual_consumption = NutritionTotals(
-            calories=total_calories_burned,
+    @staticmethod
+    def _consumption(calories_burned: float) -> NutritionTotals:
+        """Exercise consumption; only calories are tracked"""
+        return NutritionTotals(
+            calories=calories_burned,
             protein_g=0,
             carbs_g=0,
             fat_g=0,
@@ -89,9 +176,12 @@ class NutritionService:
             sodium_mg=0,
         )
 
-        goals = NutritionService._resolve_goals(user)
-
-        remaining = NutritionTotals(
+    @staticmethod
+    def _remaining(
+        goals: NutritionTotals, actual_intake: NutritionTotals, actual_consumption: NutritionTotals
+    ) -> NutritionTotals:
+        """goals - actual_intake + actual_consumption, floored at zero"""
+        return NutritionTotals(
             calories=max(
                 0, goals.calories - actual_intake.calories + actual_consumption.calories
             ),
@@ -115,18 +205,6 @@ class NutritionService:
             ),
         )
 
-        exercise_dicts = NutritionService._serialize_exercises(exercises)
-
-        return DailyNutritionSummary(
-            date=target_date,
-            goals=goals,
-            actual_intake=actual_intake,
-            actual_consumption=actual_consumption,
-            remaining=remaining,
-            meals=meals,
-            exercises=exercise_dicts,
-        )
-
     @staticmethod
     def _calculate_totals(entries: list[CalorieEntry]) -> NutritionTotals:
         """Calculate nutrition totals from a list of entries"""
@@ -147,52 +225,21 @@ class NutritionService:
         return NutritionTotals(**totals)
 
     @staticmethod
-    def _resolve_goals(user: User) -> NutritionTotals:
-        """Return personalized nutrition goals or fallback defaults."""
-        # Check if user has custom nutrition settings enabled
-        if user.use_custom_nutrition and user.custom_calories:
-            # Calculate macros based on custom percentages
-            protein_percent = user.custom_protein_percent or 0.25
-            carbs_percent = user.custom_carbs_percent or 0.50
-            fat_percent = user.custom_fat_percent or 0.25
-
-            protein_calories = user.custom_calories * protein_percent
-            carbs_calories = user.custom_calories * carbs_percent
-            fat_calories = user.custom_calories * fat_percent
-
-            protein_grams = round(protein_calories / 4)  # 4 cal per gram
-            carbs_grams = round(carbs_calories / 4)  # 4 cal per gram
-            fat_grams = round(fat_calories / 9)  # 9 cal per gram
-
-            return NutritionTotals(
-                calories=user.custom_calories,
-                protein_g=protein_grams,
-                carbs_g=carbs_grams,
-                fat_g=fat_grams,
-                fiber_g=25,  # Generic recommendation
-                sodium_mg=2300,  # Generic recommendation
-            )
+    def _resolve_goals(user: User, db: Session | None = None) -> NutritionTotals:
+        """Return the user's stored nutrition goals."""
+        return NutritionService.goals_totals(get_user_goals(user, db))
 
-        # Use calculated goals if user profile is complete
-        if user.sex and user.age and user.height and user.weight:
-            nutrition_goals = get_nutrition_goals(
-                sex=user.sex,
-                age=user.age,
-                height=user.height,
-                weight=user.weight,
-                goal=user.goal or "maintain",
-            )
-            return NutritionTotals(
-                calories=nutrition_goals["calories"],
-                protein_g=nutrition_goals["protein"],
-                carbs_g=nutrition_goals["carbs"],
-                fat_g=nutrition_goals["fat"],
-                fiber_g=25,  # Generic recommendation
-                sodium_mg=2300,  # Generic recommendation
-            )
-
-        # Use default goals if user profile is incomplete.
-        return NutritionTotals(**NutritionService.DEFAULT_GOALS)
+    @staticmethod
+    def goals_totals(goals: dict) -> NutritionTotals:
+        """Daily targets from a ``get_user_goals`` dict"""
+        return NutritionTotals(
+            calories=goals["calories"],
+            protein_g=goals["protein_g"],
+            carbs_g=goals["carbs_g"],
+            fat_g=goals["fat_g"],
+            fiber_g=goals["fiber_g"],
+            sodium_mg=goals["sodium_mg"],
+        )
 
     @staticmethod
     def _serialize_exercises(exercises: list[ExerciseEntry]) -> list[dict]:
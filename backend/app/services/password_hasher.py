@@ -0,0 +1,188 @@
+"""Password hashing off the request threadpool.
+
+bcrypt is deliberately slow, and hashing inline in sync routes lets a burst of
+logins or registrations occupy every request thread. Hashes run on a small
+dedicated thread pool instead (bcrypt releases the GIL, so threads give real
+parallelism), and the async sign-in routes await them through
+``hash_async``/``verify_async`` so no request thread waits on bcrypt either.
+``hash``/``verify`` block their caller until the hash is done and are meant
+for scripts and sync code. Requests that would queue more than
+``PASSWORD_HASH_MAX_PENDING`` hashes are rejected with 503 straight away
+rather than waiting for a slot.
+
+The work factor is ``BCRYPT_ROUNDS`` when set, otherwise it is calibrated at
+startup to the cost (at least ``BCRYPT_MIN_ROUNDS``) whose hash time on this
+machine is nearest ``BCRYPT_TARGET_MS``. Stored hashes with a different cost
+are rehashed on the next successful login.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from app.services.metrics import password_hash_duration
+
+BCRYPT_ROUNDS = os.getenv("BCRYPT_ROUNDS")
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", "10"))
+BCRYPT_MAX_ROUNDS = 16
+DEFAULT_ROUNDS = 12
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 4)))
+
+T = TypeVar("T")
+
+
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """Cost factor encoded in a bcrypt hash ($2b$12$...)"""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int, rounds: Optional[int] = None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds or DEFAULT_ROUNDS
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds = 0.0
+
+    def _acquire(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent sign-ins, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        with self._lock:
+            self.pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self.pending -= 1
+        self._slots.release()
+
+    def _submit(self, fn: Callable[[], T], operation: str) -> Future:
+        """Queue ``fn`` on the pool; its slot is held until the hash finishes, even if nobody waits"""
+        self._acquire()
+
+        def timed():
+            try:
+                started = time.perf_counter()
+                result = fn()
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self.completed += 1
+                    self.hash_seconds += elapsed
+                password_hash_duration.labels(operation).observe(elapsed)
+                return result
+            finally:
+                self._release()
+
+        try:
+            future = self._executor.submit(timed)
+        except BaseException:
+            self._release()
+            raise
+        # A waiter that goes away (client disconnect) cancels a hash that has not started yet
+        future.add_done_callback(lambda done: done.cancelled() and self._release())
+        return future
+
+    def _run(self, fn: Callable[[], T], operation: str = "hash") -> T:
+        return self._submit(fn, operation).result()
+
+    async def _run_async(self, fn: Callable[[], T], operation: str = "hash") -> T:
+        return await asyncio.wrap_future(self._submit(fn, operation))
+
+    def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run(lambda: bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8"), "hash")
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._run(
+            lambda: bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8")), "verify"
+        )
+
+    async def hash_async(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return await self._run_async(
+            lambda: bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8"), "hash"
+        )
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        return await self._run_async(
+            lambda: bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8")), "verify"
+        )
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return hash_rounds(hashed_password) != self.rounds
+
+    def calibrate(self, target_ms: float = BCRYPT_TARGET_MS, min_rounds: int = BCRYPT_MIN_ROUNDS) -> int:
+        """Pick the cost whose hash time here is nearest ``target_ms``"""
+        rounds = min_rounds
+        while rounds < BCRYPT_MAX_ROUNDS:
+            started = time.perf_counter()
+            bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds=rounds))
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            # Each extra round doubles the time, so the first cost within 1.5x of
+            # the target is closer than the next one would be
+            if elapsed_ms * 1.5 >= target_ms:
+                break
+            rounds += 1
+        self.rounds = rounds
+        return rounds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rounds": self.rounds,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_ms": round(self.hash_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+            }
+
+
+_hasher = PasswordHasher(
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+    rounds=int(BCRYPT_ROUNDS) if BCRYPT_ROUNDS else None,
+)
+
+
+def get_hasher() -> PasswordHasher:
+    return _hasher
+
+
+_calibrated = False
+
+
+def configure_hasher() -> int:
+    """Apply BCRYPT_ROUNDS, or calibrate the cost to BCRYPT_TARGET_MS (run at startup).
+
+    Calibrates once per process tree: workers forked by ``app.server`` inherit
+    the cost the parent settled on.
+    """
+    global _calibrated
+    if BCRYPT_ROUNDS or _calibrated:
+        return _hasher.rounds
+    _calibrated = True
+    return _hasher.calibrate()
@@ -0,0 +1,138 @@
+"""Service for the per-user recent/frequent foods index.
+
+Each (user, food, meal type) row keeps a time-decayed use count: every use at
+time t adds 2^(t / half-life). Because older uses are worth exponentially less
+relative to newer ones, ordering by this sum ranks by decayed frequency at any
+read time without rewriting rows. The sum is stored as its log2 so it never
+overflows; the list is trimmed to the top N rows per meal type.
+"""
+
+import math
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.food_entry import MealType
+from app.models.quick_food import QuickFood
+
+QUICK_FOODS_HALF_LIFE_DAYS = float(os.getenv("QUICK_FOODS_HALF_LIFE_DAYS", "14"))
+QUICK_FOODS_LIMIT = int(os.getenv("QUICK_FOODS_LIMIT", "20"))
+
+_EPOCH = datetime(2024, 1, 1)
+
+
+def _use_weight(used_at: datetime) -> float:
+    """log2 of the weight a use at ``used_at`` contributes"""
+    days = (used_at - _EPOCH).total_seconds() / 86400
+    return days / QUICK_FOODS_HALF_LIFE_DAYS
+
+
+def _log2_add(a: float, b: float) -> float:
+    """log2(2^a + 2^b) without overflow"""
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def _find(db: Session, user_id: int, food_item_id: int, meal_type: MealType) -> Optional[QuickFood]:
+    return (
+        db.query(QuickFood)
+        .filter(
+            QuickFood.user_id == user_id,
+            QuickFood.food_item_id == food_item_id,
+            QuickFood.meal_type == meal_type,
+        )
+        .first()
+    )
+
+
+def record_food_use(
+    db: Session,
+    user_id: int,
+    food_item_id: int,
+    meal_type: MealType,
+    used_at: Optional[datetime] = None,
+) -> QuickFood:
+    """Bump a food's score for a meal type (caller commits with the entry).
+
+    The index must never fail the caller's write: if a concurrent request
+    inserts the same (user, food, meal) row first, the insert is rolled back
+    to a savepoint and that row is bumped instead.
+    """
+    used_at = used_at or datetime.utcnow()
+    weight = _use_weight(used_at)
+
+    quick_food = _find(db, user_id, food_item_id, meal_type)
+    if quick_food is None:
+        quick_food = QuickFood(
+            user_id=user_id,
+            food_item_id=food_item_id,
+            meal_type=meal_type,
+            score=weight,
+            use_count=1,
+            last_used_at=used_at,
+        )
+        try:
+            # Flushes the caller's pending rows first, so they stay outside the savepoint
+            with db.begin_nested():
+                db.add(quick_food)
+        except IntegrityError:
+            quick_food = _find(db, user_id, food_item_id, meal_type)
+            if quick_food is None:
+                raise
+        else:
+            _trim(db, user_id, meal_type)
+            return quick_food
+
+    quick_food.score = _log2_add(quick_food.score, weight)
+    quick_food.use_count += 1
+    quick_food.last_used_at = used_at
+    return quick_food
+
+
+def _trim(db: Session, user_id: int, meal_type: MealType) -> None:
+    """Keep only the top QUICK_FOODS_LIMIT rows for a user and meal type"""
+    stale_ids = [
+        row.id
+        for row in db.query(QuickFood.id)
+        .filter(QuickFood.user_id == user_id, QuickFood.meal_type == meal_type)
+        .order_by(QuickFood.score.desc())
+        .offset(QUICK_FOODS_LIMIT)
+        .all()
+    ]
+    if stale_ids:
+        db.query(QuickFood).filter(QuickFood.id.in_(stale_ids)).delete(synchronize_session=False)
+
+
+def get_quick_foods(
+    db: Session,
+    user_id: int,
+    meal_type: Optional[MealType] = None,
+    limit: int = QUICK_FOODS_LIMIT,
+) -> list[QuickFood]:
+    """Top foods for a meal type (or across all meals, one row per food)"""
+    query = (
+        db.query(QuickFood)
+        .options(joinedload(QuickFood.food_item))
+        .filter(QuickFood.user_id == user_id)
+    )
+    if meal_type is not None:
+        return (
+            query.filter(QuickFood.meal_type == meal_type)
+            .order_by(QuickFood.score.desc())
+            .limit(limit)
+            .all()
+        )
+
+    # Across meals a food may appear once per meal type; keep its best row
+    results = []
+    seen = set()
+    for quick_food in query.order_by(QuickFood.score.desc()).limit(limit * len(MealType)):
+        if quick_food.food_item_id not in seen:
+            seen.add(quick_food.food_item_id)
+            results.append(quick_food)
+            if len(results) == limit:
+                break
+    return results
@@ -0,0 +1,220 @@
+"""Token-bucket rate limits per route group.
+
+Each group has a bucket per client key holding up to ``capacity`` tokens and
+refilling at ``capacity / period`` tokens per second; a request spends one
+token or is rejected with the time until the next token. Limits are given as
+``"<requests>/<seconds>"``, e.g. ``RATE_LIMIT_AUTH="10/60"``.
+
+Buckets live in process memory by default, so with several workers each
+enforces its own share; ``RATE_LIMIT_BACKEND=redis`` keeps them in Redis
+(updated atomically by a Lua script) so all workers share one budget.
+Redis calls block, so the middleware makes them from the threadpool; while
+Redis keeps failing a circuit breaker skips it and requests are let through.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from app.utils.circuit_breaker import CircuitBreaker
+
+
+@dataclass(frozen=True)
+class RouteGroup:
+    name: str
+    capacity: float
+    period: float
+    methods: frozenset
+    prefixes: tuple
+    # Key by the bearer token's user when present (otherwise by client IP)
+    per_user: bool
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    def matches(self, method: str, path: str) -> bool:
+        return method in self.methods and path.startswith(self.prefixes)
+
+
+def parse_limit(value: str) -> tuple[float, float]:
+    """Parse ``"<requests>/<seconds>"`` into (capacity, period)"""
+    requests, _, seconds = value.partition("/")
+    capacity, period = float(requests), float(seconds or 1)
+    if capacity <= 0 or period <= 0:
+        raise ValueError(f"Invalid rate limit {value!r}")
+    return capacity, period
+
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+def configured_groups() -> list[RouteGroup]:
+    """Route groups in match order; the first group matching a request applies"""
+    auth_capacity, auth_period = parse_limit(os.getenv("RATE_LIMIT_AUTH", "10/60"))
+    write_capacity, write_period = parse_limit(os.getenv("RATE_LIMIT_WRITES", "120/60"))
+    return [
+        RouteGroup(
+            "auth",
+            auth_capacity,
+            auth_period,
+            frozenset({"POST"}),
+            ("/auth/login", "/auth/register"),
+            per_user=False,
+        ),
+        RouteGroup(
+            "writes",
+            write_capacity,
+            write_period,
+            WRITE_METHODS,
+            ("/nutrition", "/profile", "/weights"),
+            per_user=True,
+        ),
+    ]
+
+
+class MemoryBucketStore:
+    """Buckets in a dict; full buckets are dropped now and then to bound memory"""
+
+    shared = False
+
+    def __init__(self, sweep_every: int = 10_000):
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._sweep_every = sweep_every
+        self._calls = 0
+
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        """Spend a token; returns 0 when allowed, else seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / rate
+
+            self._calls += 1
+            if self._calls >= self._sweep_every:
+                self._calls = 0
+                self._sweep(now, capacity, rate)
+        return wait
+
+    def _sweep(self, now: float, capacity: float, rate: float) -> None:
+        # A bucket idle long enough to have refilled is the same as no bucket
+        idle = capacity / rate
+        self._buckets = {
+            key: value for key, value in self._buckets.items() if now - value[1] < idle
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+# KEYS[1] bucket; ARGV capacity, rate (tokens/s), now (ms). Returns wait in ms.
+_TAKE_SCRIPT = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) / 1000 * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return wait
+"""
+
+
+class RedisBucketStore:
+    """Buckets shared by every worker through Redis"""
+
+    shared = True
+
+    def __init__(self, client, prefix: str = "ratelimit", breaker: Optional[CircuitBreaker] = None):
+        self.client = client
+        self.prefix = prefix
+        # While Redis is down, fail open at once instead of waiting out the socket timeout per request
+        self.breaker = breaker or CircuitBreaker(open_seconds=5.0)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBucketStore":
+        from app.services.cache_redis import RespClient
+
+        return cls(RespClient.from_url(url))
+
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        if not self.breaker.allow():
+            return 0.0
+        try:
+            wait_ms = int(self.client.execute(
+                "EVAL", _TAKE_SCRIPT, 1, f"{self.prefix}:{key}",
+                capacity, rate, int(time.time() * 1000),
+            ))
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return wait_ms / 1000
+
+    def clear(self) -> None:
+        cursor = "0"
+        while True:
+            cursor, keys = self.client.execute("SCAN", cursor, "MATCH", f"{self.prefix}:*", "COUNT", 500)
+            if keys:
+                self.client.execute("DEL", *keys)
+            if cursor in ("0", b"0", 0):
+                return
+
+
+def create_store():
+    if os.getenv("RATE_LIMIT_BACKEND", "memory").lower() == "redis":
+        url = os.getenv("RATE_LIMIT_REDIS_URL") or os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+        return RedisBucketStore.from_url(url)
+    return MemoryBucketStore()
+
+
+class RateLimiter:
+    def __init__(self, groups: list[RouteGroup], store, enabled: bool = True):
+        self.groups = groups
+        self.store = store
+        self.enabled = enabled
+        self.limited = 0
+
+    def group_for(self, method: str, path: str) -> Optional[RouteGroup]:
+        if not self.enabled:
+            return None
+        for group in self.groups:
+            if group.matches(method, path):
+                return group
+        return None
+
+    def check(self, group: RouteGroup, client_key: str) -> float:
+        """0 when the request may proceed, else seconds to wait"""
+        wait = self.store.take(f"{group.name}:{client_key}", group.capacity, group.rate)
+        if wait:
+            self.limited += 1
+        return wait
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in {"1", "true", "yes"}
+        _limiter = RateLimiter(configured_groups(), create_store(), enabled=enabled)
+    return _limiter
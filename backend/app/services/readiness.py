@@ -0,0 +1,173 @@
+"""Deep readiness check behind ``GET /health/ready``.
+
+``/health`` only says the process is up. Readiness also measures a database
+round trip (which wakes a suspended Neon compute), connection pool headroom,
+USDA reachability and the cache backend, and rolls them into:
+
+- ``ready``: everything answers normally
+- ``degraded``: the API works but something is slow, saturated or down
+  (USDA, cache); served with 200
+- ``unready``: the database cannot be reached; served with 503
+
+Results are reused for ``READINESS_CACHE_SECONDS`` and concurrent checks
+share one probe, so frequent polling costs at most one ``SELECT 1`` per
+interval per worker. USDA is probed from a background thread at most every
+``USDA_PROBE_INTERVAL`` seconds; requests only read the last result.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.cache import cache_health
+from app.services.usda import UsdaService
+from app.utils.circuit_breaker import OPEN
+from app.utils.singleflight import SingleFlight
+
+READINESS_CACHE_SECONDS = float(os.getenv("READINESS_CACHE_SECONDS", "2"))
+READINESS_DB_SLOW_MS = float(os.getenv("READINESS_DB_SLOW_MS", "500"))
+USDA_PROBE_INTERVAL = float(os.getenv("USDA_PROBE_INTERVAL", "60"))
+USDA_PROBE_TIMEOUT = float(os.getenv("USDA_PROBE_TIMEOUT", "3"))
+
+READY = "ready"
+DEGRADED = "degraded"
+UNREADY = "unready"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def check_database(db: Session) -> dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        db.execute(text("SELECT 1"))
+    except Exception as exc:
+        return {"status": "down", "error": exc.__class__.__name__}
+    latency_ms = round((time.perf_counter() - started) * 1000, 2)
+    return {"status": "slow" if latency_ms > READINESS_DB_SLOW_MS else "ok", "latency_ms": latency_ms}
+
+
+def check_pool(db: Session) -> dict[str, Any]:
+    pool = db.get_bind().pool
+    if not hasattr(pool, "checkedout"):
+        return {"status": "ok", "kind": type(pool).__name__}
+    size, checked_out = pool.size(), pool.checkedout()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    # A negative max_overflow means the pool may grow without limit
+    headroom = None if max_overflow < 0 else size + max_overflow - checked_out
+    return {
+        "status": "exhausted" if headroom is not None and headroom <= 0 else "ok",
+        "size": size,
+        "checked_out": checked_out,
+        "overflow": pool.overflow(),
+        "headroom": headroom,
+    }
+
+
+class UsdaProbe:
+    """Last known USDA reachability, refreshed in the background when stale"""
+
+    def __init__(self, interval: float = USDA_PROBE_INTERVAL, timeout: float = USDA_PROBE_TIMEOUT):
+        self.interval = interval
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._result: dict[str, Any] = {"status": "unknown"}
+        self._checked = float("-inf")
+        self._running = False
+
+    def probe(self) -> dict[str, Any]:
+        # Any HTTP answer proves reachability; the keyless request costs no API quota
+        started = time.perf_counter()
+        try:
+            response = httpx.head(UsdaService.API_BASE, timeout=self.timeout)
+        except httpx.HTTPError as exc:
+            return {"status": "down", "error": exc.__class__.__name__, "checked_at": _now()}
+        return {
+            "status": "down" if response.status_code >= 500 else "ok",
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            "checked_at": _now(),
+        }
+
+    def _refresh(self) -> None:
+        try:
+            result = self.probe()
+        except Exception as exc:
+            result = {"status": "down", "error": exc.__class__.__name__, "checked_at": _now()}
+        with self._lock:
+            self._result = result
+            self._running = False
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            stale = time.monotonic() - self._checked >= self.interval
+            if stale and not self._running:
+                self._checked = time.monotonic()
+                self._running = True
+                threading.Thread(target=self._refresh, name="usda-probe", daemon=True).start()
+            return dict(self._result)
+
+
+def check_usda(probe: UsdaProbe) -> dict[str, Any]:
+    if not os.getenv("USDA_API_KEY"):
+        return {"status": "unconfigured"}
+    result = probe.snapshot()
+    breaker = UsdaService.breaker_stats()
+    result["circuit"] = breaker["state"]
+    if breaker["state"] == OPEN:
+        result["status"] = "down"
+    return result
+
+
+def overall_status(checks: dict[str, dict[str, Any]]) -> str:
+    if checks["database"]["status"] == "down":
+        return UNREADY
+    unhealthy = (
+        checks["database"]["status"] != "ok"
+        or checks["pool"]["status"] != "ok"
+        or checks["usda"]["status"] in ("down", "unconfigured")
+        or checks["cache"]["status"] != "ok"
+    )
+    return DEGRADED if unhealthy else READY
+
+
+class Readiness:
+    def __init__(self, cache_seconds: float = READINESS_CACHE_SECONDS, usda_probe: Optional[UsdaProbe] = None):
+        self.cache_seconds = cache_seconds
+        self.usda_probe = usda_probe or UsdaProbe()
+        self._flight = SingleFlight()
+        self._report: Optional[dict[str, Any]] = None
+        self._expires = 0.0
+
+    def _run(self, db: Session) -> dict[str, Any]:
+        checks = {
+            "database": check_database(db),
+            "pool": check_pool(db),
+            "usda": check_usda(self.usda_probe),
+            "cache": cache_health(),
+        }
+        report = {"status": overall_status(checks), "checked_at": _now(), "checks": checks}
+        self._report, self._expires = report, time.monotonic() + self.cache_seconds
+        return report
+
+    def report(self, db: Session) -> dict[str, Any]:
+        report = self._report
+        if report is not None and time.monotonic() < self._expires:
+            return report
+        return self._flight.do("readiness", lambda: self._run(db))
+
+    def clear(self) -> None:
+        self._report = None
+
+
+_readiness = Readiness()
+
+
+def get_readiness() -> Readiness:
+    return _readiness
@@ -0,0 +1,96 @@
+"""Rotating refresh tokens.
+
+Refresh tokens are random 256-bit strings, so a single SHA-256 is enough to
+store them safely: unlike passwords there is nothing to brute-force, and
+checking one costs microseconds rather than a bcrypt verify. Each refresh
+revokes the presented token and issues a new one in the same family.
+Presenting an already-rotated token means it leaked, so the whole family is
+revoked and that login has to sign in again.
+"""
+
+import hashlib
+import os
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.models.refresh_token import RefreshToken
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+
+def _digest(raw_token: str) -> str:
+    return hashlib.sha256(raw_token.encode("utf-8")).hexdigest()
+
+
+def _invalid_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def issue_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> str:
+    """Create a refresh token for a user (caller commits) and return the raw value"""
+    now = datetime.utcnow()
+    # Expired tokens can no longer be replayed, so they are safe to forget
+    db.query(RefreshToken).filter(
+        RefreshToken.user_id == user_id, RefreshToken.expires_at < now
+    ).delete(synchronize_session=False)
+
+    raw_token = secrets.token_urlsafe(32)
+    db.add(
+        RefreshToken(
+            user_id=user_id,
+            token_hash=_digest(raw_token),
+            family_id=family_id or secrets.token_hex(16),
+            created_at=now,
+            expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    return raw_token
+
+
+def _revoke_family(db: Session, family_id: str) -> None:
+    db.query(RefreshToken).filter(
+        RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+
+
+def rotate_refresh_token(db: Session, raw_token: str) -> tuple[int, str]:
+    """Exchange a refresh token for a new one; returns (user_id, new raw token)"""
+    token = db.query(RefreshToken).filter(RefreshToken.token_hash == _digest(raw_token)).first()
+    if not token:
+        raise _invalid_token()
+
+    now = datetime.utcnow()
+    if token.revoked_at is not None:
+        _revoke_family(db, token.family_id)
+        db.commit()
+        raise _invalid_token()
+    if token.expires_at <= now:
+        raise _invalid_token()
+
+    # Conditional update so only one of two concurrent refreshes can win
+    claimed = db.query(RefreshToken).filter(
+        RefreshToken.id == token.id, RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+    if not claimed:
+        db.rollback()
+        raise _invalid_token()
+
+    new_token = issue_refresh_token(db, token.user_id, token.family_id)
+    db.commit()
+    return token.user_id, new_token
+
+
+def revoke_refresh_token(db: Session, raw_token: str) -> None:
+    """Revoke a token and everything rotated from the same login"""
+    token = db.query(RefreshToken).filter(RefreshToken.token_hash == _digest(raw_token)).first()
+    if token:
+        _revoke_family(db, token.family_id)
+        db.commit()
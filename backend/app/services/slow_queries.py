@@ -0,0 +1,179 @@
+"""Slow SQL statement log.
+
+Statements slower than ``SLOW_QUERY_MS`` are written as JSON lines to a
+rotating file (``SLOW_QUERY_LOG``) with their fingerprint, duration, the
+route that ran them and the shape of their parameters (types and lengths,
+never values). For slow SELECTs the plan is captured with a plain
+``EXPLAIN`` (not ANALYZE, so the query is not run again), sampled at
+``SLOW_QUERY_EXPLAIN_RATE`` and at most once per fingerprint every
+``SLOW_QUERY_EXPLAIN_INTERVAL`` seconds so a slow database is not handed
+extra work. Summarize the log with ``python slow_query_report.py``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Any, Optional
+
+from app.utils.request_context import current_route
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "logs/slow_queries.jsonl")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", "0.1"))
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))
+
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+logger = logging.getLogger(__name__)
+slow_log = logging.getLogger("app.slow_queries.records")
+slow_log.propagate = False
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|:\w+|\?")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """SQL with literals and placeholders replaced by ``?`` and IN lists collapsed"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _VALUE_LIST.sub("(?+)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalize_statement(statement).lower().encode()).hexdigest()[:12]
+
+
+def _value_shape(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}({len(value)})"
+    if isinstance(value, (list, tuple, set)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shape(parameters: Any) -> Any:
+    """Types (and lengths) of the bound parameters, never their values"""
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value_shape(value) for value in parameters]
+    return _value_shape(parameters)
+
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        threshold_ms: float = SLOW_QUERY_MS,
+        explain_rate: float = SLOW_QUERY_EXPLAIN_RATE,
+        explain_interval: float = SLOW_QUERY_EXPLAIN_INTERVAL,
+    ):
+        # Seconds, compared against every statement; SLOW_QUERY_MS=0 disables the log
+        self.threshold = threshold_ms / 1000 if threshold_ms > 0 else float("inf")
+        self.explain_rate = explain_rate
+        self.explain_interval = explain_interval
+        self._explained: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.logged = 0
+        self.explained = 0
+
+    def _should_explain(self, statement: str, key: str, executemany: bool) -> bool:
+        if executemany or statement.lstrip()[:6].upper() != "SELECT":
+            return False
+        if random.random() >= self.explain_rate:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained.get(key, float("-inf")) < self.explain_interval:
+                return False
+            self._explained[key] = now
+        return True
+
+    @staticmethod
+    def explain(conn, statement: str, parameters: Any) -> Optional[list[str]]:
+        """Plan for a statement, on a separate DBAPI cursor of the same connection.
+
+        This runs inside the request's transaction. On PostgreSQL a failed
+        statement aborts the whole transaction, so the EXPLAIN is wrapped in a
+        savepoint and a failure is rolled back to it, leaving the request's
+        own statements unaffected.
+        """
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+        savepoint = conn.in_transaction()
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            if savepoint:
+                cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            try:
+                cursor.execute(prefix + statement, parameters)
+                plan = [" | ".join(str(column) for column in row) for row in cursor.fetchall()]
+            except Exception as exc:
+                logger.debug("EXPLAIN failed: %s", exc)
+                plan = None
+                if savepoint:
+                    cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            if savepoint:
+                cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            return plan
+        except Exception:
+            # Could not even set or restore the savepoint; the transaction may be unusable now
+            logger.exception("EXPLAIN savepoint failed")
+            return None
+        finally:
+            cursor.close()
+
+    def record(self, conn, statement: str, parameters: Any, executemany: bool, seconds: float) -> dict:
+        key = fingerprint(statement)
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "duration_ms": round(seconds * 1000, 2),
+            "fingerprint": key,
+            "route": current_route(),
+            "statement": _WHITESPACE.sub(" ", statement).strip(),
+            "params": [parameter_shape(p) for p in parameters[:3]] if executemany else parameter_shape(parameters),
+        }
+        if executemany:
+            entry["rows"] = len(parameters)
+        if self._should_explain(statement, key, executemany):
+            entry["plan"] = self.explain(conn, statement, parameters)
+            self.explained += 1
+        self.logged += 1
+        slow_log.warning(json.dumps(entry, default=str))
+        return entry
+
+
+_slow_queries = SlowQueryLog()
+
+
+def get_slow_query_log() -> SlowQueryLog:
+    return _slow_queries
+
+
+def configure_slow_query_log(path: str = SLOW_QUERY_LOG) -> None:
+    """Attach the rotating JSON-lines file handler (once)"""
+    if _slow_queries.threshold == float("inf") or slow_log.handlers:
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handler = RotatingFileHandler(
+        path, maxBytes=SLOW_QUERY_LOG_MAX_BYTES, backupCount=SLOW_QUERY_LOG_BACKUPS, delay=True
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    slow_log.addHandler(handler)
+    slow_log.setLevel(logging.WARNING)
@@ -1,13 +1,64 @@
 import os
-from typing import Any
+import time
+from typing import Any, Callable, Optional, TypeVar
 
 import httpx
 from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.models.food_entry import FoodItem
+from app.services.cache import cached, get_cache
+from app.services.invalidation import FOOD_ITEMS_TOPIC, publish
+from app.services.jobs import PermanentJobError, job_handler
+from app.services.metrics import usda_errors, usda_request_duration
+from app.utils import server_timing
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.singleflight import SingleFlight
+
+# FoodData Central records rarely change; keep fetched foods for a day
+USDA_FOOD_CACHE_TTL = int(os.getenv("USDA_FOOD_CACHE_TTL", "86400"))
+USDA_SEARCH_CACHE_TTL = int(os.getenv("USDA_SEARCH_CACHE_TTL", "3600"))
+# Unknown fdcIds and searches with no results are remembered for this long
+USDA_NEGATIVE_CACHE_TTL = int(os.getenv("USDA_NEGATIVE_CACHE_TTL", "900"))
+USDA_TIMEOUT_SECONDS = float(os.getenv("USDA_TIMEOUT_SECONDS", "10"))
+
+USDA_BREAKER_WINDOW = int(os.getenv("USDA_BREAKER_WINDOW", "20"))
+USDA_BREAKER_MIN_CALLS = int(os.getenv("USDA_BREAKER_MIN_CALLS", "5"))
+USDA_BREAKER_FAILURE_RATE = float(os.getenv("USDA_BREAKER_FAILURE_RATE", "0.5"))
+USDA_BREAKER_OPEN_SECONDS = float(os.getenv("USDA_BREAKER_OPEN_SECONDS", "30"))
+
+T = TypeVar("T")
+
+# Upstream errors a caller may answer from local data instead
+DEGRADABLE_STATUSES = {status.HTTP_502_BAD_GATEWAY, status.HTTP_503_SERVICE_UNAVAILABLE}
+
+_search_cache = get_cache("usda.search", ttl=USDA_SEARCH_CACHE_TTL, max_size=512)
+_missing_food_cache = get_cache("usda.missing", ttl=USDA_NEGATIVE_CACHE_TTL, max_size=2048)
 
 
 class UsdaService:
     API_BASE = "https://api.nal.usda.gov/fdc/v1"
 
+    # Concurrent lookups for the same query / fdcId share one upstream request
+    _flight = SingleFlight()
+
+    # Stops calling USDA while it is failing so requests do not each wait out the timeout
+    _breaker = CircuitBreaker(
+        window=USDA_BREAKER_WINDOW,
+        min_calls=USDA_BREAKER_MIN_CALLS,
+        failure_rate=USDA_BREAKER_FAILURE_RATE,
+        open_seconds=USDA_BREAKER_OPEN_SECONDS,
+    )
+
+    @staticmethod
+    def coalescing_stats() -> dict[str, int]:
+        """Upstream calls made vs. calls served by joining an in-flight request"""
+        return UsdaService._flight.stats()
+
+    @staticmethod
+    def breaker_stats() -> dict:
+        return UsdaService._breaker.stats()
+
     @staticmethod
     def _get_api_key() -> str:
         api_key = os.getenv("USDA_API_KEY")
@@ -18,63 +69,184 @@ class UsdaService:
             )
         return api_key
 
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize a search query so equivalent searches share one upstream call"""
+        return " ".join(query.lower().split())
+
+    @staticmethod
+    def _request(path: str, params: dict[str, Any], handle: Callable[[httpx.Response], T]) -> T:
+        """GET from USDA through the circuit breaker and return ``handle(response)``.
+
+        Transport errors, 5xx and 429, and bodies ``handle`` cannot decode count
+        as failures; any other response (including 404) means USDA is up. The
+        outcome is recorded however the call ends, so a half-open probe is
+        always handed back.
+        """
+        endpoint = "search" if path.startswith("/foods/search") else "food"
+        breaker = UsdaService._breaker
+        if not breaker.allow():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="USDA temporarily unavailable",
+                headers={"Retry-After": str(int(breaker.open_seconds))},
+            )
+        healthy = False
+        try:
+            started = time.perf_counter()
+            try:
+                with httpx.Client(timeout=USDA_TIMEOUT_SECONDS) as client:
+                    response = client.get(f"{UsdaService.API_BASE}{path}", params=params)
+            except httpx.RequestError as exc:
+                usda_errors.labels(endpoint, "transport").inc()
+                raise HTTPException(
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail=f"USDA request failed: {exc.__class__.__name__}",
+                )
+            finally:
+                elapsed = time.perf_counter() - started
+                usda_request_duration.labels(endpoint).observe(elapsed)
+                server_timing.record(server_timing.USDA, elapsed)
+
+            if response.status_code >= 500 or response.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+                usda_errors.labels(endpoint, "server" if response.status_code >= 500 else "throttled").inc()
+            else:
+                healthy = True
+                if response.status_code >= 400 and response.status_code != status.HTTP_404_NOT_FOUND:
+                    usda_errors.labels(endpoint, "client").inc()
+            try:
+                return handle(response)
+            except HTTPException:
+                raise
+            except Exception as exc:
+                # A 200 whose body is not what USDA sends when it is healthy
+                healthy = False
+                usda_errors.labels(endpoint, "decode").inc()
+                raise HTTPException(
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail=f"USDA returned an unreadable response: {exc.__class__.__name__}",
+                )
+        finally:
+            if healthy:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+
+    @staticmethod
+    def _error_detail(response: httpx.Response) -> Any:
+        error_detail = response.text
+        try:
+            payload = response.json()
+            error_detail = payload.get("error") or payload.get("message") or payload
+        except ValueError:
+            pass
+        return error_detail
+
     @staticmethod
     def search_foods(query: str, page_size: int = 10) -> dict[str, Any]:
+        query = UsdaService.normalize_query(query)
+        key = (query, page_size)
+        data = _search_cache.get(key)
+        if data is not None:
+            return data
+
+        data = UsdaService._flight.do(
+            ("search", query, page_size),
+            lambda: UsdaService._search_upstream(query, page_size),
+        )
+        ttl = USDA_SEARCH_CACHE_TTL if data.get("foods") else USDA_NEGATIVE_CACHE_TTL
+        _search_cache.set(key, data, ttl=ttl)
+        return data
+
+    @staticmethod
+    def _search_upstream(query: str, page_size: int) -> dict[str, Any]:
         api_key = UsdaService._get_api_key()
         params = {
             "api_key": api_key,
             "query": query,
             "pageSize": page_size,
         }
-        try:
-            with httpx.Client(timeout=10) as client:
-                response = client.get(f"{UsdaService.API_BASE}/foods/search", params=params)
-        except httpx.RequestError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"USDA request failed: {exc.__class__.__name__}",
-            )
 
-        if response.status_code != status.HTTP_200_OK:
-            error_detail = response.text
-            try:
-                payload = response.json()
-                error_detail = payload.get("error") or payload.get("message") or payload
-            except ValueError:
-                pass
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"USDA search failed ({response.status_code}): {error_detail}",
-            )
+        def handle(response: httpx.Response) -> dict[str, Any]:
+            if response.status_code != status.HTTP_200_OK:
+                raise HTTPException(
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail=f"USDA search failed ({response.status_code}): {UsdaService._error_detail(response)}",
+                )
+            return response.json()
 
-        return response.json()
+        return UsdaService._request("/foods/search", params, handle)
 
     @staticmethod
+    @cached("usda.food", key=lambda fdc_id: int(fdc_id), ttl=USDA_FOOD_CACHE_TTL, max_size=512)
     def get_food(fdc_id: int) -> dict[str, Any]:
+        if _missing_food_cache.get(int(fdc_id)):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="USDA food not found")
+        return UsdaService._flight.do(
+            ("food", int(fdc_id)),
+            lambda: UsdaService._get_food_upstream(fdc_id),
+        )
+
+    @staticmethod
+    def _get_food_upstream(fdc_id: int) -> dict[str, Any]:
         api_key = UsdaService._get_api_key()
         params = {"api_key": api_key}
-        try:
-            with httpx.Client(timeout=10) as client:
-                response = client.get(f"{UsdaService.API_BASE}/food/{fdc_id}", params=params)
-        except httpx.RequestError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"USDA request failed: {exc.__class__.__name__}",
-            )
 
-        if response.status_code != status.HTTP_200_OK:
-            error_detail = response.text
-            try:
-                payload = response.json()
-                error_detail = payload.get("error") or payload.get("message") or payload
-            except ValueError:
-                pass
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"USDA food request failed ({response.status_code}): {error_detail}",
-            )
+        def handle(response: httpx.Response) -> dict[str, Any]:
+            if response.status_code == status.HTTP_404_NOT_FOUND:
+                _missing_food_cache.set(int(fdc_id), True)
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="USDA food not found")
+            if response.status_code != status.HTTP_200_OK:
+                raise HTTPException(
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail=f"USDA food request failed ({response.status_code}): {UsdaService._error_detail(response)}",
+                )
+            return response.json()
+
+        return UsdaService._request(f"/food/{fdc_id}", params, handle)
+
+    @staticmethod
+    def search_local(db: Session, query: str, limit: int = 10) -> list[FoodItem]:
+        """USDA foods already imported locally whose name matches every query word"""
+        db_query = db.query(FoodItem).filter(FoodItem.source == "usda")
+        for word in UsdaService.normalize_query(query).split():
+            db_query = db_query.filter(FoodItem.name.ilike(f"%{word}%"))
+        return db_query.order_by(FoodItem.name).limit(limit).all()
+
+    @staticmethod
+    def get_local_food(db: Session, fdc_id: int) -> Optional[FoodItem]:
+        """Locally imported copy of a USDA food (nutrients stored per 100 g)"""
+        return (
+            db.query(FoodItem)
+            .filter(FoodItem.source == "usda", FoodItem.external_id == str(fdc_id))
+            .first()
+        )
+
+    @staticmethod
+    def import_food(db: Session, fdc_id: int) -> FoodItem:
+        """Fetch a USDA food and store it as a food item (nutrients per 100 g)"""
+        food = UsdaService.get_food(fdc_id)
+        nutrients = UsdaService.extract_nutrients(food)
+        serving_size_grams = UsdaService.get_serving_size_grams(food) or 100.0
+        nutrients = UsdaService.normalize_per_100g(nutrients, serving_size_grams)
 
-        return response.json()
+        food_item = FoodItem(
+            name=food.get("description") or "USDA Food",
+            serving_size="100 g",
+            serving_size_grams=100.0,
+            source="usda",
+            external_id=str(fdc_id),
+            calories=nutrients["calories"],
+            protein_g=nutrients["protein_g"],
+            carbs_g=nutrients["carbs_g"],
+            fat_g=nutrients["fat_g"],
+            fiber_g=nutrients["fiber_g"],
+            sodium_mg=nutrients["sodium_mg"],
+        )
+        db.add(food_item)
+        db.commit()
+        db.refresh(food_item)
+        return food_item
 
     @staticmethod
     def extract_nutrients(food: dict[str, Any]) -> dict[str, float]:
@@ -132,3 +304,31 @@ class UsdaService:
         if serving_size and serving_unit in {"g", "gram", "grams"}:
             return float(serving_size)
         return None
+
+
+USDA_PREFETCH_JOB = "usda.prefetch"
+
+
+@job_handler(USDA_PREFETCH_JOB)
+def prefetch_usda_foods(db: Session, job) -> dict[str, list[int]]:
+    """Import a list of USDA foods ahead of use; a retry skips those already imported"""
+    result: dict[str, list[int]] = {"imported": [], "existing": [], "missing": []}
+    try:
+        for fdc_id in job.payload.get("fdc_ids", []):
+            if UsdaService.get_local_food(db, fdc_id):
+                result["existing"].append(fdc_id)
+                continue
+            try:
+                UsdaService.import_food(db, fdc_id)
+            except HTTPException as exc:
+                if exc.status_code == status.HTTP_404_NOT_FOUND:
+                    result["missing"].append(fdc_id)
+                    continue
+                if exc.status_code in DEGRADABLE_STATUSES:
+                    raise  # USDA is down or throttling; retried with back-off
+                raise PermanentJobError(str(exc.detail))
+            result["imported"].append(fdc_id)
+    finally:
+        if result["imported"]:
+            publish(FOOD_ITEMS_TOPIC)
+    return result
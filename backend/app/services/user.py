@@ -2,16 +2,19 @@ from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserRegister
 from app.services.auth import get_password_hash
+from app.services.goals import refresh_user_goals
 from typing import Optional
 
 
-def create_user(db: Session, user_data: UserRegister) -> User:
-    """Create a new user with hashed password"""
-    hashed_password = get_password_hash(user_data.password)
+def create_user(db: Session, user_data: UserRegister, hashed_password: Optional[str] = None) -> User:
+    """Create a new user with hashed password (hashed here unless already given)"""
+    if hashed_password is None:
+        hashed_password = get_password_hash(user_data.password)
     db_user = User(
         username=user_data.username,
         hashed_password=hashed_password
     )
+    refresh_user_goals(db_user)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
@@ -0,0 +1,95 @@
+"""Cached read views behind the dashboard endpoints.
+
+Each view is cached per user and tagged with the invalidation topics of the
+rows it reads, so any write through the API drops it in every worker.
+``VIEW_CACHE_TTL`` bounds staleness if an invalidation is ever missed.
+"""
+
+import os
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import desc
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.weight_entry import WeightEntry
+from app.schemas.dashboard import DashboardResponse
+from app.schemas.food_entry import DailyNutritionSummary
+from app.schemas.weekly_comparison import WeeklyComparisonResponse
+from app.schemas.weight_entry import WeightEntryResponse
+from app.services.cache import get_cache
+from app.services.dashboard import build_dashboard
+from app.services.invalidation import user_day_topic, user_profile_topic, user_weights_topic
+from app.services.nutrition import NutritionService
+from app.services.weekly_comparison import calculate_weekly_comparison, week_bounds
+from app.utils.time import pst_today
+
+VIEW_CACHE_TTL = float(os.getenv("VIEW_CACHE_TTL", "300"))
+VIEW_CACHE_MAX_SIZE = int(os.getenv("VIEW_CACHE_MAX_SIZE", "2048"))
+
+# Summary fields computed from the day's rows (``date`` is always known)
+SUMMARY_SECTIONS = set(DailyNutritionSummary.model_fields) - {"date"}
+
+daily_summary_cache = get_cache("views.daily_summary", ttl=VIEW_CACHE_TTL, max_size=VIEW_CACHE_MAX_SIZE)
+weekly_comparison_cache = get_cache("views.weekly_comparison", ttl=VIEW_CACHE_TTL, max_size=VIEW_CACHE_MAX_SIZE)
+latest_weight_cache = get_cache("views.latest_weight", ttl=VIEW_CACHE_TTL, max_size=VIEW_CACHE_MAX_SIZE)
+dashboard_cache = get_cache("views.dashboard", ttl=VIEW_CACHE_TTL, max_size=VIEW_CACHE_MAX_SIZE)
+
+
+def get_daily_summary_view(
+    user: User, target_date: date, db: Session, sections: Optional[set[str]] = None
+) -> DailyNutritionSummary:
+    """Daily nutrition summary; invalidated by entry/exercise writes for the day and goal changes.
+
+    With ``sections`` (top-level fields) only those are computed, unless the
+    full summary is already cached; partial summaries are not cached.
+    """
+    if sections is not None and not sections >= SUMMARY_SECTIONS:
+        cached = daily_summary_cache.get((user.id, target_date))
+        if cached is not None:
+            return cached
+        return NutritionService.calculate_daily_sections(user, target_date, db, sections)
+    return daily_summary_cache.get_or_set(
+        (user.id, target_date),
+        lambda: NutritionService.calculate_daily_nutrition(user.id, target_date, db, user),
+        tags=[user_day_topic(user.id, target_date), user_profile_topic(user.id)],
+    )
+
+
+def get_weekly_comparison_view(user: User, db: Session, today: Optional[date] = None) -> WeeklyComparisonResponse:
+    """Weekly comparison; invalidated by writes to any of the 14 days it covers"""
+    today = today or pst_today()
+    _, current_week_end, last_week_start, _ = week_bounds(today)
+    days = (current_week_end - last_week_start).days + 1
+    return weekly_comparison_cache.get_or_set(
+        (user.id, today),
+        lambda: calculate_weekly_comparison(user.id, today, db),
+        tags=[user_day_topic(user.id, last_week_start + timedelta(days=i)) for i in range(days)],
+    )
+
+
+def get_latest_weight_view(user: User, db: Session) -> Optional[WeightEntryResponse]:
+    """Most recent weight entry; invalidated by weight writes"""
+
+    def compute():
+        latest = db.query(WeightEntry).filter(
+            WeightEntry.user_id == user.id
+        ).order_by(desc(WeightEntry.date)).first()
+        return WeightEntryResponse.model_validate(latest) if latest else None
+
+    return latest_weight_cache.get_or_set(
+        user.id, compute, tags=[user_weights_topic(user.id)]
+    )
+
+
+def get_dashboard_view(user: User, target_date: date, db: Session) -> DashboardResponse:
+    """Whole dashboard for a day; invalidated by anything its parts are invalidated by"""
+    _, current_week_end, last_week_start, _ = week_bounds(target_date)
+    days = (current_week_end - last_week_start).days + 1
+    return dashboard_cache.get_or_set(
+        (user.id, target_date),
+        lambda: build_dashboard(user, target_date, db),
+        tags=[user_day_topic(user.id, last_week_start + timedelta(days=i)) for i in range(days)]
+        + [user_profile_topic(user.id), user_weights_topic(user.id)],
+    )
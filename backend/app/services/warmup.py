@@ -0,0 +1,103 @@
+"""Background warm-up of a user's dashboard views after login.
+
+Login schedules ``warm_user_views`` to run after the token is returned, so the
+first dashboard load reads today's summary, goals, weekly comparison and latest
+weight from cache instead of paying their cold cost. ``LOGIN_WARM_SET`` picks
+the views (comma-separated; empty disables warming).
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.services.goals import get_user_goals
+from app.services.views import (
+    get_daily_summary_view,
+    get_dashboard_view,
+    get_latest_weight_view,
+    get_weekly_comparison_view,
+)
+from app.utils.time import pst_today
+
+logger = logging.getLogger(__name__)
+
+WARMERS: dict[str, Callable[[User, Session], object]] = {
+    "summary": lambda user, db: get_daily_summary_view(user, pst_today(), db),
+    "goals": lambda user, db: get_user_goals(user, db),
+    "weekly": lambda user, db: get_weekly_comparison_view(user, db),
+    "latest_weight": lambda user, db: get_latest_weight_view(user, db),
+    # Opt-in for clients that load GET /dashboard instead of the separate views
+    "dashboard": lambda user, db: get_dashboard_view(user, pst_today(), db),
+}
+
+DEFAULT_WARM_SET = "summary,goals,weekly,latest_weight"
+
+
+def configured_warm_set() -> list[str]:
+    names = os.getenv("LOGIN_WARM_SET", DEFAULT_WARM_SET)
+    return [name.strip() for name in names.split(",") if name.strip() in WARMERS]
+
+
+class WarmupStats:
+    """Counters for warm-up runs and time spent per view"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.failures = 0
+        self.views: dict[str, dict[str, float]] = {}
+
+    def record(self, view: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            entry = self.views.setdefault(view, {"warmed": 0, "failed": 0, "seconds": 0.0})
+            entry["warmed" if ok else "failed"] += 1
+            entry["seconds"] += seconds
+            if not ok:
+                self.failures += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "failures": self.failures,
+                "views": {name: dict(values) for name, values in self.views.items()},
+            }
+
+
+stats = WarmupStats()
+
+
+def warm_user_views(user_id: int, session_factory: Callable[[], Session], views: list[str] | None = None) -> None:
+    """Compute and cache the configured views for a user in a fresh session"""
+    views = configured_warm_set() if views is None else views
+    if not views:
+        return
+    with stats._lock:
+        stats.runs += 1
+
+    db = session_factory()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            return
+        for view in views:
+            started = time.perf_counter()
+            try:
+                WARMERS[view](user, db)
+                ok = True
+            except Exception:
+                logger.exception("Warm-up of %s failed for user %s", view, user_id)
+                db.rollback()
+                ok = False
+            stats.record(view, time.perf_counter() - started, ok)
+    finally:
+        db.close()
+
+
+def warmup_stats() -> dict:
+    return stats.snapshot()
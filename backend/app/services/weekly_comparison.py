@@ -0,0 +1,125 @@
+from datetime import date, timedelta
+from sqlalchemy.orm import Session
+
+from app.models.food_entry import CalorieEntry
+from app.models.exercise import ExerciseEntry
+from app.schemas.weekly_comparison import WeeklyAverages, WeeklyComparisonResponse
+
+
+def week_bounds(today: date) -> tuple[date, date, date, date]:
+    """Current and last week (Monday to Sunday) around ``today``"""
+    current_week_start = today - timedelta(days=today.weekday())  # Monday
+    current_week_end = current_week_start + timedelta(days=6)  # Sunday
+    last_week_start = current_week_start - timedelta(days=7)
+    last_week_end = last_week_start + timedelta(days=6)
+    return current_week_start, current_week_end, last_week_start, last_week_end
+
+
+def calculate_weekly_comparison(user_id: int, today: date, db: Session) -> WeeklyComparisonResponse:
+    """Compare this week's daily averages with last week's"""
+    current_week_start, current_week_end, last_week_start, last_week_end = week_bounds(today)
+
+    # Get data for current week
+    current_week_data = _calculate_week_averages(
+        user_id, current_week_start, current_week_end, db
+    )
+
+    # Get data for last week
+    last_week_data = _calculate_week_averages(
+        user_id, last_week_start, last_week_end, db
+    )
+
+    return WeeklyComparisonResponse(
+        current_week=current_week_data,
+        last_week=last_week_data,
+        current_week_start=current_week_start,
+        current_week_end=current_week_end,
+        last_week_start=last_week_start,
+        last_week_end=last_week_end
+    )
+
+
+def _calculate_week_averages(
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    db: Session
+) -> WeeklyAverages:
+    """Calculate average daily nutrition and exercise for a week (only days with data)"""
+    # Get all calorie entries for the week
+    entries = db.query(CalorieEntry).filter(
+        CalorieEntry.user_id == user_id,
+        CalorieEntry.date >= start_date,
+        CalorieEntry.date <= end_date
+    ).all()
+
+    # Get all exercise entries for the week
+    exercises = db.query(ExerciseEntry).filter(
+        ExerciseEntry.user_id == user_id,
+        ExerciseEntry.date >= start_date,
+        ExerciseEntry.date <= end_date
+    ).all()
+
+    return week_averages(entries, exercises)
+
+
+def build_weekly_comparison(
+    today: date, entries: list[CalorieEntry], exercises: list[ExerciseEntry]
+) -> WeeklyComparisonResponse:
+    """Weekly comparison from already-loaded rows covering (at least) both weeks around ``today``"""
+    current_week_start, current_week_end, last_week_start, last_week_end = week_bounds(today)
+
+    def averages(start: date, end: date) -> WeeklyAverages:
+        return week_averages(
+            [entry for entry in entries if start <= entry.date <= end],
+            [ex for ex in exercises if start <= ex.date <= end],
+        )
+
+    return WeeklyComparisonResponse(
+        current_week=averages(current_week_start, current_week_end),
+        last_week=averages(last_week_start, last_week_end),
+        current_week_start=current_week_start,
+        current_week_end=current_week_end,
+        last_week_start=last_week_start,
+        last_week_end=last_week_end
+    )
+
+
+def week_averages(entries: list[CalorieEntry], exercises: list[ExerciseEntry]) -> WeeklyAverages:
+    """Average daily nutrition and exercise over one week's rows (only days with data)"""
+    # Track unique dates with nutrition data
+    nutrition_dates = set()
+
+    # Calculate totals
+    total_calories = 0
+    total_carbs = 0
+    total_protein = 0
+    total_fats = 0
+
+    for entry in entries:
+        nutrition_dates.add(entry.date)
+        entry_totals = entry.get_totals()
+        total_calories += entry_totals["calories"]
+        total_carbs += entry_totals["carbs_g"]
+        total_protein += entry_totals["protein_g"]
+        total_fats += entry_totals["fat_g"]
+
+    # Track unique dates with exercise data
+    exercise_dates = set()
+    total_exercise = 0
+    for ex in exercises:
+        exercise_dates.add(ex.date)
+        total_exercise += ex.calories_burned
+
+    # Count days with nutrition data (0 if no data)
+    num_nutrition_days = len(nutrition_dates) if nutrition_dates else 1
+    # Count days with exercise data (0 if no data)
+    num_exercise_days = len(exercise_dates) if exercise_dates else 1
+
+    return WeeklyAverages(
+        calories=round(total_calories / num_nutrition_days, 1),
+        carbs=round(total_carbs / num_nutrition_days, 1),
+        protein=round(total_protein / num_nutrition_days, 1),
+        fats=round(total_fats / num_nutrition_days, 1),
+        exercise=round(total_exercise / num_exercise_days, 1)
+    )
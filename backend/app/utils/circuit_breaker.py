@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker.
+
+    Tracks the outcome of the last ``window`` calls. Once at least ``min_calls``
+    have been seen and the failure rate reaches ``failure_rate`` the breaker
+    opens and rejects calls for ``open_seconds``. It then lets up to
+    ``half_open_probes`` concurrent probe calls through: a successful probe
+    closes it, a failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self._lock = threading.Lock()
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (counts as a probe when half-open)"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if (
+                self._state == CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_rate
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.times_opened += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "state": self._state,
+                "recent_calls": len(self._outcomes),
+                "recent_failures": self._outcomes.count(False),
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
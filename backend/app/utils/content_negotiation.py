@@ -0,0 +1,64 @@
+"""MessagePack content negotiation helpers.
+
+``msgpack`` is a declared dependency, but the import stays guarded: an install
+without it gives every client JSON and refuses msgpack request bodies with 415.
+"""
+
+from contextvars import ContextVar
+from typing import Any
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack"}
+
+# Set per request by MsgpackMiddleware; read by ResponseSerializer so large
+# responses are packed directly instead of going through JSON first
+wants_msgpack: ContextVar[bool] = ContextVar("wants_msgpack", default=False)
+
+
+def msgpack_available() -> bool:
+    return msgpack is not None
+
+
+def _media_ranges(accept: str):
+    for part in accept.split(","):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        yield media_type.lower(), quality
+
+
+def prefers_msgpack(accept: str | None) -> bool:
+    """Whether an Accept header ranks msgpack at least as high as JSON"""
+    if not accept:
+        return False
+    msgpack_q, json_q = 0.0, 0.0
+    for media_type, quality in _media_ranges(accept):
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_q = max(msgpack_q, quality)
+        elif media_type in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            json_q = max(json_q, quality)
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def is_msgpack(content_type: str | None) -> bool:
+    return bool(content_type) and content_type.split(";")[0].strip().lower() in MSGPACK_MEDIA_TYPES
+
+
+def packb(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False)
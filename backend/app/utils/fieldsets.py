@@ -0,0 +1,101 @@
+"""Sparse fieldsets: ``?fields=`` on responses that are larger than most clients need.
+
+``fields`` is a comma-separated list of dotted paths into the response model
+(``remaining.calories,goals``); list items are addressed by their own field
+names (``meals.totals``). Endpoints use the parsed ``FieldSet`` twice: to ask
+whether a part was requested at all (and skip computing it) and, through
+``serialization.Sparse``, to encode only the requested fields.
+"""
+
+import types
+import typing
+from typing import Any, Optional, Union
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+ALL_ITEMS = "__all__"
+
+
+def split_list(raw: Optional[str]) -> Optional[list[str]]:
+    """Names from a comma-separated query parameter; None when it was not sent"""
+    if raw is None:
+        return None
+    return [name.strip() for name in raw.split(",") if name.strip()]
+
+
+def _unwrap(annotation: Any) -> tuple[Any, bool]:
+    """The model inside ``Optional[...]``/``list[...]`` and whether a list was crossed"""
+    many = False
+    while True:
+        origin = typing.get_origin(annotation)
+        if origin in (Union, types.UnionType):
+            args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+            if len(args) != 1:
+                return annotation, many
+            annotation = args[0]
+        elif origin in (list, tuple, set):
+            many = True
+            annotation = typing.get_args(annotation)[0]
+        else:
+            return annotation, many
+
+
+class FieldSet:
+    """Requested fields of a response model; ``FieldSet(model, None)`` selects everything"""
+
+    def __init__(self, response_type: Any, raw: Optional[str], param: str = "fields"):
+        self.paths: Optional[list[tuple[str, ...]]] = None
+        self.include: Optional[dict] = None
+        names = split_list(raw)
+        if not names:
+            return
+        self.paths = []
+        self.include = {}
+        unknown = []
+        for name in names:
+            path = tuple(name.split("."))
+            if not self._resolve(response_type, path):
+                unknown.append(name)
+            else:
+                self.paths.append(path)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown {param}: {', '.join(unknown)}",
+            )
+
+    def _resolve(self, response_type: Any, path: tuple[str, ...]) -> bool:
+        """Add ``path`` to the include mapping; False if the model has no such field"""
+        model, many = _unwrap(response_type)
+        steps = []
+        for part in path:
+            if not (isinstance(model, type) and issubclass(model, BaseModel)) or part not in model.model_fields:
+                return False
+            steps.append((part, many))
+            model, many = _unwrap(model.model_fields[part].annotation)
+
+        node = self.include
+        for position, (part, items) in enumerate(steps):
+            if items:
+                node = node.setdefault(ALL_ITEMS, {})
+            if position == len(steps) - 1:
+                node[part] = True
+            elif node.get(part) is True:
+                # A parent of this path was already selected whole
+                break
+            else:
+                node = node.setdefault(part, {})
+        return True
+
+    def __contains__(self, name: str) -> bool:
+        """Whether any part of the dotted field ``name`` is requested"""
+        if self.paths is None:
+            return True
+        parts = tuple(name.split("."))
+        return any(path[: len(parts)] == parts or parts[: len(path)] == path for path in self.paths)
+
+    def requested(self, names) -> set[str]:
+        """The subset of ``names`` that is (at least partly) requested"""
+        return {name for name in names if name in self}
+
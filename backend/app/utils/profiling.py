@@ -0,0 +1,113 @@
+"""Sampling profiler producing flamegraph-ready collapsed stacks.
+
+Sync endpoints and dependencies run on AnyIO worker threads, not the thread
+that receives the request, so a tracing profiler such as cProfile (which only
+sees the thread that enabled it) misses the interesting work. Instead a
+background thread periodically reads ``sys._current_frames()`` for the event
+loop thread and the AnyIO workers and counts each busy stack.
+
+Output is Brendan Gregg's folded format (``root;caller;leaf <count>`` per
+line), accepted by flamegraph.pl, speedscope and inferno. Other requests
+running concurrently on the same worker process are sampled too.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+WORKER_THREAD_PREFIX = "AnyIO worker thread"
+
+# Leaf frames in these modules mean the thread is parked, not working
+_IDLE_MODULES = ("threading.py", "queue.py", "selectors.py")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    parts = Path(code.co_filename).parts[-2:]
+    return f"{code.co_name} ({'/'.join(parts)}:{code.co_firstlineno})"
+
+
+def _stack(frame) -> tuple[str, ...] | None:
+    if frame.f_code.co_filename.endswith(_IDLE_MODULES):
+        return None
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return tuple(labels)
+
+
+class SamplingProfiler:
+    """Samples the calling thread and the AnyIO worker threads until stopped"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.started = 0.0
+        self.duration = 0.0
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "SamplingProfiler":
+        self._target = threading.get_ident()
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self
+
+    def _thread_ids(self) -> set[int]:
+        ids = {thread.ident for thread in threading.enumerate() if thread.name.startswith(WORKER_THREAD_PREFIX)}
+        ids.add(self._target)
+        return ids
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            ids = self._thread_ids()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in ids:
+                    stack = _stack(frame)
+                    if stack:
+                        self.samples[stack] += 1
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.samples.values())
+
+    def collapsed(self) -> str:
+        """Folded stacks, most frequent first"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+
+class ProfileDirectory:
+    """Writes profiles to a local directory, keeping only the newest ``keep``"""
+
+    def __init__(self, path: str, keep: int):
+        self.path = Path(path)
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def write(self, name: str, content: str) -> Path:
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            target = self.path / name
+            target.write_text(content)
+            # Names start with a millisecond timestamp, so they sort oldest first
+            profiles = sorted(self.path.glob("*.folded"))
+            for old in profiles[: max(0, len(profiles) - self.keep)]:
+                try:
+                    os.remove(old)
+                except FileNotFoundError:
+                    pass
+            return target
@@ -0,0 +1,32 @@
+"""The HTTP request being handled, for code far from the endpoint (SQL hooks, logs)"""
+
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from starlette.types import Scope
+
+# Set by MetricsMiddleware for the duration of each HTTP request
+current_scope: ContextVar[Optional[Scope]] = ContextVar("current_scope", default=None)
+
+
+def current_route() -> Optional[str]:
+    """``METHOD /route/{template}`` of the current request (the raw path before routing)"""
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    route = getattr(scope.get("route"), "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {route}"
+
+
+class BatchContext:
+    """The signed-in user and DB session shared by the sub-requests of one ``POST /batch``"""
+
+    __slots__ = ("user", "db")
+
+    def __init__(self, user: Any, db: Any):
+        self.user = user
+        self.db = db
+
+
+# Set by the batch endpoint around each sub-request it dispatches
+current_batch: ContextVar[Optional[BatchContext]] = ContextVar("current_batch", default=None)
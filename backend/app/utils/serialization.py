@@ -0,0 +1,123 @@
+"""Fast JSON encoding for API responses.
+
+Two pieces:
+
+* ``serialized(type)`` wraps an endpoint so its return value is validated
+  against ``type`` (accepting ORM objects) and dumped straight to JSON bytes
+  by pydantic-core in the worker thread. FastAPI then passes the ready
+  ``Response`` through instead of re-validating and re-encoding it. Use it on
+  endpoints returning large models (daily summary, histories, food lists).
+* ``DEFAULT_RESPONSE_CLASS`` for the app. Recent FastAPI releases already dump
+  ``response_model`` results with pydantic-core, but only while the
+  default response class is untouched, so there it stays the default; older
+  releases encode with stdlib ``json`` and get an orjson-based class instead
+  (``pydantic_core.to_json`` when orjson is not installed).
+"""
+
+import inspect
+from functools import wraps
+from typing import Any, Callable, Optional
+
+import pydantic_core
+from fastapi import routing
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.utils.content_negotiation import MSGPACK_MEDIA_TYPE, packb, wants_msgpack
+from app.utils.server_timing import SERIALIZATION, timed
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    return pydantic_core.to_jsonable_python(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """Encode to compact JSON bytes (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return pydantic_core.to_json(content, fallback=_default)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+NATIVE_JSON_SERIALIZATION = "dump_json" in inspect.signature(routing.serialize_response).parameters
+
+DEFAULT_RESPONSE_CLASS = Default(JSONResponse) if NATIVE_JSON_SERIALIZATION else FastJSONResponse
+
+
+class ResponseSerializer:
+    """Validates a value against a response type and encodes it in one pass"""
+
+    def __init__(self, response_type: Any):
+        self.adapter = TypeAdapter(response_type)
+
+    def encode(self, value: Any, include: Optional[dict] = None, exclude: Optional[dict] = None) -> bytes:
+        validated = self.adapter.validate_python(value, from_attributes=True)
+        return self.adapter.dump_json(validated, include=include, exclude=exclude)
+
+    def response(
+        self,
+        value: Any,
+        status_code: int = 200,
+        headers: Optional[dict] = None,
+        include: Optional[dict] = None,
+        exclude: Optional[dict] = None,
+    ) -> Response:
+        with timed(SERIALIZATION):
+            if wants_msgpack.get():
+                validated = self.adapter.validate_python(value, from_attributes=True)
+                body = packb(self.adapter.dump_python(validated, mode="json", include=include, exclude=exclude))
+                return Response(body, status_code=status_code, headers=headers, media_type=MSGPACK_MEDIA_TYPE)
+            body = self.encode(value, include=include, exclude=exclude)
+        return Response(body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+class Sparse:
+    """Result of a ``serialized`` endpoint to encode with only some of its fields.
+
+    ``include``/``exclude`` are pydantic field mappings (see ``FieldSet``).
+    Models in ``value`` may be partial (``model_construct``) as long as
+    ``include`` leaves out the fields they lack.
+    """
+
+    __slots__ = ("value", "include", "exclude")
+
+    def __init__(self, value: Any, include: Optional[dict] = None, exclude: Optional[dict] = None):
+        self.value = value
+        self.include = include
+        self.exclude = exclude
+
+
+def serialized(response_type: Any) -> Callable:
+    """Endpoint decorator: return pre-encoded JSON for ``response_type``.
+
+    Keep ``response_model`` on the route for the OpenAPI schema; place this
+    decorator below the route decorator.
+    """
+    serializer = ResponseSerializer(response_type)
+
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            result = fn(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            if isinstance(result, Sparse):
+                return serializer.response(result.value, include=result.include, exclude=result.exclude)
+            return serializer.response(result)
+
+        wrapper.serializer = serializer
+        return wrapper
+
+    return decorator
@@ -0,0 +1,106 @@
+"""Per-request time accounting for the ``Server-Timing`` response header.
+
+``ServerTimingMiddleware`` puts a ``RequestTimings`` in ``current_timings``
+for each request; instrumented code adds to it with ``record``/``timed``.
+The object is shared, not copied, with the worker threads that run sync
+endpoints and dependencies, so their additions land on the same request.
+Outside a timed request (or with the header disabled) recording is a single
+ContextVar lookup.
+
+Segments are exclusive: SQL run while authenticating counts as ``auth``
+(the request asks for JWT decode plus user lookup there), and ``app`` is
+whatever is left of the total: handlers, aggregation and framework work.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Optional
+
+AUTH = "auth"
+DB = "db"
+USDA = "usda"
+SERIALIZATION = "serialization"
+APP = "app"
+
+DESCRIPTIONS = {
+    AUTH: "JWT decode and user lookup",
+    DB: "SQL",
+    USDA: "USDA upstream",
+    SERIALIZATION: "Response encoding",
+    APP: "Handlers and framework",
+}
+
+
+class RequestTimings:
+    __slots__ = ("started", "durations", "section", "_lock")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations: dict[str, float] = {}
+        # Segment currently open (e.g. auth), so nested SQL is charged to it
+        self.section: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def header(self) -> str:
+        total = time.perf_counter() - self.started
+        durations = dict(self.durations)
+        durations[APP] = max(0.0, total - sum(durations.values()))
+        entries = [
+            f'{name};dur={seconds * 1000:.1f};desc="{DESCRIPTIONS.get(name, name)}"'
+            for name, seconds in durations.items()
+        ]
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+
+def record(name: str, seconds: float) -> None:
+    """Charge ``seconds`` to ``name`` on the current request.
+
+    Skipped inside a ``timed`` section, whose own duration already covers it.
+    """
+    timings = current_timings.get()
+    if timings is not None and timings.section is None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def timed(name: str):
+    """Time a block as segment ``name``; anything recorded inside is folded into it"""
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    outer = timings.section
+    if outer is None:
+        timings.section = name
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if outer is None:
+            timings.section = None
+            timings.add(name, time.perf_counter() - started)
+
+
+def timed_function(name: str) -> Callable:
+    """Decorator form of ``timed`` that keeps the signature (FastAPI dependencies)"""
+
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
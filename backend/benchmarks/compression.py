@@ -0,0 +1,73 @@
+"""Bytes on the wire and CPU cost of response compression.
+
+Encodes representative bodies (a year of weight history, a 500-item food
+list and a 100-entry daily summary) and compresses them with gzip at a few
+levels and, when installed, brotli. Run from backend/:
+
+    python -m benchmarks.compression
+"""
+
+import argparse
+import time
+import zlib
+from datetime import date, timedelta
+
+from pydantic import TypeAdapter
+
+from app.middleware.compression import _Compressor, brotli
+from app.schemas.food_entry import DailyNutritionSummary, FoodItemResponse
+from app.schemas.weight_entry import WeightTrendData
+from benchmarks.serialization import build_summary
+
+
+def bodies() -> list[tuple[str, bytes]]:
+    start = date(2030, 1, 1)
+    history = [
+        WeightTrendData(date=start + timedelta(days=i), weight=round(80 - i * 0.02, 1), change=-0.02)
+        for i in range(365)
+    ]
+    foods = [
+        FoodItemResponse(
+            id=i, name=f"Food item {i}, raw", serving_size="100 g", serving_size_grams=100.0,
+            source="usda" if i % 2 else "custom", external_id=str(100000 + i) if i % 2 else None,
+            calories=50.0 + i % 300, protein_g=i % 30 / 10, carbs_g=i % 50 / 3, fat_g=i % 20 / 7,
+            fiber_g=i % 9 / 2, sodium_mg=float(i % 400),
+        )
+        for i in range(500)
+    ]
+    return [
+        ("/weights/history (365 days)", TypeAdapter(list[WeightTrendData]).dump_json(history)),
+        ("/nutrition/food-items (500)", TypeAdapter(list[FoodItemResponse]).dump_json(foods)),
+        ("/nutrition/daily (100 entries)", TypeAdapter(DailyNutritionSummary).dump_json(build_summary(100))),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    settings = [("gzip", level, None) for level in (1, 5, 9)]
+    if brotli is not None:
+        settings += [("br", None, quality) for quality in (4, 11)]
+    else:
+        print("(brotli not installed; gzip only)")
+
+    for name, body in bodies():
+        print(f"{name}: {len(body)} bytes uncompressed")
+        for encoding, level, quality in settings:
+            def compress():
+                compressor = _Compressor(encoding, level or zlib.Z_DEFAULT_COMPRESSION, quality or 4)
+                return compressor.compress(body, final=True)
+
+            compressed = compress()
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                compress()
+            micros = (time.perf_counter() - started) / args.iterations * 1e6
+            label = f"{encoding} {'level' if encoding == 'gzip' else 'quality'} {level or quality}"
+            print(f"  {label:>18}: {len(compressed):>7} bytes ({len(compressed) / len(body):5.1%})  {micros:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Login throughput benchmark.
+
+Fires concurrent logins at the app in-process while a probe thread keeps
+hitting a cheap sync endpoint, then reports login throughput and how much the
+probe's latency suffers. Run from backend/:
+
+    python -m benchmarks.login_throughput --concurrency 32 --seconds 10
+
+Compare runs with different ``BCRYPT_ROUNDS`` / ``PASSWORD_HASH_WORKERS`` /
+``PASSWORD_HASH_MAX_PENDING`` to size the hashing pool for a deployment.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("LOGIN_WARM_SET", "")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.password_hasher import get_hasher  # noqa: E402
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(concurrency: int, seconds: float, users: int) -> dict:
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    login_latencies, probe_latencies = [], []
+    statuses: dict[int, int] = {}
+    lock = threading.Lock()
+    deadline = 0.0
+
+    with TestClient(app) as client:
+        for i in range(users):
+            client.post("/auth/register", json={"username": f"bench{i}", "password": "Password123"})
+
+        def login_worker(worker: int):
+            i = worker
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = client.post(
+                    "/auth/login",
+                    json={"username": f"bench{i % users}", "password": "Password123"},
+                )
+                elapsed = time.perf_counter() - started
+                with lock:
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                    if response.status_code == 200:
+                        login_latencies.append(elapsed)
+                i += concurrency
+
+        def probe_worker():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                client.get("/health")
+                probe_latencies.append(time.perf_counter() - started)
+                time.sleep(0.01)
+
+        deadline = time.perf_counter() + seconds
+        threads = [threading.Thread(target=login_worker, args=(n,)) for n in range(concurrency)]
+        threads.append(threading.Thread(target=probe_worker))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    app.dependency_overrides.pop(get_db, None)
+    return {
+        "bcrypt_rounds": get_hasher().rounds,
+        "logins_per_second": round(len(login_latencies) / seconds, 1),
+        "login_p50_ms": round(statistics.median(login_latencies) * 1000, 1) if login_latencies else 0.0,
+        "login_p95_ms": round(percentile(login_latencies, 95) * 1000, 1),
+        "probe_p50_ms": round(statistics.median(probe_latencies) * 1000, 1) if probe_latencies else 0.0,
+        "probe_p95_ms": round(percentile(probe_latencies, 95) * 1000, 1),
+        "statuses": statuses,
+        "hasher": get_hasher().stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--users", type=int, default=20)
+    args = parser.parse_args()
+    for key, value in run(args.concurrency, args.seconds, args.users).items():
+        print(f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""JSON vs MessagePack payload size and encode time.
+
+Covers the two largest read payloads: a year of ``/weights/history`` points
+and a 100-entry ``/nutrition/daily`` summary. Needs ``msgpack`` installed.
+Run from backend/:
+
+    python -m benchmarks.msgpack_payloads
+"""
+
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+
+from pydantic import TypeAdapter
+
+from app.schemas.food_entry import DailyNutritionSummary
+from app.schemas.weight_entry import WeightTrendData
+from app.utils.content_negotiation import msgpack_available, packb
+from benchmarks.serialization import build_summary
+
+
+def time_it(encode, iterations: int) -> tuple[float, int]:
+    body = encode()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        encode()
+    return (time.perf_counter() - started) / iterations * 1e6, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    if not msgpack_available():
+        sys.exit("msgpack is not installed (pip install msgpack)")
+
+    start = date(2030, 1, 1)
+    history = [
+        WeightTrendData(date=start + timedelta(days=i), weight=round(80 - i * 0.02, 1), change=-0.02)
+        for i in range(365)
+    ]
+    payloads = [
+        ("/weights/history (365 days)", TypeAdapter(list[WeightTrendData]), history),
+        ("/nutrition/daily (100 entries)", TypeAdapter(DailyNutritionSummary), build_summary(100)),
+    ]
+    for name, adapter, value in payloads:
+        json_us, json_bytes = time_it(lambda: adapter.dump_json(value), args.iterations)
+        msgpack_us, msgpack_bytes = time_it(lambda: packb(adapter.dump_python(value, mode="json")), args.iterations)
+        print(name)
+        print(f"  json:    {json_us:8.1f} us  {json_bytes:>7} bytes")
+        print(f"  msgpack: {msgpack_us:8.1f} us  {msgpack_bytes:>7} bytes  ({msgpack_bytes / json_bytes:.0%} of json)")
+
+
+if __name__ == "__main__":
+    main()
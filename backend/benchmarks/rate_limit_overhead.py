@@ -0,0 +1,67 @@
+"""Per-request overhead of the rate limit middleware.
+
+Drives the ASGI middleware directly around a no-op app, so the numbers are the
+limiter's own cost without HTTP parsing or routing. Run from backend/:
+
+    python -m benchmarks.rate_limit_overhead --requests 100000
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.services.auth import create_access_token
+from app.services.rate_limit import MemoryBucketStore, RateLimiter, RouteGroup
+
+
+async def noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def drive(app, scope: dict, requests: int) -> float:
+    started = time.perf_counter()
+    for i in range(requests):
+        # Spread requests across clients so buckets never run dry
+        scope["client"] = (f"10.0.{i % 250}.{i % 200}", 1234)
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args()
+
+    groups = [
+        RouteGroup("auth", 1e9, 1, frozenset({"POST"}), ("/auth/login",), per_user=False),
+        RouteGroup("writes", 1e9, 1, frozenset({"POST"}), ("/nutrition",), per_user=True),
+    ]
+    middleware = RateLimitMiddleware(noop_app, RateLimiter(groups, MemoryBucketStore()))
+    bearer = f"Bearer {create_access_token({'sub': 'bench'})}".encode()
+
+    cases = [
+        ("no middleware", noop_app, "GET", "/nutrition/daily", []),
+        ("unlimited route", middleware, "GET", "/nutrition/daily", []),
+        ("limited, by IP", middleware, "POST", "/auth/login", []),
+        ("limited, by user", middleware, "POST", "/nutrition/entries", [(b"authorization", bearer)]),
+    ]
+    baseline = None
+    for name, app, method, path, headers in cases:
+        scope = {"type": "http", "method": method, "path": path, "headers": headers}
+        micros = asyncio.run(drive(app, scope, args.requests))
+        baseline = micros if baseline is None else baseline
+        print(f"{name:>18}: {micros:7.2f} us/request  (+{micros - baseline:.2f})")
+
+
+if __name__ == "__main__":
+    main()
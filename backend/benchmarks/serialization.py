@@ -0,0 +1,95 @@
+"""Response encoding benchmark for a 100-entry daily summary.
+
+Compares the ways a ``DailyNutritionSummary`` can be turned into response
+bytes: the stdlib-json path of older FastAPI releases, the orjson response
+class, FastAPI's native pydantic-core path of recent releases and the
+``serialized`` decorator. Run from backend/:
+
+    python -m benchmarks.serialization --entries 100
+"""
+
+import argparse
+import json
+import time
+from datetime import date
+
+from pydantic import TypeAdapter
+
+from app.schemas.food_entry import (
+    CalorieEntryResponse,
+    DailyNutritionSummary,
+    FoodItemResponse,
+    MealSummary,
+    MealType,
+    NutritionTotals,
+)
+from app.utils.serialization import FastJSONResponse, ResponseSerializer
+
+
+def build_summary(entries: int) -> DailyNutritionSummary:
+    totals = NutritionTotals(calories=520.5, protein_g=30.2, carbs_g=60.1, fat_g=15.3, fiber_g=8.2, sodium_mg=410.0)
+    meal_types = list(MealType)
+    meals = []
+    for index, meal_type in enumerate(meal_types):
+        meal_entries = [
+            CalorieEntryResponse(
+                id=i,
+                food_item_id=i,
+                quantity=1.5,
+                unit="serving",
+                meal_type=meal_type,
+                date=date(2030, 1, 1),
+                food_item=FoodItemResponse(
+                    id=i, name=f"Food {i}", serving_size="100 g", serving_size_grams=100.0, source="usda",
+                    external_id=str(1000 + i), calories=52.0, protein_g=0.3, carbs_g=13.8, fat_g=0.2,
+                    fiber_g=2.4, sodium_mg=1.0,
+                ),
+                totals=totals,
+            )
+            for i in range(index, entries, len(meal_types))
+        ]
+        meals.append(MealSummary(meal_type=meal_type, entries=meal_entries, totals=totals))
+    return DailyNutritionSummary(
+        date=date(2030, 1, 1), goals=totals, actual_intake=totals, actual_consumption=totals,
+        remaining=totals, meals=meals, exercises=[{"id": 1, "activity": "run", "calories_burned": 300}],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    summary = build_summary(args.entries)
+    adapter = TypeAdapter(DailyNutritionSummary)
+    serializer = ResponseSerializer(DailyNutritionSummary)
+
+    def stdlib_path():
+        content = adapter.dump_python(adapter.validate_python(summary), mode="json")
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+    def orjson_class_path():
+        content = adapter.dump_python(adapter.validate_python(summary), mode="json")
+        return FastJSONResponse(content).body
+
+    def native_path():
+        return adapter.dump_json(adapter.validate_python(summary))
+
+    cases = [
+        ("stdlib json (older FastAPI)", stdlib_path),
+        ("orjson response class", orjson_class_path),
+        ("pydantic-core (recent FastAPI)", native_path),
+        ("@serialized", lambda: serializer.response(summary).body),
+    ]
+    for name, encode in cases:
+        body = encode()
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            encode()
+        micros = (time.perf_counter() - started) / args.iterations * 1e6
+        print(f"{name:>34}: {micros:8.1f} us  {len(body):>7} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Memory and throughput of the server entrypoints.
+
+Starts the API three ways on a scratch SQLite database: a single uvicorn
+process, ``uvicorn --workers N`` (each worker imports the app itself) and
+``python -m app.server --workers N`` (preloaded in the parent, forked), then
+measures the memory of the whole process tree and drives concurrent
+``/health`` and ``/nutrition/daily`` requests at it. Linux only (reads
+/proc). Run from backend/:
+
+    python -m benchmarks.server_workers --workers 4 --seconds 10
+
+PSS splits shared pages between the processes sharing them, so the sum is
+what the tree really costs; RSS counts shared pages once per process.
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree(pid: int) -> list[int]:
+    pids = [pid]
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children = f.read().split()
+        except OSError:
+            continue
+        for child in children:
+            pids.extend(process_tree(int(child)))
+    return pids
+
+
+def memory_kb(pid: int) -> dict[str, int]:
+    """PSS and RSS in kB (PSS falls back to RSS on kernels without smaps_rollup)"""
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    values[key.lower()] = int(rest.split()[0])
+    except OSError:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    values["rss"] = int(line.split()[1])
+    values.setdefault("pss", values.get("rss", 0))
+    return values
+
+
+def wait_until_up(base_url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not come up")
+
+
+def drive(base_url: str, token: str, concurrency: int, seconds: float) -> dict:
+    counts = {"ok": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def worker(n: int):
+        with httpx.Client(base_url=base_url, timeout=10) as client:
+            i = n
+            while time.perf_counter() < deadline:
+                path = "/nutrition/daily" if i % 2 else "/health"
+                try:
+                    ok = client.get(path, headers=headers).status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                with lock:
+                    counts["ok" if ok else "errors"] += 1
+                i += 1
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"requests_per_second": round(counts["ok"] / seconds, 1), "errors": counts["errors"]}
+
+
+def run(name: str, command: list[str], workers: int, concurrency: int, seconds: float) -> dict:
+    port = free_port()
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        RATE_LIMIT_ENABLED="false",
+        LOAD_SHEDDING_ENABLED="false",
+        LOGIN_WARM_SET="",
+    )
+    command = [part.format(port=port, workers=workers) for part in command]
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(base_url, process)
+        credentials = {"username": "benchuser", "password": "Password123"}
+        httpx.post(f"{base_url}/auth/register", json=credentials, timeout=30)
+        token = httpx.post(f"{base_url}/auth/login", json=credentials, timeout=30).json()["access_token"]
+        # Warm every worker before measuring so lazily built state is counted
+        drive(base_url, token, concurrency, 1.0)
+
+        pids = process_tree(process.pid)
+        memory = [memory_kb(pid) for pid in pids]
+        throughput = drive(base_url, token, concurrency, seconds)
+    finally:
+        process.terminate()
+        process.wait(timeout=60)
+    return {
+        "server": name,
+        "processes": len(pids),
+        "pss_mb": round(sum(m["pss"] for m in memory) / 1024, 1),
+        "rss_mb": round(sum(m["rss"] for m in memory) / 1024, 1),
+        **throughput,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    uvicorn = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", "{port}", "--log-level", "warning"]
+    servers = [
+        ("uvicorn", uvicorn),
+        ("uvicorn --workers", uvicorn + ["--workers", "{workers}"]),
+        ("app.server", [sys.executable, "-m", "app.server", "--port", "{port}", "--workers", "{workers}"]),
+    ]
+    print(f"{'server':>18} {'procs':>6} {'PSS MB':>8} {'RSS MB':>8} {'req/s':>9} {'errors':>7}")
+    for name, command in servers:
+        result = run(name, command, args.workers, args.concurrency, args.seconds)
+        print(
+            f"{result['server']:>18} {result['processes']:>6} {result['pss_mb']:>8} {result['rss_mb']:>8}"
+            f" {result['requests_per_second']:>9} {result['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
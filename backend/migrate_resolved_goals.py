@@ -0,0 +1,56 @@
+"""
+Migration script to add resolved nutrition goal fields to User table.
+Run this script once to update the database schema (SQLite or PostgreSQL).
+Goals are filled in lazily the next time each user's goals are read.
+"""
+
+import sys
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import engine, DATABASE_URL
+
+
+def migrate_database():
+    """Add resolved goal columns to users table if they don't exist"""
+
+    try:
+        existing_columns = {column["name"] for column in inspect(engine).get_columns("users")}
+
+        # Define new columns to add
+        new_columns = {
+            "goals_version": "INTEGER",
+            "goals_source": "VARCHAR",
+            "goal_bmr": "INTEGER",
+            "goal_tdee": "INTEGER",
+            "goal_calories": "INTEGER",
+            "goal_protein_g": "INTEGER",
+            "goal_carbs_g": "INTEGER",
+            "goal_fat_g": "INTEGER",
+            "goal_fiber_g": "INTEGER",
+            "goal_sodium_mg": "INTEGER",
+        }
+
+        # Add missing columns
+        columns_added = []
+        with engine.begin() as conn:
+            for column_name, column_type in new_columns.items():
+                if column_name not in existing_columns:
+                    print(f"Adding column: {column_name}")
+                    conn.execute(text(f"ALTER TABLE users ADD COLUMN {column_name} {column_type}"))
+                    columns_added.append(column_name)
+
+        if columns_added:
+            print(f"✅ Successfully added {len(columns_added)} columns: {', '.join(columns_added)}")
+        else:
+            print("✅ All columns already exist. No migration needed.")
+
+    except SQLAlchemyError as e:
+        print(f"❌ Error during migration: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    print(f"Running migration on: {DATABASE_URL}")
+    migrate_database()
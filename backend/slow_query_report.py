@@ -0,0 +1,101 @@
+"""
+Summarize the slow query log by statement fingerprint.
+
+Reads SLOW_QUERY_LOG (default logs/slow_queries.jsonl) and its rotated
+backups, groups entries by fingerprint and prints the worst offenders with
+their routes, a sample statement and the most recent captured plan.
+
+    python slow_query_report.py [--log PATH] [--top 10] [--sort total|count|max|p95]
+"""
+
+import argparse
+import glob
+import json
+import sys
+from collections import Counter, defaultdict
+
+from app.services.slow_queries import SLOW_QUERY_LOG
+
+
+def read_entries(path: str):
+    # app.log, app.log.1, ... app.log.N; order does not matter for grouping
+    for filename in sorted(glob.glob(f"{glob.escape(path)}*")):
+        with open(filename, encoding="utf-8") as log:
+            for line in log:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(entries) -> list[dict]:
+    groups: dict[str, dict] = defaultdict(lambda: {"durations": [], "routes": Counter(), "plan": None})
+    for entry in entries:
+        group = groups[entry["fingerprint"]]
+        group["durations"].append(entry["duration_ms"])
+        group["routes"][entry.get("route") or "(no request)"] += 1
+        group["statement"] = entry["statement"]
+        group["params"] = entry.get("params")
+        if entry.get("plan"):
+            group["plan"] = entry["plan"]
+        group["last_seen"] = max(group.get("last_seen", ""), entry.get("ts", ""))
+
+    summary = []
+    for key, group in groups.items():
+        durations = group["durations"]
+        summary.append({
+            "fingerprint": key,
+            "count": len(durations),
+            "total": sum(durations),
+            "avg": sum(durations) / len(durations),
+            "p95": percentile(durations, 0.95),
+            "max": max(durations),
+            "routes": group["routes"].most_common(3),
+            "statement": group["statement"],
+            "params": group["params"],
+            "plan": group["plan"],
+            "last_seen": group["last_seen"],
+        })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the slow query log by statement fingerprint")
+    parser.add_argument("--log", default=SLOW_QUERY_LOG)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--sort", choices=["total", "count", "max", "p95"], default="total")
+    args = parser.parse_args()
+
+    summary = summarize(read_entries(args.log))
+    if not summary:
+        print(f"No slow queries logged in {args.log}")
+        sys.exit(0)
+
+    summary.sort(key=lambda group: group[args.sort], reverse=True)
+    print(f"{len(summary)} statement fingerprints, sorted by {args.sort}\n")
+    for group in summary[: args.top]:
+        print(
+            f"[{group['fingerprint']}] {group['count']}x  total {group['total']:.0f} ms  "
+            f"avg {group['avg']:.0f} ms  p95 {group['p95']:.0f} ms  max {group['max']:.0f} ms  "
+            f"last {group['last_seen']}"
+        )
+        print("  routes: " + ", ".join(f"{route} ({count})" for route, count in group["routes"]))
+        print(f"  params: {json.dumps(group['params'])}")
+        print(f"  sql:    {group['statement'][:500]}")
+        if group["plan"]:
+            print("  plan:")
+            for line in group["plan"]:
+                print(f"    {line}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
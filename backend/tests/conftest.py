@@ -1,5 +1,34 @@
+import os
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add backend directory to Python path so tests can import app module
 sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Tests seed rows straight through sessions, bypassing the invalidation bus,
+# so views warmed at login would go stale; warm-up tests opt back in.
+os.environ.setdefault("LOGIN_WARM_SET", "")
+# Cheap hashes keep the suite fast and skip cost calibration at startup
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Worker threads would poll the default database; tests run queued jobs explicitly
+os.environ.setdefault("JOB_WORKERS", "0")
+
+from app.services.cache import clear_all_caches  # noqa: E402
+from app.services.rate_limit import get_limiter  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    """Each test starts with empty caches (test databases are recreated per test)"""
+    clear_all_caches()
+    yield
+    clear_all_caches()
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Every test gets full token buckets"""
+    get_limiter().store.clear()
+    yield
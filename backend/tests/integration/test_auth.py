@@ -73,3 +73,177 @@ def test_login_nonexistent_user(client):
     """Test login with non-existent user"""
     response = client.post("/auth/login", json={"username": "nonexistent", "password": "password"})
     assert response.status_code == 401
+
+
+def test_login_warms_dashboard_views(client, monkeypatch):
+    """Login caches the dashboard views so the first load is served warm"""
+    from app.services.views import daily_summary_cache, weekly_comparison_cache, latest_weight_cache
+    from app.services.warmup import warmup_stats
+
+    monkeypatch.setenv("LOGIN_WARM_SET", "summary,goals,weekly,latest_weight")
+    credentials = {"username": "warmuser", "password": "Password123"}
+    client.post("/auth/register", json=credentials)
+    runs_before = warmup_stats()["runs"]
+
+    token = client.post("/auth/login", json=credentials).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert warmup_stats()["runs"] == runs_before + 1
+    assert len(daily_summary_cache.backend) == 1
+    assert len(weekly_comparison_cache.backend) == 1
+    assert len(latest_weight_cache.backend) == 1
+
+    hits = daily_summary_cache.hits
+    assert client.get("/nutrition/daily", headers=headers).status_code == 200
+    assert daily_summary_cache.hits == hits + 1
+
+    # Writes through the API invalidate the warmed view
+    client.post("/weights", headers=headers, json={"date": "2030-01-01", "weight": 70})
+    latest = client.get("/weights/latest", headers=headers).json()
+    assert latest["weight"] == 70
+
+
+def test_login_without_warm_set_skips_warmup(client, monkeypatch):
+    from app.services.views import daily_summary_cache
+
+    monkeypatch.setenv("LOGIN_WARM_SET", "")
+    credentials = {"username": "coldstart", "password": "Password123"}
+    client.post("/auth/register", json=credentials)
+    client.post("/auth/login", json=credentials)
+    assert len(daily_summary_cache.backend) == 0
+
+
+def test_login_rehashes_password_with_other_cost(client):
+    """Stored hashes made with a different work factor are upgraded on login"""
+    import bcrypt
+
+    from app.models.user import User
+    from app.services.password_hasher import get_hasher, hash_rounds
+
+    client.post("/auth/register", json={"username": "testuser", "password": "Password123"})
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.username == "testuser").first()
+    user.hashed_password = bcrypt.hashpw(b"Password123", bcrypt.gensalt(rounds=5)).decode()
+    db.commit()
+
+    response = client.post("/auth/login", json={"username": "testuser", "password": "Password123"})
+    assert response.status_code == 200
+
+    db.refresh(user)
+    assert hash_rounds(user.hashed_password) == get_hasher().rounds
+    db.close()
+
+    response = client.post("/auth/login", json={"username": "testuser", "password": "Password123"})
+    assert response.status_code == 200
+
+
+def login_tokens(client):
+    client.post("/auth/register", json={"username": "testuser", "password": "Password123"})
+    response = client.post("/auth/login", json={"username": "testuser", "password": "Password123"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_refresh_rotates_tokens_without_bcrypt(client, monkeypatch):
+    """Refreshing mints a working access token and never verifies a password"""
+    from app.services.password_hasher import get_hasher
+
+    tokens = login_tokens(client)
+    assert tokens["refresh_token"]
+
+    def no_bcrypt(*args, **kwargs):
+        raise AssertionError("refresh must not run bcrypt")
+
+    monkeypatch.setattr(get_hasher(), "verify", no_bcrypt)
+    monkeypatch.setattr(get_hasher(), "hash", no_bcrypt)
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+
+    profile = client.get("/profile", headers={"Authorization": f"Bearer {refreshed['access_token']}"})
+    assert profile.status_code == 200
+    assert profile.json()["username"] == "testuser"
+
+
+def test_reused_refresh_token_revokes_its_family(client):
+    """Replaying a rotated token signals theft and kills every token from that login"""
+    tokens = login_tokens(client)
+    rotated = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+
+    replay = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert replay.status_code == 401
+
+    response = client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_logout_revokes_refresh_token(client):
+    tokens = login_tokens(client)
+    other_login = client.post("/auth/login", json={"username": "testuser", "password": "Password123"}).json()
+
+    assert client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]}).status_code == 204
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+    # Other sessions keep working
+    response = client.post("/auth/refresh", json={"refresh_token": other_login["refresh_token"]})
+    assert response.status_code == 200
+
+
+def test_refresh_rejects_unknown_and_expired_tokens(client):
+    from datetime import datetime, timedelta
+
+    from app.models.refresh_token import RefreshToken
+
+    tokens = login_tokens(client)
+    assert client.post("/auth/refresh", json={"refresh_token": "not-a-token"}).status_code == 401
+
+    db = TestingSessionLocal()
+    db.query(RefreshToken).update({RefreshToken.expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    db.close()
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+
+def test_login_is_rate_limited(client, monkeypatch):
+    """Bursts of sign-ins from one address get 429 with Retry-After"""
+    from app.services.rate_limit import RouteGroup, get_limiter
+
+    group = RouteGroup("auth", 3, 60, frozenset({"POST"}), ("/auth/login",), per_user=False)
+    monkeypatch.setattr(get_limiter(), "groups", [group])
+
+    client.post("/auth/register", json={"username": "testuser", "password": "Password123"})
+    for _ in range(3):
+        response = client.post("/auth/login", json={"username": "testuser", "password": "wrong-password"})
+        assert response.status_code == 401
+
+    response = client.post("/auth/login", json={"username": "testuser", "password": "Password123"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_login_with_idempotency_key_stores_no_token(client, monkeypatch):
+    """Token responses are never kept by the idempotency store, and keys are not shared by anonymous callers"""
+    from app.models.idempotency_key import IdempotencyKey
+    from app.services.idempotency import IdempotencyStore
+
+    monkeypatch.setattr(
+        "app.middleware.idempotency.get_idempotency_store", lambda: IdempotencyStore(TestingSessionLocal)
+    )
+    client.post("/auth/register", json={"username": "testuser", "password": "Password123"})
+    headers = {"Idempotency-Key": "login-1"}
+    first = client.post("/auth/login", json={"username": "testuser", "password": "Password123"}, headers=headers)
+    retry = client.post("/auth/login", json={"username": "testuser", "password": "Password123"}, headers=headers)
+    refreshed = client.post("/auth/refresh", json={"refresh_token": first.json()["refresh_token"]}, headers=headers)
+    anonymous = client.post(
+        "/nutrition/food-items", json={"name": "Oats", "serving_size": "40g", "calories": 150}, headers=headers
+    )
+
+    assert first.status_code == retry.status_code == refreshed.status_code == 200
+    assert anonymous.status_code == 200
+    assert "idempotent-replayed" not in retry.headers
+    assert retry.json()["refresh_token"] != first.json()["refresh_token"]
+    db = TestingSessionLocal()
+    assert db.query(IdempotencyKey).count() == 0
+    db.close()
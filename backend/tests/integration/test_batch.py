@@ -0,0 +1,136 @@
+"""Integration tests for POST /batch"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+
+# Test database
+TEST_DATABASE_URL = "sqlite:///./test_batch.db"
+engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    Base.metadata.create_all(bind=engine)
+    # Use the real get_db so sub-requests go through its batch session sharing
+    monkeypatch.setattr("app.database.SessionLocal", TestingSessionLocal)
+    override = app.dependency_overrides.pop(get_db, None)
+    with TestClient(app) as test_client:
+        yield test_client
+    if override is not None:
+        app.dependency_overrides[get_db] = override
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def headers(client):
+    client.post("/auth/register", json={"username": "batchuser", "password": "testpass123"})
+    token = client.post(
+        "/auth/login", json={"username": "batchuser", "password": "testpass123"}
+    ).json()["access_token"]
+    auth = {"Authorization": f"Bearer {token}"}
+    client.put(
+        "/profile",
+        json={"sex": "male", "age": 30, "height": 180, "weight": 80},
+        headers=auth,
+    )
+    client.post("/weights", json={"date": "2030-01-01", "weight": 80.5}, headers=auth)
+    return auth
+
+
+DASHBOARD = [
+    {"id": "profile", "path": "/profile"},
+    {"id": "goals", "path": "/profile/nutrition-goals"},
+    {"id": "daily", "path": "/nutrition/daily?date=2030-01-01"},
+    {"id": "custom", "path": "/nutrition/custom-foods"},
+    {"id": "latest", "path": "/weights/latest"},
+    {"id": "weekly", "path": "/profile/weekly-comparison"},
+]
+
+
+def test_batch_matches_individual_responses(client, headers):
+    response = client.post("/batch", json={"requests": DASHBOARD}, headers=headers)
+    assert response.status_code == 200
+    items = response.json()["responses"]
+
+    assert [item["id"] for item in items] == [request["id"] for request in DASHBOARD]
+    for request, item in zip(DASHBOARD, items):
+        single = client.get(request["path"], headers=headers)
+        assert item["status"] == single.status_code == 200, request["path"]
+        assert item["body"] == single.json(), request["path"]
+
+
+def test_batch_runs_on_one_session_without_concurrency(client, headers, monkeypatch):
+    monkeypatch.setattr("app.api.routes.batch.BATCH_CONCURRENCY", 1)
+    checkouts = []
+    listener = lambda *args: checkouts.append(args)  # noqa: E731
+    event.listen(engine, "checkout", listener)
+    try:
+        response = client.post("/batch", json={"requests": DASHBOARD}, headers=headers)
+    finally:
+        event.remove(engine, "checkout", listener)
+    assert response.status_code == 200
+    assert all(item["status"] == 200 for item in response.json()["responses"])
+    assert len(checkouts) == 1
+
+
+def test_items_fail_independently(client, headers):
+    response = client.post(
+        "/batch",
+        json={
+            "requests": [
+                {"path": "/weights/latest"},
+                {"path": "/jobs/999"},
+                {"path": "/jobs?limit=0"},
+                {"path": "/no/such/route"},
+            ]
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    items = response.json()["responses"]
+    assert [item["status"] for item in items] == [200, 404, 422, 404]
+    assert items[0]["id"] is None
+    assert items[0]["body"]["weight"] == 80.5
+    assert items[1]["body"] == {"detail": "Job not found"}
+
+
+def test_batch_requires_auth(client):
+    response = client.post("/batch", json={"requests": [{"path": "/profile"}]})
+    assert response.status_code == 401
+
+
+def test_only_reads_are_batched(client, headers):
+    response = client.post(
+        "/batch", json={"requests": [{"method": "POST", "path": "/weights"}]}, headers=headers
+    )
+    assert response.status_code == 422
+    response = client.post("/batch", json={"requests": []}, headers=headers)
+    assert response.status_code == 422
+
+
+def test_failed_item_does_not_poison_its_lane(client, headers, monkeypatch):
+    from app.models.user import User
+
+    def failing_view(user, db):
+        # Leaves the shared session needing a rollback, like a failed statement
+        db.add(User(username=user.username, hashed_password="x"))
+        db.flush()
+
+    monkeypatch.setattr("app.api.routes.batch.BATCH_CONCURRENCY", 1)
+    monkeypatch.setattr("app.api.routes.weights.get_latest_weight_view", failing_view)
+    response = client.post(
+        "/batch",
+        json={"requests": [{"path": "/weights/latest"}, {"path": "/weights/history"}, {"path": "/profile"}]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    items = response.json()["responses"]
+    assert [item["status"] for item in items] == [500, 200, 200]
+    assert items[1]["body"][0]["weight"] == 80.5
+    assert items[2]["body"]["username"] == "batchuser"
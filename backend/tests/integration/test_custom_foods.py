@@ -281,3 +281,24 @@ def test_create_food_entry_from_custom_food(client, test_user_token):
     assert entry["totals"]["protein_g"] == 12.5  # 25 * 0.5
     assert entry["totals"]["carbs_g"] == 15  # 30 * 0.5
     assert entry["totals"]["fat_g"] == 5  # 10 * 0.5
+
+
+def test_custom_foods_fields(client, test_user_token):
+    """Sparse fields load only the requested columns"""
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    for name in ("Trail Mix", "Granola"):
+        client.post(
+            "/nutrition/custom-foods",
+            json={"name": name, "unit": "g", "reference_amount": 40, "calories": 190},
+            headers=headers,
+        )
+
+    response = client.get("/nutrition/custom-foods?fields=id,name", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [food["name"] for food in data] == ["Granola", "Trail Mix"]
+    assert all(set(food) == {"id", "name"} for food in data)
+
+    response = client.get("/nutrition/custom-foods?fields=name,protein", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: protein"
@@ -0,0 +1,140 @@
+"""Integration tests for GET /dashboard"""
+
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.utils.time import pst_today
+
+# Test database
+TEST_DATABASE_URL = "sqlite:///./test_dashboard.db"
+engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client():
+    Base.metadata.create_all(bind=engine)
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def headers(client):
+    client.post("/auth/register", json={"username": "dashuser", "password": "testpass123"})
+    token = client.post(
+        "/auth/login", json={"username": "dashuser", "password": "testpass123"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def seed(client, headers):
+    today = pst_today()
+    client.put("/profile", json={"sex": "female", "age": 35, "height": 165, "weight": 60}, headers=headers)
+    food_ids = [
+        client.post(
+            "/nutrition/food-items",
+            json={"name": name, "serving_size": "1 cup", "calories": calories, "protein_g": 5},
+        ).json()["id"]
+        for name, calories in (("Oats", 150), ("Rice", 200), ("Apple", 95))
+    ]
+    for days_ago, food_id, meal in ((0, food_ids[0], "breakfast"), (0, food_ids[1], "lunch"),
+                                    (0, food_ids[2], "snack"), (2, food_ids[1], "dinner"),
+                                    (8, food_ids[0], "breakfast")):
+        client.post(
+            "/nutrition/entries",
+            json={"food_item_id": food_id, "meal_type": meal, "quantity": 1.5,
+                  "date": (today - timedelta(days=days_ago)).isoformat()},
+            headers=headers,
+        )
+    for days_ago in (0, 9):
+        client.post(
+            "/nutrition/exercises",
+            json={"name": "Run", "calories_burned": 300,
+                  "date": (today - timedelta(days=days_ago)).isoformat()},
+            headers=headers,
+        )
+    for days_ago, weight in ((20, 61.2), (10, 60.6), (1, 60.1)):
+        client.post(
+            "/weights",
+            json={"date": (today - timedelta(days=days_ago)).isoformat(), "weight": weight},
+            headers=headers,
+        )
+    return today
+
+
+def test_dashboard_matches_separate_endpoints(client, headers):
+    today = seed(client, headers)
+
+    response = client.get(f"/dashboard?date={today.isoformat()}", headers=headers)
+    assert response.status_code == 200
+    dashboard = response.json()
+
+    assert dashboard["date"] == today.isoformat()
+    assert dashboard["summary"] == client.get(f"/nutrition/daily?date={today.isoformat()}", headers=headers).json()
+    assert dashboard["goals"] == client.get("/profile/nutrition-goals", headers=headers).json()
+    assert dashboard["weekly_comparison"] == client.get("/profile/weekly-comparison", headers=headers).json()
+    assert dashboard["latest_weight"] == client.get("/weights/latest", headers=headers).json()
+    assert dashboard["weight_trend"] == client.get("/weights/history?limit=7", headers=headers).json()
+    assert [meal["meal_type"] for meal in dashboard["summary"]["meals"]] == ["breakfast", "lunch", "snack"]
+
+
+def test_dashboard_query_count(client, headers):
+    today = seed(client, headers)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(f"/dashboard?date={today.isoformat()}", headers=headers)
+        cached = client.get(f"/dashboard?date={today.isoformat()}", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == cached.status_code == 200
+    # Per request: the user lookup for auth. The first also reads entries with
+    # their foods, exercises and weights once; the second is served from cache.
+    assert len(statements) == 5, statements
+
+
+def test_dashboard_without_data_or_profile(client, headers):
+    response = client.get("/dashboard", headers=headers)
+    assert response.status_code == 200
+    dashboard = response.json()
+    assert dashboard["date"] == pst_today().isoformat()
+    assert dashboard["goals"] is None
+    assert dashboard["latest_weight"] is None
+    assert dashboard["weight_trend"] == []
+    assert dashboard["summary"]["meals"] == []
+
+
+def test_dashboard_is_invalidated_by_writes(client, headers):
+    today = seed(client, headers)
+    before = client.get("/dashboard", headers=headers).json()
+    client.post("/weights", json={"date": today.isoformat(), "weight": 59.8}, headers=headers)
+    after = client.get("/dashboard", headers=headers).json()
+    assert before["latest_weight"]["weight"] == 60.1
+    assert after["latest_weight"]["weight"] == 59.8
+    assert len(after["weight_trend"]) == 4
+
+
+def test_dashboard_rejects_bad_date_and_anonymous(client, headers):
+    assert client.get("/dashboard?date=not-a-date", headers=headers).status_code == 422
+    assert client.get("/dashboard").status_code == 401
@@ -0,0 +1,133 @@
+"""Integration tests for background job endpoints"""
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, get_db
+from app.services.jobs import JobWorkerPool
+
+# Test database
+TEST_DATABASE_URL = "sqlite:///./test_jobs.db"
+engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client():
+    Base.metadata.create_all(bind=engine)
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def pool():
+    return JobWorkerPool(TestingSessionLocal, workers=0)
+
+
+def auth_headers(client, username="jobuser"):
+    client.post("/auth/register", json={"username": username, "password": "testpass123"})
+    token = client.post("/auth/login", json={"username": username, "password": "testpass123"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_export_runs_in_background(client, pool):
+    headers = auth_headers(client)
+    client.post(
+        "/weights",
+        json={"date": "2030-01-01", "weight": 80.5},
+        headers=headers,
+    )
+
+    response = client.post("/profile/export", headers=headers)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    assert response.headers["location"] == f"/jobs/{job['id']}"
+
+    # A second request joins the pending export
+    assert client.post("/profile/export", headers=headers).json()["id"] == job["id"]
+
+    assert pool.run_pending() == 1
+    finished = client.get(f"/jobs/{job['id']}", headers=headers).json()
+    assert finished["status"] == "succeeded"
+    assert finished["result"]["profile"]["username"] == "jobuser"
+    assert finished["result"]["weights"][0]["weight"] == 80.5
+
+    listed = client.get("/jobs", headers=headers).json()
+    assert [item["id"] for item in listed] == [job["id"]]
+    # The export itself is only sent by GET /jobs/{id}
+    assert listed[0]["status"] == "succeeded"
+    assert "result" not in listed[0]
+
+
+def test_jobs_are_private(client):
+    owner = auth_headers(client, "owner")
+    other = auth_headers(client, "other")
+    job_id = client.post("/profile/export", headers=owner).json()["id"]
+
+    assert client.get(f"/jobs/{job_id}", headers=other).status_code == 404
+    assert client.get("/jobs", headers=other).json() == []
+    assert client.get(f"/jobs/{job_id}").status_code == 401
+
+
+def test_usda_prefetch_imports_foods(client, pool, monkeypatch):
+    headers = auth_headers(client)
+
+    def fake_get_food(fdc_id):
+        if fdc_id == 404:
+            raise HTTPException(status_code=404, detail="USDA food not found")
+        return {
+            "description": f"Food {fdc_id}",
+            "servingSize": 100,
+            "servingSizeUnit": "g",
+            "foodNutrients": [{"nutrient": {"id": 1008}, "amount": 52}],
+        }
+
+    monkeypatch.setattr("app.services.usda.UsdaService.get_food", fake_get_food)
+
+    response = client.post(
+        "/nutrition/food-items/usda/prefetch",
+        json={"fdc_ids": [1001, 1002, 404, 1001]},
+        headers=headers,
+    )
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    pool.run_pending()
+
+    job = client.get(f"/jobs/{job_id}", headers=headers).json()
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"imported": [1001, 1002], "existing": [], "missing": [404]}
+    names = {item["name"] for item in client.get("/nutrition/food-items").json()}
+    assert {"Food 1001", "Food 1002"} <= names
+
+
+def test_usda_prefetch_retries_while_usda_is_down(client, pool, monkeypatch):
+    headers = auth_headers(client)
+
+    def unavailable(fdc_id):
+        raise HTTPException(status_code=503, detail="USDA temporarily unavailable")
+
+    monkeypatch.setattr("app.services.usda.UsdaService.get_food", unavailable)
+    job_id = client.post(
+        "/nutrition/food-items/usda/prefetch", json={"fdc_ids": [1001]}, headers=headers
+    ).json()["id"]
+    pool.run_pending()
+
+    job = client.get(f"/jobs/{job_id}", headers=headers).json()
+    assert job["status"] == "queued"
+    assert job["attempts"] == 1
+    assert "503" in job["error"]
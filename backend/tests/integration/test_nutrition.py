@@ -1,10 +1,12 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
 from app.database import Base, get_db
+from app.services.cache import clear_all_caches
+from app.utils.time import pst_today
 
 # Test database
 TEST_DATABASE_URL = "sqlite:///./test_nutrition.db"
@@ -283,3 +285,238 @@ def test_usda_search_and_create_food_item(client: TestClient, monkeypatch) -> No
     )
     assert create_duplicate.status_code == 200
     assert create_duplicate.json()["id"] == food_item["id"]
+
+
+def test_usda_outage_serves_degraded_local_results(client: TestClient, monkeypatch) -> None:
+    from fastapi import HTTPException
+
+    token = register_and_login(client)
+
+    def fake_get_food(fdc_id: int):
+        return {
+            "description": "Banana, raw",
+            "servingSize": 100,
+            "servingSizeUnit": "g",
+            "foodNutrients": [{"nutrient": {"name": "Energy", "unitName": "kcal"}, "amount": 89}],
+        }
+
+    monkeypatch.setattr("app.services.usda.UsdaService.get_food", fake_get_food)
+    client.post(
+        "/nutrition/food-items/usda",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"fdc_id": 456},
+    )
+
+    def unavailable(*args, **kwargs):
+        raise HTTPException(status_code=503, detail="USDA temporarily unavailable")
+
+    monkeypatch.setattr("app.services.usda.UsdaService.search_foods", unavailable)
+    monkeypatch.setattr("app.services.usda.UsdaService.get_food", unavailable)
+
+    search_response = client.get("/nutrition/usda/search?query=banana")
+    assert search_response.status_code == 200
+    search_data = search_response.json()
+    assert search_data["degraded"] is True
+    assert [r["fdc_id"] for r in search_data["results"]] == [456]
+
+    details_response = client.get("/nutrition/usda/456/details")
+    assert details_response.status_code == 200
+    details = details_response.json()
+    assert details["degraded"] is True
+    assert details["nutrients_per_100g"]["calories"] == 89
+
+    # Foods never imported still surface the outage
+    assert client.get("/nutrition/usda/789/details").status_code == 503
+
+
+def test_entry_writes_publish_day_invalidation(client: TestClient) -> None:
+    from app.services.invalidation import get_bus
+
+    token = register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    food = client.post(
+        "/nutrition/food-items",
+        headers=headers,
+        json={"name": "Rice", "serving_size": "100g", "calories": 130},
+    ).json()
+
+    received = []
+    get_bus().subscribe("user:", received.append)
+    try:
+        entry = client.post(
+            "/nutrition/entries",
+            headers=headers,
+            json={"food_item_id": food["id"], "meal_type": "lunch", "date": "2030-01-01"},
+        ).json()
+        client.delete(f"/nutrition/entries/{entry['id']}", headers=headers)
+    finally:
+        get_bus().unsubscribe(received.append)
+
+    assert len(received) == 2
+    assert all(topic.endswith(":day:2030-01-01") for topic in received)
+
+
+def test_quick_foods_rank_logged_foods(client: TestClient) -> None:
+    token = register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    foods = [
+        client.post(
+            "/nutrition/food-items",
+            headers=headers,
+            json={"name": name, "serving_size": "1 serving", "calories": 100},
+        ).json()
+        for name in ("Oatmeal", "Eggs", "Salad")
+    ]
+    oatmeal, eggs, salad = foods
+
+    def log(food, meal_type):
+        response = client.post(
+            "/nutrition/entries",
+            headers=headers,
+            json={"food_item_id": food["id"], "meal_type": meal_type},
+        )
+        assert response.status_code == 200
+
+    log(eggs, "breakfast")
+    log(oatmeal, "breakfast")
+    log(oatmeal, "breakfast")
+    log(salad, "lunch")
+    log(eggs, "lunch")
+
+    breakfast = client.get("/nutrition/quick-foods?meal_type=breakfast", headers=headers)
+    assert breakfast.status_code == 200
+    data = breakfast.json()
+    assert [item["food_item"]["name"] for item in data] == ["Oatmeal", "Eggs"]
+    assert data[0]["use_count"] == 2
+    assert data[0]["meal_type"] == "breakfast"
+
+    everything = client.get("/nutrition/quick-foods", headers=headers).json()
+    names = [item["food_item"]["name"] for item in everything]
+    assert sorted(names) == ["Eggs", "Oatmeal", "Salad"]
+    assert names[0] == "Oatmeal"
+
+
+def test_quick_foods_requires_auth(client: TestClient) -> None:
+    response = client.get("/nutrition/quick-foods")
+    assert response.status_code == 401
+
+
+def test_retried_entry_with_idempotency_key_is_logged_once(client: TestClient, monkeypatch) -> None:
+    from app.services.idempotency import IdempotencyStore
+
+    monkeypatch.setattr(
+        "app.middleware.idempotency.get_idempotency_store", lambda: IdempotencyStore(TestingSessionLocal)
+    )
+    token = register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": "3f1c2b9e-entry"}
+    food = client.post(
+        "/nutrition/food-items",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"name": "Oats", "serving_size": "40g", "calories": 150},
+    ).json()
+    payload = {"food_item_id": food["id"], "meal_type": "breakfast", "date": "2030-01-02"}
+
+    first = client.post("/nutrition/entries", headers=headers, json=payload)
+    retry = client.post("/nutrition/entries", headers=headers, json=payload)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    summary = client.get("/nutrition/daily?date=2030-01-02", headers={"Authorization": f"Bearer {token}"}).json()
+    assert summary["actual_intake"]["calories"] == 150
+
+    conflict = client.post("/nutrition/entries", headers=headers, json={**payload, "quantity": 2})
+    assert conflict.status_code == 422
+
+
+def log_day(client: TestClient, headers: dict) -> None:
+    food_ids = [
+        client.post(
+            "/nutrition/food-items",
+            headers=headers,
+            json={"name": name, "serving_size": "100g", "serving_size_grams": 100, "calories": calories,
+                  "protein_g": 10, "sodium_mg": 50},
+        ).json()["id"]
+        for name, calories in (("Yogurt", 60), ("Pasta", 160))
+    ]
+    for food_id, quantity, unit, meal in ((food_ids[0], 150, "g", "breakfast"), (food_ids[1], 2, "serving", "dinner")):
+        client.post(
+            "/nutrition/entries",
+            headers=headers,
+            json={"food_item_id": food_id, "quantity": quantity, "unit": unit, "meal_type": meal},
+        )
+    client.post(
+        "/nutrition/exercises",
+        headers=headers,
+        json={"name": "Bike", "calories_burned": 250, "date": pst_today().isoformat()},
+    )
+
+
+def count_statements(fn):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, statements
+
+
+def test_daily_summary_fields_trim_and_skip_queries(client: TestClient) -> None:
+    headers = {"Authorization": f"Bearer {register_and_login(client)}"}
+    log_day(client, headers)
+    full = client.get("/nutrition/daily", headers=headers).json()
+    clear_all_caches()
+
+    # Goals only: no entry or exercise query, just the user lookup for auth
+    response, statements = count_statements(
+        lambda: client.get("/nutrition/daily?fields=date,goals", headers=headers)
+    )
+    assert response.status_code == 200
+    assert response.json() == {"date": full["date"], "goals": full["goals"]}
+    assert len(statements) == 1
+    assert not any("calorie_entries" in statement for statement in statements)
+
+    # Remaining calories: one SUM over entries and one over exercises, no rows
+    response, statements = count_statements(
+        lambda: client.get("/nutrition/daily?fields=remaining.calories", headers=headers)
+    )
+    assert response.json() == {"remaining": {"calories": pytest.approx(full["remaining"]["calories"])}}
+    assert len(statements) == 3
+
+    response = client.get("/nutrition/daily?fields=actual_intake,meals.meal_type", headers=headers)
+    data = response.json()
+    assert data["actual_intake"] == pytest.approx(full["actual_intake"])
+    assert data["meals"] == [{"meal_type": "breakfast"}, {"meal_type": "dinner"}]
+
+
+def test_daily_summary_include_drops_entry_details(client: TestClient) -> None:
+    headers = {"Authorization": f"Bearer {register_and_login(client)}"}
+    log_day(client, headers)
+    full = client.get("/nutrition/daily", headers=headers).json()
+
+    # A cached full summary is trimmed rather than recomputed
+    response, statements = count_statements(
+        lambda: client.get("/nutrition/daily?include=totals", headers=headers)
+    )
+    entry = response.json()["meals"][0]["entries"][0]
+    assert "food_item" not in entry
+    assert entry["totals"] == full["meals"][0]["entries"][0]["totals"]
+    assert len(statements) == 1
+
+    entry = client.get("/nutrition/daily?include=", headers=headers).json()["meals"][0]["entries"][0]
+    assert "food_item" not in entry and "totals" not in entry
+    assert entry["quantity"] == 150
+
+
+def test_daily_summary_rejects_unknown_fields(client: TestClient) -> None:
+    headers = {"Authorization": f"Bearer {register_and_login(client)}"}
+    response = client.get("/nutrition/daily?fields=goals,remaining.kcal", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: remaining.kcal"
+    assert client.get("/nutrition/daily?include=food", headers=headers).status_code == 400
@@ -153,3 +153,26 @@ def test_nutrition_goals_with_complete_profile(client: TestClient) -> None:
     # For loss goal: 1970 - 500 = 1470
     assert data["calories"] <= data["tdee"]
     assert data["goal"] == "lose"
+
+
+def test_nutrition_goals_follow_logged_weight(client: TestClient) -> None:
+    """Goals are re-resolved when a new weight entry changes the profile weight"""
+    token = register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    client.put(
+        "/profile",
+        headers=headers,
+        json={"sex": "male", "age": 30, "height": 180, "weight": 75, "goal": "maintain"},
+    )
+    before = client.get("/profile/nutrition-goals", headers=headers).json()
+
+    client.post("/weights", headers=headers, json={"date": "2030-01-01", "weight": 85})
+    after = client.get("/profile/nutrition-goals", headers=headers).json()
+
+    assert after["bmr"] == before["bmr"] + 100
+    assert after["protein"] > before["protein"]
+
+    daily = client.get("/nutrition/daily", headers=headers).json()
+    assert daily["goals"]["calories"] == after["calories"]
+    assert daily["goals"]["protein_g"] == after["protein"]
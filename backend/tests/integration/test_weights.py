@@ -376,3 +376,28 @@ def test_get_weight_history_limit_returns_in_ascending_order(client, auth_header
     # Should be the 3 most recent dates
     expected_dates = sorted([str(d) for d in [today - timedelta(days=1), today - timedelta(days=2), today - timedelta(days=5)]])
     assert dates_returned == expected_dates
+
+
+def test_get_weight_history_fields(client, auth_headers, test_user):
+    """Sparse fields trim each point; change is only computed when asked for"""
+    today = date.today()
+    for days_ago, weight in ((2, 75.0), (1, 75.5), (0, 74.8)):
+        client.post("/weights", json={"date": str(today - timedelta(days=days_ago)), "weight": weight},
+                    headers=auth_headers)
+
+    response = client.get("/weights/history?days=7&fields=date,weight", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {"date": str(today - timedelta(days=2)), "weight": 75.0},
+        {"date": str(today - timedelta(days=1)), "weight": 75.5},
+        {"date": str(today), "weight": 74.8},
+    ]
+
+    response = client.get("/weights/history?limit=2&fields=change", headers=auth_headers)
+    assert response.json() == [{"change": None}, {"change": -0.7}]
+
+    response = client.get("/weights/history?aggregation=week&fields=weight", headers=auth_headers)
+    assert all(set(point) == {"weight"} for point in response.json())
+
+    response = client.get("/weights/history?fields=bmi", headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
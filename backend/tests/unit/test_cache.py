@@ -0,0 +1,277 @@
+"""Unit tests for the cache layer and its backends"""
+import socket
+import socketserver
+import threading
+import time
+
+import pytest
+
+from app.services.cache import Cache, MemoryBackend, cached, cache_stats, get_cache
+from app.services.cache_redis import RedisBackend, RespClient
+from app.services.calculations import get_nutrition_goals
+from app.services.invalidation import ALL_TOPIC, InvalidationBus
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Speaks the subset of RESP the cache backend uses"""
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            count = int(line[1:-2])
+            args = []
+            for _ in range(count):
+                length = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(length + 2)[:-2])
+            self.wfile.write(self.server.execute(args))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeRedisHandler)
+        self.data = {}
+        self.expires = {}
+        self.commands = []
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def bulk(value):
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _live(self, key):
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def execute(self, args):
+        command = args[0].decode().upper()
+        self.commands.append(command)
+        with self.lock:
+            if command == "PING":
+                return b"+PONG\r\n"
+            if command == "GET":
+                return self.bulk(self._live(args[1]))
+            if command == "SET":
+                self.data[args[1]] = args[2]
+                self.expires.pop(args[1], None)
+                if len(args) == 5 and args[3].upper() == b"PX":
+                    self.expires[args[1]] = time.monotonic() + int(args[4]) / 1000
+                return b"+OK\r\n"
+            if command == "DEL":
+                removed = sum(self.data.pop(key, None) is not None for key in args[1:])
+                return b":%d\r\n" % removed
+            if command == "SADD":
+                members = self.data.setdefault(args[1], set())
+                before = len(members)
+                members.update(args[2:])
+                return b":%d\r\n" % (len(members) - before)
+            if command == "SMEMBERS":
+                members = self._live(args[1]) or set()
+                return b"*%d\r\n" % len(members) + b"".join(self.bulk(m) for m in members)
+            if command == "SCAN":
+                pattern = args[3].rstrip(b"*")
+                keys = [key for key in list(self.data) if key.startswith(pattern) and self._live(key) is not None]
+                return b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys) + b"".join(self.bulk(k) for k in keys)
+            if command == "PEXPIRE":
+                self.expires[args[1]] = time.monotonic() + int(args[2]) / 1000
+                return b":1\r\n"
+            return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture
+def redis_server():
+    server = FakeRedisServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = Cache("test.lru", MemoryBackend(max_size=2, policy="lru"))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_lfu_evicts_least_frequently_used():
+    cache = Cache("test.lfu", MemoryBackend(max_size=2, policy="lfu"))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    for _ in range(3):
+        cache.get("a")
+    cache.get("b")
+    cache.set("c", 3)  # evicts b (2 uses) rather than a (4 uses)
+    cache.set("d", 4)  # evicts c (1 use)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") is None
+    assert cache.get("d") == 4
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        MemoryBackend(policy="fifo")
+
+
+def test_ttl_expiry():
+    cache = Cache("test.ttl", MemoryBackend(), ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert len(cache.backend) == 0
+
+
+def test_tag_invalidation_and_stats():
+    cache = Cache("test.tags", MemoryBackend(), serializer="pickle")
+    cache.set("day1", {"calories": 100}, tags=["user:1:day:2030-01-01"])
+    cache.set("profile", {"weight": 70}, tags=["user:1:profile"])
+
+    assert cache.invalidate_tag("user:1:day:2030-01-01") == 1
+    assert cache.get("day1") is None
+    assert cache.get("profile") == {"weight": 70}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["invalidations"] == 1
+    assert stats["entries"] == 1
+    assert stats["memory_bytes"] > 0
+
+
+def test_bus_topics_invalidate_tags():
+    bus = InvalidationBus()
+    cache = Cache("test.bus", MemoryBackend())
+    bus.subscribe("", cache.on_invalidation)
+    cache.set("a", 1, tags=["user:1:profile"])
+    cache.set("b", 2, tags=["user:2:profile"])
+
+    bus.publish("user:1:profile")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    bus.publish(ALL_TOPIC)
+    assert cache.get("b") is None
+
+
+def test_cached_decorator_skips_repeat_calls_and_errors():
+    calls = []
+
+    @cached("test.decorator", key=lambda x: x, tags=lambda x: [f"item:{x}"])
+    def square(x):
+        calls.append(x)
+        if x < 0:
+            raise ValueError("negative")
+        return x * x
+
+    assert square(3) == 9
+    assert square(3) == 9
+    assert calls == [3]
+
+    with pytest.raises(ValueError):
+        square(-1)
+    with pytest.raises(ValueError):
+        square(-1)
+    assert calls == [3, -1, -1]
+
+    square.cache.invalidate_tag("item:3")
+    assert square(3) == 9
+    assert calls == [3, -1, -1, 3]
+
+
+def test_get_nutrition_goals_is_cached():
+    kwargs = {"sex": "male", "age": 30, "height": 180, "weight": 75, "goal": "lose"}
+    first = get_nutrition_goals(**kwargs)
+    second = get_nutrition_goals(**kwargs)
+    assert first == second
+    assert cache_stats()["nutrition_goals"]["hits"] >= 1
+
+
+def test_get_cache_returns_same_namespace():
+    assert get_cache("test.shared") is get_cache("test.shared")
+
+
+def test_redis_backend_round_trip(redis_server):
+    client = RespClient("127.0.0.1", redis_server.server_address[1])
+    cache = Cache("test.redis", RedisBackend(client, "test.redis"), serializer="pickle")
+
+    cache.set("a", {"calories": 100}, tags=["user:1:profile"])
+    cache.set("b", [1, 2, 3], ttl=0.05)
+    assert cache.get("a") == {"calories": 100}
+    assert cache.get("b") == [1, 2, 3]
+    assert len(cache.backend) == 2  # tag sets are not counted
+
+    time.sleep(0.06)
+    assert cache.get("b") is None
+
+    assert cache.invalidate_tag("user:1:profile") == 1
+    assert cache.get("a") is None
+
+    cache.set("c", "value")
+    cache.clear()
+    assert cache.get("c") is None
+    assert cache.stats()["memory_bytes"] is None
+
+
+def test_redis_backend_pipelines_set(redis_server):
+    client = RespClient("127.0.0.1", redis_server.server_address[1])
+    backend = RedisBackend(client, "test.pipeline")
+    backend.set("k", b"v", 10, ["tag"], 1)
+    assert redis_server.commands == ["SET", "SADD", "PEXPIRE"]
+
+
+def test_redis_client_reconnects_after_server_restart(redis_server):
+    client = RespClient("127.0.0.1", redis_server.server_address[1])
+    assert client.execute("PING") == "PONG"
+    client._local.conn[0].shutdown(socket.SHUT_RDWR)
+    with pytest.raises(OSError):
+        client.execute("PING")
+    assert client.execute("PING") == "PONG"
+
+
+def test_backend_errors_are_misses_and_dropped_writes():
+    class DownBackend(MemoryBackend):
+        def get(self, key):
+            raise ConnectionError("Connection refused")
+
+        def set(self, key, value, ttl, tags, size):
+            raise OSError("Connection reset by peer")
+
+    cache = Cache("test.down", DownBackend())
+    assert cache.get("a", "default") == "default"
+    cache.set("a", 1)
+    assert cache.get_or_set("a", lambda: 42) == 42
+
+    stats = cache.stats()
+    assert stats["errors"] == 4
+    assert stats["misses"] == 2
+    assert stats["sets"] == 0
+
+
+def test_unreachable_redis_falls_back_to_computing(redis_server):
+    client = RespClient("127.0.0.1", redis_server.server_address[1])
+    cache = Cache("test.redis-down", RedisBackend(client, "test.redis-down"), serializer="pickle")
+    cache.set("a", {"calories": 100})
+    redis_server.shutdown()
+    redis_server.server_close()
+    client._local.conn[0].shutdown(socket.SHUT_RDWR)
+
+    assert cache.get_or_set("a", lambda: {"calories": 200}) == {"calories": 200}
+    assert cache.stats()["errors"] >= 1
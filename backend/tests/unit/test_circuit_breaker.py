@@ -0,0 +1,52 @@
+"""Unit tests for the failure-rate circuit breaker"""
+import time
+
+from app.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_stays_closed_below_min_calls():
+    breaker = CircuitBreaker(window=10, min_calls=3, failure_rate=0.5)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_opens_at_failure_rate_within_window():
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_rate=0.5)
+    for outcome in (True, True, False):
+        breaker.record_success() if outcome else breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_old_failures_fall_out_of_window():
+    breaker = CircuitBreaker(window=3, min_calls=3, failure_rate=0.6)
+    breaker.record_failure()
+    for _ in range(3):
+        breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_limits_probes_and_reopens_on_failure():
+    breaker = CircuitBreaker(window=2, min_calls=1, failure_rate=1.0, open_seconds=0.05, half_open_probes=1)
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.stats()["times_opened"] == 2
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
@@ -0,0 +1,99 @@
+"""Unit tests for the response compression middleware"""
+import gzip
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+import app.middleware.compression as compression
+from app.middleware.compression import CompressionMiddleware, choose_encoding, no_compression
+
+LARGE = [{"date": f"2030-01-{i % 28 + 1:02d}", "weight": 70.5} for i in range(200)]
+
+
+def make_client(**options):
+    test_app = FastAPI()
+
+    @test_app.get("/large")
+    def large():
+        return LARGE
+
+    @test_app.get("/small")
+    def small():
+        return {"status": "ok"}
+
+    @test_app.get("/opted-out")
+    @no_compression
+    def opted_out():
+        return LARGE
+
+    @test_app.get("/binary")
+    def binary():
+        return PlainTextResponse("x" * 5000, media_type="application/octet-stream")
+
+    @test_app.get("/stream")
+    def stream():
+        return StreamingResponse((b"chunk-%d," % i * 50 for i in range(100)), media_type="text/plain")
+
+    test_app.add_middleware(CompressionMiddleware, **options)
+    return TestClient(test_app)
+
+
+@pytest.fixture(autouse=True)
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+
+def raw_get(client, path, accept_encoding="gzip"):
+    # Read the undecoded body to check what actually goes over the wire
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_choose_encoding():
+    assert choose_encoding(None) is None
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("br") is None  # brotli not installed
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("*") == "gzip"
+
+
+def test_large_json_is_gzipped():
+    client = make_client(min_size=500)
+    response, body = raw_get(client, "/large")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(body)
+    assert len(body) < len(gzip.decompress(body)) / 5
+    assert client.get("/large").json() == LARGE
+
+
+def test_small_opted_out_and_binary_responses_are_untouched():
+    client = make_client(min_size=500)
+    for path in ("/small", "/opted-out", "/binary"):
+        response, _ = raw_get(client, path)
+        assert "content-encoding" not in response.headers, path
+    assert raw_get(client, "/small")[0].headers["vary"] == "Accept-Encoding"
+
+
+def test_no_accept_encoding_means_identity():
+    response, body = raw_get(make_client(min_size=10), "/large", accept_encoding="identity")
+    assert "content-encoding" not in response.headers
+    assert len(body) == int(response.headers["content-length"])
+
+
+def test_streamed_responses_are_compressed_incrementally():
+    client = make_client(min_size=100)
+    response, body = raw_get(client, "/stream")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(body) == b"".join(b"chunk-%d," % i * 50 for i in range(100))
+
+
+def test_brotli_preferred_when_available(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", brotli)
+    response, body = raw_get(make_client(min_size=500), "/large", accept_encoding="gzip, br")
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(body).startswith(b'[{"date"')
@@ -0,0 +1,95 @@
+"""Unit tests for MessagePack content negotiation"""
+from datetime import date
+
+import msgpack
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+import app.middleware.msgpack as msgpack_middleware
+from app.middleware.msgpack import MsgpackMiddleware
+from app.utils.content_negotiation import is_msgpack, prefers_msgpack
+from app.utils.serialization import serialized
+
+
+class Reading(BaseModel):
+    date: date
+    weight: float
+
+
+def make_client():
+    test_app = FastAPI()
+
+    @test_app.get("/plain")
+    def plain():
+        return {"weight": 70.5, "date": "2030-01-01"}
+
+    @test_app.get("/readings", response_model=list[Reading])
+    @serialized(list[Reading])
+    def readings():
+        return [{"date": date(2030, 1, i), "weight": 70 + i / 10} for i in range(1, 4)]
+
+    @test_app.post("/echo")
+    def echo(reading: Reading):
+        return reading
+
+    test_app.add_middleware(MsgpackMiddleware)
+    return TestClient(test_app)
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, False),
+        ("application/json", False),
+        ("application/msgpack", True),
+        ("application/x-msgpack", True),
+        ("application/json;q=0.5, application/msgpack", True),
+        ("application/msgpack;q=0.2, application/json", False),
+        ("*/*", False),
+        ("application/msgpack;q=0", False),
+    ],
+)
+def test_prefers_msgpack(accept, expected):
+    assert prefers_msgpack(accept) is expected
+
+
+def test_is_msgpack():
+    assert is_msgpack("application/msgpack; charset=binary")
+    assert not is_msgpack("application/json")
+    assert not is_msgpack(None)
+
+
+def test_falls_back_to_json_without_msgpack(monkeypatch):
+    monkeypatch.setattr(msgpack_middleware, "msgpack_available", lambda: False)
+    client = make_client()
+
+    response = client.get("/plain", headers={"Accept": "application/msgpack"})
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["vary"] == "Accept"
+    assert response.json()["weight"] == 70.5
+
+    response = client.post("/echo", content=b"\x80", headers={"Content-Type": "application/msgpack"})
+    assert response.status_code == 415
+
+
+def test_msgpack_round_trip():
+    client = make_client()
+
+    response = client.get("/plain", headers={"Accept": "application/msgpack"})
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content) == {"weight": 70.5, "date": "2030-01-01"}
+
+    response = client.get("/readings", headers={"Accept": "application/msgpack"})
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content)[0] == {"date": "2030-01-01", "weight": 70.1}
+    assert client.get("/readings").json()[0] == {"date": "2030-01-01", "weight": 70.1}
+
+    body = msgpack.packb({"date": "2030-01-05", "weight": 71.0})
+    response = client.post("/echo", content=body, headers={"Content-Type": "application/msgpack"})
+    assert response.status_code == 200
+    assert response.json() == {"date": "2030-01-05", "weight": 71.0}
+
+    response = client.post("/echo", content=b"\xc1", headers={"Content-Type": "application/msgpack"})
+    assert response.status_code == 400
@@ -0,0 +1,53 @@
+"""Unit tests for sparse fieldset parsing"""
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.food_entry import DailyNutritionSummary
+from app.schemas.weight_entry import WeightTrendData
+from app.utils.fieldsets import FieldSet, split_list
+
+
+def test_nested_paths_become_include_mapping():
+    fields = FieldSet(DailyNutritionSummary, "goals, remaining.calories,meals.entries.quantity")
+    assert fields.include == {
+        "goals": True,
+        "remaining": {"calories": True},
+        "meals": {"__all__": {"entries": {"__all__": {"quantity": True}}}},
+    }
+
+
+def test_whole_field_wins_over_its_subfields():
+    for raw in ("remaining.calories,remaining", "remaining,remaining.calories"):
+        assert FieldSet(DailyNutritionSummary, raw).include == {"remaining": True}
+
+
+def test_list_responses_select_item_fields():
+    assert FieldSet(list[WeightTrendData], "date,weight").include == {"__all__": {"date": True, "weight": True}}
+
+
+def test_contains_matches_parents_and_children():
+    fields = FieldSet(DailyNutritionSummary, "remaining.calories,meals")
+    assert "remaining" in fields
+    assert "meals.entries.food_item" in fields
+    assert "goals" not in fields
+    assert fields.requested({"goals", "remaining", "meals", "exercises"}) == {"remaining", "meals"}
+
+
+def test_no_fields_selects_everything():
+    for raw in (None, "", " , "):
+        fields = FieldSet(DailyNutritionSummary, raw)
+        assert fields.include is None
+        assert "anything" in fields
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as excinfo:
+        FieldSet(DailyNutritionSummary, "goals,goals.calories.value,totals")
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail == "Unknown fields: goals.calories.value, totals"
+
+
+def test_split_list():
+    assert split_list(None) is None
+    assert split_list("") == []
+    assert split_list("a, b,,c ") == ["a", "b", "c"]
@@ -0,0 +1,105 @@
+"""Unit tests for resolved nutrition goals"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.user import User
+from app.services import goals as goals_service
+from app.services.goals import (
+    DEFAULT_GOALS,
+    GOALS_VERSION,
+    compute_goals,
+    get_user_goals,
+    refresh_user_goals,
+)
+
+# Test database
+TEST_DATABASE_URL = "sqlite:///./test_goals_service.db"
+engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db_session():
+    """Create a fresh database session for each test"""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_compute_goals_default_for_incomplete_profile():
+    user = User(username="newbie", hashed_password="x")
+    goals = compute_goals(user)
+    assert goals["source"] == "default"
+    assert goals["calories"] == DEFAULT_GOALS["calories"]
+    assert goals["protein_g"] == DEFAULT_GOALS["protein_g"]
+
+
+def test_compute_goals_calculated_from_profile():
+    user = User(username="calc", hashed_password="x", sex="male", age=30, height=180, weight=75, goal="lose")
+    goals = compute_goals(user)
+    assert goals["source"] == "calculated"
+    assert goals["calories"] == goals["tdee"] - 500
+    assert goals["protein_g"] == 150  # 2.0 g/kg when losing weight
+
+
+def test_compute_goals_custom_overrides_profile():
+    user = User(
+        username="custom",
+        hashed_password="x",
+        sex="male",
+        age=30,
+        height=180,
+        weight=75,
+        use_custom_nutrition=True,
+        custom_calories=2000,
+        custom_protein_percent=0.3,
+        custom_carbs_percent=0.4,
+        custom_fat_percent=0.3,
+    )
+    goals = compute_goals(user)
+    assert goals["source"] == "custom"
+    assert goals["bmr"] == 0
+    assert goals["calories"] == 2000
+    assert goals["protein_g"] == 150
+    assert goals["carbs_g"] == 200
+    assert goals["fat_g"] == 67
+
+
+def test_refresh_user_goals_stores_version():
+    user = User(username="stored", hashed_password="x", sex="female", age=28, height=165, weight=60)
+    refresh_user_goals(user)
+    assert user.goals_version == GOALS_VERSION
+    assert user.goals_source == "calculated"
+    assert user.goal_calories == compute_goals(user)["calories"]
+
+
+def test_get_user_goals_reads_stored_values_without_recomputing(db_session, monkeypatch):
+    user = User(username="reader", hashed_password="x", sex="male", age=30, height=180, weight=75)
+    refresh_user_goals(user)
+    db_session.add(user)
+    db_session.commit()
+
+    def fail(_user):
+        raise AssertionError("goals should not be recomputed")
+
+    monkeypatch.setattr(goals_service, "compute_goals", fail)
+    goals = get_user_goals(user, db_session)
+    assert goals["source"] == "calculated"
+    assert goals["calories"] == user.goal_calories
+
+
+def test_get_user_goals_backfills_legacy_rows(db_session):
+    user = User(username="legacy", hashed_password="x", sex="male", age=30, height=180, weight=75)
+    db_session.add(user)
+    db_session.commit()
+    assert user.goals_version is None
+
+    goals = get_user_goals(user, db_session)
+    db_session.expire_all()
+    stored = db_session.query(User).filter(User.username == "legacy").first()
+    assert stored.goals_version == GOALS_VERSION
+    assert stored.goal_calories == goals["calories"]
@@ -1,7 +1,13 @@
+import threading
+import time
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
 
+from app.database import engine, get_db
 from app.main import app
+from app.services.readiness import UsdaProbe, get_readiness
 
 
 @pytest.fixture
@@ -13,3 +19,80 @@ def test_health_check(client: TestClient) -> None:
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+@pytest.fixture
+def readiness(monkeypatch):
+    readiness = get_readiness()
+    readiness.clear()
+    monkeypatch.setenv("USDA_API_KEY", "test-key")
+    monkeypatch.setattr(readiness.usda_probe, "snapshot", lambda: {"status": "ok"})
+    yield readiness
+    readiness.clear()
+
+
+def test_ready_reports_each_dependency(client: TestClient, readiness) -> None:
+    response = client.get("/health/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["checks"]["database"]["status"] == "ok"
+    assert body["checks"]["database"]["latency_ms"] >= 0
+    assert body["checks"]["pool"]["status"] == "ok"
+    assert body["checks"]["usda"] == {"status": "ok", "circuit": "closed"}
+    assert body["checks"]["cache"]["backend"] == "memory"
+    assert response.headers["cache-control"] == "no-store"
+
+
+def test_ready_is_unready_when_database_is_down(client: TestClient, readiness) -> None:
+    class BrokenSession:
+        def execute(self, *args, **kwargs):
+            raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+        def get_bind(self):
+            return engine
+
+    app.dependency_overrides[get_db] = lambda: BrokenSession()
+    try:
+        response = client.get("/health/ready")
+    finally:
+        app.dependency_overrides.pop(get_db)
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "unready"
+    assert response.json()["checks"]["database"] == {"status": "down", "error": "OperationalError"}
+
+
+def test_ready_is_degraded_without_usda_key(client: TestClient, readiness, monkeypatch) -> None:
+    monkeypatch.delenv("USDA_API_KEY")
+
+    body = client.get("/health/ready").json()
+
+    assert body["status"] == "degraded"
+    assert body["checks"]["usda"] == {"status": "unconfigured"}
+
+
+def test_ready_reuses_recent_result(client: TestClient, readiness) -> None:
+    first = client.get("/health/ready").json()
+    second = client.get("/health/ready").json()
+
+    assert second["checked_at"] == first["checked_at"]
+    assert second["checks"]["database"] == first["checks"]["database"]
+
+
+def test_usda_probe_never_blocks_the_request() -> None:
+    release = threading.Event()
+    probe = UsdaProbe(interval=60)
+    probe.probe = lambda: release.wait(5) and {"status": "ok"}
+
+    started = time.perf_counter()
+    assert probe.snapshot() == {"status": "unknown"}
+    assert probe.snapshot() == {"status": "unknown"}
+    assert time.perf_counter() - started < 0.5
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while probe.snapshot()["status"] == "unknown" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert probe.snapshot() == {"status": "ok"}
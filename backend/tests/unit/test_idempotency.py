@@ -0,0 +1,175 @@
+"""Unit tests for Idempotency-Key handling"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.models.idempotency_key import IdempotencyKey
+from app.services.auth import create_access_token
+from app.services.idempotency import (
+    IN_PROGRESS,
+    MISMATCH,
+    REPLAY,
+    STARTED,
+    IdempotencyStore,
+    StoredResponse,
+    request_fingerprint,
+)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def store(session_factory):
+    return IdempotencyStore(session_factory)
+
+
+def test_fingerprint_covers_path_query_and_body():
+    base = request_fingerprint("POST", "/weights", b"", b'{"weight": 80}')
+    assert base == request_fingerprint("POST", "/weights", b"", b'{"weight": 80}')
+    assert base != request_fingerprint("POST", "/weights", b"", b'{"weight": 81}')
+    assert base != request_fingerprint("POST", "/weights", b"x=1", b'{"weight": 80}')
+    assert base != request_fingerprint("POST", "/nutrition/exercises", b"", b'{"weight": 80}')
+
+
+def test_store_lifecycle(store):
+    assert store.begin("alice", "k1", "hash") == (STARTED, None)
+    assert store.begin("alice", "k1", "hash") == (IN_PROGRESS, None)
+    assert store.begin("alice", "k1", "other") == (MISMATCH, None)
+    # Keys are per caller
+    assert store.begin("bob", "k1", "other") == (STARTED, None)
+
+    store.complete("alice", "k1", StoredResponse(201, [["content-type", "application/json"]], b"{}"))
+    state, stored = store.begin("alice", "k1", "hash")
+    assert state == REPLAY
+    assert (stored.status_code, stored.body) == (201, b"{}")
+
+
+def test_released_key_runs_again(store):
+    store.begin("alice", "k1", "hash")
+    store.release("alice", "k1")
+    assert store.begin("alice", "k1", "hash") == (STARTED, None)
+
+
+def test_expired_and_abandoned_keys_are_replaced(session_factory):
+    store = IdempotencyStore(session_factory, ttl_hours=1, lock_seconds=-1)
+    # The first request's lock has already lapsed (its worker died)
+    store.begin("alice", "k1", "hash")
+    assert store.begin("alice", "k1", "other") == (STARTED, None)
+
+    store.complete("alice", "k1", StoredResponse(200, [], b"old"))
+    db = session_factory()
+    db.query(IdempotencyKey).update({IdempotencyKey.expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    assert store.begin("alice", "k1", "hash") == (STARTED, None)
+
+    assert IdempotencyStore.prune(db, datetime.utcnow() + timedelta(hours=2)) == 1
+    db.close()
+
+
+class Harness:
+    def __init__(self, store, status=201):
+        self.calls = 0
+        self.status = status
+
+        async def app(scope, receive, send):
+            self.calls += 1
+            message = await receive()
+            await send({"type": "http.response.start", "status": self.status,
+                        "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": b'{"echo": ' + message["body"] + b"}"})
+
+        self.middleware = IdempotencyMiddleware(app, store=store, enabled=True)
+
+    def post(self, body: bytes, key: str | None = "key-1", path: str = "/weights", user: str | None = "alice"):
+        headers = [(b"content-type", b"application/json")]
+        if user is not None:
+            token = create_access_token({"sub": user})
+            headers.append((b"authorization", f"Bearer {token}".encode()))
+        if key is not None:
+            headers.append((b"idempotency-key", key.encode()))
+        scope = {"type": "http", "method": "POST", "path": path, "query_string": b"", "headers": headers}
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(self.middleware(scope, receive, send))
+        start = messages[0]
+        return start["status"], dict(start["headers"]), b"".join(m.get("body", b"") for m in messages[1:])
+
+
+def test_retry_replays_without_running_again(store):
+    harness = Harness(store)
+    first = harness.post(b"80")
+    retry = harness.post(b"80")
+
+    assert harness.calls == 1
+    assert first[0] == retry[0] == 201
+    assert retry[2] == first[2] == b'{"echo": 80}'
+    assert retry[1][b"idempotent-replayed"] == b"true"
+    assert b"idempotent-replayed" not in first[1]
+
+
+def test_key_reuse_with_different_body_is_rejected(store):
+    harness = Harness(store)
+    harness.post(b"80")
+    status, _, _ = harness.post(b"81")
+    assert status == 422
+    assert harness.calls == 1
+
+
+def test_requests_without_key_are_untouched(store):
+    harness = Harness(store)
+    harness.post(b"80", key=None)
+    harness.post(b"80", key=None)
+    assert harness.calls == 2
+
+
+def test_keys_are_per_user(store):
+    harness = Harness(store)
+    harness.post(b"80", user="alice")
+    status, headers, _ = harness.post(b"80", user="bob")
+    assert harness.calls == 2
+    assert status == 201
+    assert b"idempotent-replayed" not in headers
+
+
+def test_anonymous_and_auth_requests_are_not_stored(store):
+    harness = Harness(store)
+    harness.post(b"80", user=None)
+    harness.post(b"80", user=None)
+    harness.post(b"80", path="/auth/login")
+    harness.post(b"80", path="/auth/login")
+    assert harness.calls == 4
+    assert store.begin("alice", "key-1", request_fingerprint("POST", "/auth/login", b"", b"80")) == (STARTED, None)
+
+
+def test_invalid_key_is_rejected(store):
+    harness = Harness(store)
+    assert harness.post(b"80", key="x" * 300)[0] == 400
+    assert harness.calls == 0
+
+
+def test_server_errors_are_not_stored(store):
+    harness = Harness(store, status=500)
+    harness.post(b"80")
+    harness.status = 201
+    status, headers, _ = harness.post(b"80")
+    assert harness.calls == 2
+    assert status == 201
+    assert b"idempotent-replayed" not in headers
@@ -0,0 +1,180 @@
+"""Unit tests for the cache invalidation bus"""
+import os
+import subprocess
+import sys
+import textwrap
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from app.services.invalidation import (
+    ALL_TOPIC,
+    InvalidationBus,
+    SqlitePollingBus,
+    user_day_topic,
+    user_profile_topic,
+)
+
+BACKEND_DIR = Path(__file__).parent.parent.parent
+
+# Each worker subscribes to user topics and prints every topic it receives
+WORKER_SCRIPT = textwrap.dedent(
+    """
+    import sys, threading
+    from app.services.invalidation import SqlitePollingBus
+
+    bus = SqlitePollingBus(sys.argv[1], poll_interval=0.05)
+    received = []
+    done = threading.Event()
+
+    def on_topic(topic):
+        received.append(topic)
+        print(topic, flush=True)
+        if len(received) >= int(sys.argv[2]):
+            done.set()
+
+    bus.subscribe("user:", on_topic)
+    bus.start()
+    print("ready", flush=True)
+    done.wait(timeout=15)
+    bus.stop()
+    """
+)
+
+# Mirrors the pre-forking server: the bus and a cache subscribed to it are
+# created before fork, then one worker's write must evict the other's entry
+FORKED_WORKERS_SCRIPT = textwrap.dedent(
+    """
+    import os, sys, time
+    from app.services import invalidation
+    from app.services.cache import get_cache
+
+    invalidation._bus = invalidation.SqlitePollingBus(sys.argv[1], poll_interval=0.05)
+    cache = get_cache("fork-test")
+    ready_r, ready_w = os.pipe()
+
+    reader = os.fork()
+    if reader == 0:
+        cache.set("day", "stale", tags=["user:1:day:2030-01-01"])
+        invalidation.get_bus().start()
+        os.write(ready_w, b"x")
+        deadline = time.monotonic() + 10
+        while cache.get("day") is not None and time.monotonic() < deadline:
+            time.sleep(0.02)
+        os._exit(0 if cache.get("day") is None else 1)
+
+    writer = os.fork()
+    if writer == 0:
+        os.read(ready_r, 1)
+        invalidation.publish("user:1:day:2030-01-01")
+        os._exit(0)
+
+    codes = [os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]) for pid in (writer, reader)]
+    print(" ".join(map(str, codes)), flush=True)
+    """
+)
+
+
+def test_topic_helpers():
+    assert user_day_topic(3, date(2030, 1, 2)) == "user:3:day:2030-01-02"
+    assert user_profile_topic(3) == "user:3:profile"
+
+
+def test_local_bus_dispatches_by_prefix():
+    bus = InvalidationBus()
+    user_one, everything = [], []
+    bus.subscribe("user:1:", user_one.append)
+    bus.subscribe("", everything.append)
+
+    bus.publish("user:1:profile", "user:2:profile")
+
+    assert user_one == ["user:1:profile"]
+    assert everything == ["user:1:profile", "user:2:profile"]
+
+
+def test_all_topic_reaches_every_subscriber():
+    bus = InvalidationBus()
+    received = []
+    bus.subscribe("user:1:", received.append)
+    bus.publish(ALL_TOPIC)
+    assert received == [ALL_TOPIC]
+
+
+def test_failing_subscriber_does_not_block_others():
+    bus = InvalidationBus()
+    received = []
+
+    def broken(topic):
+        raise RuntimeError("boom")
+
+    bus.subscribe("", broken)
+    bus.subscribe("", received.append)
+    bus.publish("food-items")
+    assert received == ["food-items"]
+
+
+def test_sqlite_bus_skips_own_events(tmp_path):
+    path = str(tmp_path / "bus.db")
+    publisher = SqlitePollingBus(path)
+    other = SqlitePollingBus(path)
+    mine, theirs = [], []
+    publisher.subscribe("", mine.append)
+    other.subscribe("", theirs.append)
+
+    publisher.publish("user:1:profile")
+    publisher.poll()
+    other.poll()
+
+    assert mine == ["user:1:profile"]
+    assert theirs == ["user:1:profile"]
+
+
+def test_sqlite_bus_fans_out_to_worker_processes(tmp_path):
+    path = str(tmp_path / "shared.db")
+    SqlitePollingBus(path)  # create the events table before workers start
+
+    topics = ["user:1:day:2030-01-01", "user:2:profile"]
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER_SCRIPT, path, str(len(topics))],
+            cwd=BACKEND_DIR,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(3)
+    ]
+    try:
+        for worker in workers:
+            assert worker.stdout.readline().strip() == "ready"
+
+        publisher = SqlitePollingBus(path)
+        publisher.publish(*topics)
+        publisher.publish("food-items")  # not subscribed by the workers
+
+        for worker in workers:
+            output, _ = worker.communicate(timeout=20)
+            assert output.split() == topics
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.kill()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_workers_invalidate_each_other(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-c", FORKED_WORKERS_SCRIPT, str(tmp_path / "forked.db")],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    assert result.stdout.split() == ["0", "0"], result.stderr
+
+
+def test_reset_after_fork_gives_a_new_origin(tmp_path):
+    bus = SqlitePollingBus(str(tmp_path / "bus.db"))
+    origin = bus.origin
+    bus.reset_after_fork()
+    assert bus.origin != origin
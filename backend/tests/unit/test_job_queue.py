@@ -0,0 +1,171 @@
+"""Unit tests for the database-backed job queue"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.job import Job
+from app.services import jobs
+from app.services.jobs import (
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    JobWorkerPool,
+    PermanentJobError,
+    claim,
+    enqueue,
+    job_handler,
+    prune_jobs,
+    retry_delay,
+    run_job,
+)
+
+calls = []
+
+
+@job_handler("test.echo")
+def echo(db, job):
+    calls.append(job.payload)
+    return {"echo": job.payload["value"]}
+
+
+@job_handler("test.flaky")
+def flaky(db, job):
+    if job.attempts < 2:
+        raise RuntimeError("upstream timed out")
+    return "ok"
+
+
+@job_handler("test.invalid")
+def invalid(db, job):
+    raise PermanentJobError("bad payload")
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    calls.clear()
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+def test_enqueue_rejects_unknown_kind(db):
+    with pytest.raises(ValueError):
+        enqueue(db, "test.nope")
+
+
+def test_job_runs_once_and_stores_result(db, session_factory):
+    job = enqueue(db, "test.echo", {"value": 42})
+    pool = JobWorkerPool(session_factory, workers=0)
+
+    assert pool.run_pending() == 1
+    assert pool.run_pending() == 0
+
+    db.expire_all()
+    job = db.get(Job, job.id)
+    assert job.status == SUCCEEDED
+    assert job.result == {"echo": 42}
+    assert job.attempts == 1
+    assert job.locked_by is None
+    assert calls == [{"value": 42}]
+
+
+def test_claim_is_exclusive(db):
+    job = enqueue(db, "test.echo", {"value": 1})
+    assert claim(db, "worker-a").id == job.id
+    assert claim(db, "worker-b") is None
+
+
+def test_delayed_job_waits_for_run_at(db):
+    enqueue(db, "test.echo", {"value": 1}, delay=60)
+    assert claim(db, "worker") is None
+
+
+def test_failure_retries_with_backoff_then_succeeds(db):
+    job = enqueue(db, "test.flaky")
+    claimed = claim(db, "worker")
+    assert run_job(db, claimed, "worker") == "retried"
+
+    db.expire_all()
+    job = db.get(Job, job.id)
+    assert job.status == QUEUED
+    assert "upstream timed out" in job.error
+    assert job.run_at > datetime.utcnow() + timedelta(seconds=jobs.JOB_RETRY_BASE_SECONDS * 0.9)
+    assert claim(db, "worker") is None
+
+    # Once the back-off has passed the next attempt runs
+    job.run_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    assert run_job(db, claim(db, "worker"), "worker") == SUCCEEDED
+
+
+def test_gives_up_after_max_attempts(db):
+    job = enqueue(db, "test.flaky", max_attempts=1)
+    assert run_job(db, claim(db, "worker"), "worker") == FAILED
+    db.expire_all()
+    assert db.get(Job, job.id).status == FAILED
+
+
+def test_permanent_error_is_not_retried(db):
+    job = enqueue(db, "test.invalid")
+    assert run_job(db, claim(db, "worker"), "worker") == FAILED
+    db.expire_all()
+    job = db.get(Job, job.id)
+    assert job.error == "bad payload"
+    assert job.attempts == 1
+
+
+def test_expired_lease_is_taken_over(db):
+    job = enqueue(db, "test.echo", {"value": 7})
+    claim(db, "crashed-worker", lease_seconds=-1)
+
+    taken = claim(db, "worker")
+    assert taken.id == job.id
+    assert taken.attempts == 2
+    assert run_job(db, taken, "worker") == SUCCEEDED
+
+
+def test_stale_worker_cannot_overwrite_new_attempt(db):
+    job = enqueue(db, "test.echo", {"value": 7})
+    stale = claim(db, "slow-worker", lease_seconds=-1)
+    claim(db, "worker")
+
+    run_job(db, stale, "slow-worker")
+    db.expire_all()
+    job = db.get(Job, job.id)
+    assert job.status == RUNNING
+    assert job.locked_by == "worker"
+
+
+def test_retry_delay_doubles_and_is_capped():
+    assert jobs.JOB_RETRY_BASE_SECONDS <= retry_delay(1) <= jobs.JOB_RETRY_BASE_SECONDS * 1.25
+    assert 2 * jobs.JOB_RETRY_BASE_SECONDS <= retry_delay(2) <= 2.5 * jobs.JOB_RETRY_BASE_SECONDS
+    assert retry_delay(50) <= jobs.JOB_RETRY_MAX_SECONDS * 1.25
+
+
+def test_prune_deletes_old_finished_jobs(db):
+    old = enqueue(db, "test.echo", {"value": 1})
+    recent = enqueue(db, "test.echo", {"value": 2})
+    pending = enqueue(db, "test.echo", {"value": 3}, delay=60)
+    for job in (old, recent):
+        job.status = SUCCEEDED
+    old.finished_at = datetime.utcnow() - timedelta(days=30)
+    recent.finished_at = datetime.utcnow()
+    db.commit()
+
+    assert prune_jobs(db, retention_days=7) == 1
+    assert {job.id for job in db.query(Job).all()} == {recent.id, pending.id}
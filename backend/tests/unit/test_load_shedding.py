@@ -0,0 +1,163 @@
+"""Unit tests for route-group concurrency limits and load shedding"""
+import asyncio
+
+import pytest
+
+from app.middleware.load_shedding import LoadSheddingMiddleware
+from app.services.load_shedding import (
+    ALL_METHODS,
+    HIGH,
+    LOW,
+    QUEUE_FULL,
+    TIMEOUT,
+    ConcurrencyGroup,
+    ConcurrencyLimiter,
+    configured_groups,
+    parse_concurrency,
+)
+
+
+def group(name, limit, queue, priority=HIGH, prefix=None):
+    return ConcurrencyGroup(name, limit, queue, ALL_METHODS, (prefix or f"/{name}",), priority)
+
+
+def test_parse_concurrency():
+    assert parse_concurrency("8/16") == (8, 16)
+    assert parse_concurrency("4") == (4, 0)
+    with pytest.raises(ValueError):
+        parse_concurrency("0/10")
+
+
+@pytest.mark.parametrize(
+    "method, path, expected",
+    [
+        ("GET", "/nutrition/usda/search", "usda"),
+        ("POST", "/nutrition/food-items/usda", "usda"),
+        ("POST", "/auth/login", "auth"),
+        ("GET", "/profile/weekly-comparison", "analytics"),
+        ("GET", "/nutrition/food-items", "analytics"),
+        ("POST", "/nutrition/food-items", "core"),
+        ("GET", "/nutrition/daily", "core"),
+        ("GET", "/auth/me", "core"),
+        ("GET", "/health/ready", None),
+        ("GET", "/metrics", None),
+    ],
+)
+def test_configured_groups_match_in_order(method, path, expected):
+    limiter = ConcurrencyLimiter(configured_groups())
+    matched = limiter.group_for(method, path)
+    assert (matched.name if matched else None) == expected
+
+
+def test_sheds_immediately_when_queue_is_full():
+    async def scenario():
+        limiter = ConcurrencyLimiter([group("core", 1, 1)], capacity=10, reserve=0, max_wait=1)
+        core = limiter.groups[0]
+        assert await limiter.acquire(core) is None
+        queued = asyncio.ensure_future(limiter.acquire(core))
+        await asyncio.sleep(0)
+        assert await limiter.acquire(core) == QUEUE_FULL
+
+        limiter.release(core)
+        assert await queued is None
+        assert limiter.stats()["core"]["in_flight"] == 1
+        assert limiter.stats()["core"]["shed"] == {QUEUE_FULL: 1, TIMEOUT: 0}
+
+    asyncio.run(scenario())
+
+
+def test_sheds_after_max_wait():
+    async def scenario():
+        limiter = ConcurrencyLimiter([group("core", 1, 5)], capacity=10, reserve=0, max_wait=0.05)
+        core = limiter.groups[0]
+        await limiter.acquire(core)
+        assert await limiter.acquire(core) == TIMEOUT
+        assert limiter.stats()["core"]["waiting"] == 0
+
+        limiter.release(core)
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_core_requests_keep_reserved_capacity_and_go_first():
+    async def scenario():
+        limiter = ConcurrencyLimiter(
+            [group("heavy", 5, 5, priority=LOW), group("core", 5, 5)], capacity=2, reserve=1, max_wait=1
+        )
+        heavy, core = limiter.groups
+        assert await limiter.acquire(heavy) is None
+        # Low priority may not use the reserved slot...
+        heavy_waiting = asyncio.ensure_future(limiter.acquire(heavy))
+        await asyncio.sleep(0)
+        assert limiter.stats()["heavy"]["waiting"] == 1
+        # ...but a core request can
+        assert await limiter.acquire(core) is None
+        core_waiting = asyncio.ensure_future(limiter.acquire(core))
+        await asyncio.sleep(0)
+
+        # The freed slot goes to the queued core request, not the earlier heavy one
+        limiter.release(heavy)
+        assert await core_waiting is None
+        assert not heavy_waiting.done()
+
+        limiter.release(core)
+        limiter.release(core)
+        assert await heavy_waiting is None
+
+    asyncio.run(scenario())
+
+
+def test_group_limit_does_not_block_other_groups():
+    async def scenario():
+        limiter = ConcurrencyLimiter([group("usda", 1, 5, LOW), group("auth", 5, 5, LOW)], capacity=10, reserve=0)
+        usda, auth = limiter.groups
+        await limiter.acquire(usda)
+        usda_waiting = asyncio.ensure_future(limiter.acquire(usda))
+        await asyncio.sleep(0)
+
+        assert await limiter.acquire(auth) is None
+
+        limiter.release(usda)
+        assert await usda_waiting is None
+
+    asyncio.run(scenario())
+
+
+def test_middleware_returns_503_with_retry_after():
+    limiter = ConcurrencyLimiter([group("core", 1, 0)], capacity=10, reserve=0)
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = LoadSheddingMiddleware(app, limiter=limiter)
+
+    async def call():
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        await middleware({"type": "http", "method": "GET", "path": "/core/x", "headers": []}, receive, send)
+        return messages
+
+    async def scenario():
+        first = asyncio.ensure_future(call())
+        await asyncio.sleep(0)
+        shed = await call()
+        release.set()
+        served = await first
+        return shed, served
+
+    shed, served = asyncio.run(scenario())
+
+    assert shed[0]["status"] == 503
+    assert (b"retry-after", b"1") in shed[0]["headers"]
+    assert served[0]["status"] == 200
+    assert limiter.in_flight == 0
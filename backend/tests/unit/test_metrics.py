@@ -0,0 +1,79 @@
+"""Unit tests for the metrics registry and the /metrics endpoint"""
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.routes.metrics as metrics_route
+from app.main import app
+from app.utils.metrics import Registry
+
+
+def test_counter_renders_labelled_samples() -> None:
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ("method",))
+    requests.labels("GET").inc()
+    requests.labels("GET").inc(2)
+    requests.labels("POST").inc()
+
+    text = registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{method="GET"} 3' in text
+    assert 'requests_total{method="POST"} 1' in text
+
+
+def test_labels_returns_cached_child() -> None:
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", ("route",))
+
+    assert latency.labels("/a") is latency.labels("/a")
+    with pytest.raises(ValueError):
+        latency.labels("/a", "extra")
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    text = registry.render()
+
+    assert 'latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{le="1"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text
+    assert "latency_seconds_sum 3.65" in text
+
+
+def test_label_values_are_escaped() -> None:
+    registry = Registry()
+    registry.counter("odd_total", "Odd labels", ("value",)).labels('a "quoted"\nvalue').inc()
+
+    assert 'odd_total{value="a \\"quoted\\"\\nvalue"} 1' in registry.render()
+
+
+def test_metrics_endpoint_exposes_request_db_and_cache_series() -> None:
+    client = TestClient(app)
+    client.get("/health")
+    client.get("/no-such-route")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in text
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in text
+    assert "db_statements_total" in text
+    assert "cache_hit_ratio" in text
+    assert "password_hash_pending" in text
+    assert "usda_circuit_open 0" in text
+
+
+def test_metrics_endpoint_requires_token_when_configured(monkeypatch) -> None:
+    monkeypatch.setattr(metrics_route, "METRICS_TOKEN", "scrape-secret")
+    client = TestClient(app)
+
+    assert client.get("/metrics").status_code == 401
+    authorized = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert authorized.status_code == 200
@@ -0,0 +1,83 @@
+"""Unit tests for the bounded password hasher"""
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.password_hasher import PasswordHasher, hash_rounds
+
+
+def test_hash_and_verify_round_trip():
+    hasher = PasswordHasher(workers=2, max_pending=4, rounds=4)
+    hashed = hasher.hash("Password123")
+    assert hash_rounds(hashed) == 4
+    assert hasher.verify("Password123", hashed)
+    assert not hasher.verify("password123", hashed)
+    assert hasher.stats()["completed"] == 3
+
+
+def test_needs_rehash_when_cost_changes():
+    hasher = PasswordHasher(workers=1, max_pending=1, rounds=4)
+    hashed = hasher.hash("Password123")
+    assert not hasher.needs_rehash(hashed)
+    hasher.rounds = 5
+    assert hasher.needs_rehash(hashed)
+    assert hasher.needs_rehash("not-a-bcrypt-hash")
+
+
+def test_rejects_when_pending_limit_reached():
+    hasher = PasswordHasher(workers=1, max_pending=1, rounds=4)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(timeout=5)
+        return True
+
+    thread = threading.Thread(target=hasher._run, args=(slow,))
+    thread.start()
+    started.wait(timeout=5)
+
+    with pytest.raises(HTTPException) as exc:
+        hasher.hash("Password123")
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
+
+    release.set()
+    thread.join()
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.stats()["pending"] == 0
+    assert hash_rounds(hasher.hash("Password123")) == 4
+
+
+def test_calibrate_respects_minimum_rounds():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    assert hasher.calibrate(target_ms=0.001, min_rounds=4) == 4
+    assert hasher.rounds == 4
+
+
+def test_async_hashing_leaves_the_event_loop_free():
+    hasher = PasswordHasher(workers=1, max_pending=2, rounds=4)
+    release = threading.Event()
+
+    def slow():
+        release.wait(timeout=5)
+        return True
+
+    async def scenario():
+        waiting = asyncio.ensure_future(hasher._run_async(slow))
+        # The loop keeps running while the hash is in flight
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        assert hasher.stats()["pending"] == 1
+        release.set()
+        assert await waiting is True
+
+        hashed = await hasher.hash_async("Password123")
+        assert await hasher.verify_async("Password123", hashed)
+        assert not await hasher.verify_async("password123", hashed)
+
+    asyncio.run(scenario())
+    assert hasher.stats()["completed"] == 4
+    assert hasher.stats()["pending"] == 0
@@ -0,0 +1,87 @@
+"""Unit tests for the sampling profiler and profiling middleware"""
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.profiling import ProfilingMiddleware
+from app.services.auth import create_access_token
+from app.utils.profiling import ProfileDirectory, SamplingProfiler
+
+
+def busy(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def make_client(**options):
+    test_app = FastAPI()
+
+    @test_app.get("/slow/{item_id}")
+    def slow(item_id: int):
+        busy(0.05)
+        return {"item_id": item_id}
+
+    test_app.add_middleware(ProfilingMiddleware, interval_ms=1, **options)
+    return TestClient(test_app)
+
+
+def auth_header(username: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+
+
+def test_sampler_collapses_busy_stacks() -> None:
+    profiler = SamplingProfiler(interval=0.001).start()
+    busy(0.05)
+    profiler.stop()
+
+    assert profiler.sample_count > 0
+    top_stack, count = profiler.collapsed().splitlines()[0].rsplit(" ", 1)
+    assert "busy (unit/test_profiling.py" in top_stack
+    assert int(count) > 0
+
+
+def test_admin_gets_collapsed_stacks_instead_of_body(tmp_path) -> None:
+    client = make_client(admins={"admin"}, directory=str(tmp_path))
+
+    response = client.get("/slow/1", headers={"X-Profile": "1", **auth_header("admin")})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.headers["x-profile-status"] == "200"
+    assert int(response.headers["x-profile-samples"]) > 0
+    assert "slow (unit/test_profiling.py" in response.text
+
+
+@pytest.mark.parametrize("username", ["someone", None])
+def test_profile_flag_ignored_for_non_admins(tmp_path, username) -> None:
+    client = make_client(admins={"admin"}, directory=str(tmp_path))
+    headers = auth_header(username) if username else {}
+
+    response = client.get("/slow/1?profile=1", headers=headers)
+
+    assert response.json() == {"item_id": 1}
+    assert "x-profile-status" not in response.headers
+
+
+def test_samples_one_in_n_requests_to_directory(tmp_path) -> None:
+    client = make_client(admins=set(), sample_every=2, directory=str(tmp_path))
+
+    for item_id in range(4):
+        assert client.get(f"/slow/{item_id}").json() == {"item_id": item_id}
+
+    profiles = sorted(tmp_path.glob("*.folded"))
+    assert len(profiles) == 2
+    assert "-GET-slow_item_id-200-" in profiles[0].name
+
+
+def test_profile_directory_keeps_newest(tmp_path) -> None:
+    directory = ProfileDirectory(str(tmp_path), keep=2)
+    for stamp in (100, 200, 300):
+        directory.write(f"{stamp}-GET-x.folded", "a;b 1\n")
+
+    assert [path.name for path in sorted(tmp_path.glob("*.folded"))] == ["200-GET-x.folded", "300-GET-x.folded"]
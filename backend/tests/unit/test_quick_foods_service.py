@@ -0,0 +1,105 @@
+"""Unit tests for the recent/frequent foods index"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.food_entry import FoodItem, MealType
+from app.models.quick_food import QuickFood
+from app.models.user import User
+from app.services import quick_foods
+from app.services.quick_foods import get_quick_foods, record_food_use
+
+# Test database
+TEST_DATABASE_URL = "sqlite:///./test_quick_foods.db"
+engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db_session():
+    """Create a fresh database session for each test"""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def setup(db_session):
+    user = User(username="quick", hashed_password="x")
+    db_session.add(user)
+    items = [FoodItem(name=f"Food {i}", serving_size="1", calories=100) for i in range(5)]
+    db_session.add_all(items)
+    db_session.commit()
+    return user, items
+
+
+def test_recent_use_outranks_older_frequent_use(db_session, setup):
+    user, items = setup
+    now = datetime(2030, 6, 1)
+    old = now - timedelta(days=90)
+
+    # Three uses a quarter ago decay below one use today (14-day half-life)
+    for _ in range(3):
+        record_food_use(db_session, user.id, items[0].id, MealType.DINNER, used_at=old)
+    record_food_use(db_session, user.id, items[1].id, MealType.DINNER, used_at=now)
+    db_session.commit()
+
+    ranked = get_quick_foods(db_session, user.id, MealType.DINNER)
+    assert [q.food_item_id for q in ranked] == [items[1].id, items[0].id]
+    assert ranked[1].use_count == 3
+
+
+def test_index_is_bounded_per_meal_type(db_session, setup, monkeypatch):
+    user, items = setup
+    monkeypatch.setattr(quick_foods, "QUICK_FOODS_LIMIT", 3)
+    start = datetime(2030, 1, 1)
+    for day, item in enumerate(items):
+        record_food_use(db_session, user.id, item.id, MealType.SNACK, used_at=start + timedelta(days=day))
+    record_food_use(db_session, user.id, items[0].id, MealType.LUNCH, used_at=start)
+    db_session.commit()
+
+    snack_rows = db_session.query(QuickFood).filter(QuickFood.meal_type == MealType.SNACK).all()
+    assert sorted(q.food_item_id for q in snack_rows) == [items[2].id, items[3].id, items[4].id]
+    assert db_session.query(QuickFood).filter(QuickFood.meal_type == MealType.LUNCH).count() == 1
+
+
+def test_scores_do_not_overflow_far_in_the_future(db_session, setup):
+    user, items = setup
+    far_future = datetime(2500, 1, 1)
+    record_food_use(db_session, user.id, items[0].id, MealType.SNACK, used_at=far_future)
+    quick_food = record_food_use(db_session, user.id, items[0].id, MealType.SNACK, used_at=far_future)
+    assert quick_food.score == pytest.approx(quick_foods._use_weight(far_future) + 1)
+
+
+def test_concurrent_first_use_bumps_the_other_row_and_keeps_the_entry(db_session, setup, monkeypatch):
+    from app.models.food_entry import CalorieEntry
+
+    user, items = setup
+    now = datetime(2030, 6, 1)
+    # Another request inserted and committed the row after our lookup missed it
+    other = TestingSessionLocal()
+    record_food_use(other, user.id, items[0].id, MealType.LUNCH, used_at=now)
+    other.commit()
+    other.close()
+
+    real_find = quick_foods._find
+    lookups = []
+
+    def racing_find(*args):
+        lookups.append(args)
+        return None if len(lookups) == 1 else real_find(*args)
+
+    monkeypatch.setattr(quick_foods, "_find", racing_find)
+    db_session.add(CalorieEntry(user_id=user.id, food_item_id=items[0].id, meal_type=MealType.LUNCH,
+                                date=now.date()))
+    quick_food = record_food_use(db_session, user.id, items[0].id, MealType.LUNCH, used_at=now)
+    db_session.commit()
+
+    assert quick_food.use_count == 2
+    assert db_session.query(QuickFood).count() == 1
+    assert db_session.query(CalorieEntry).count() == 1
@@ -0,0 +1,171 @@
+"""Unit tests for the token-bucket rate limiter"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.services.rate_limit import (
+    MemoryBucketStore,
+    RateLimiter,
+    RedisBucketStore,
+    RouteGroup,
+    parse_limit,
+)
+from app.utils.circuit_breaker import CircuitBreaker
+
+
+def make_group(capacity=2, period=1.0, per_user=False):
+    return RouteGroup("test", capacity, period, frozenset({"POST"}), ("/limited",), per_user=per_user)
+
+
+def test_parse_limit():
+    assert parse_limit("10/60") == (10.0, 60.0)
+    assert parse_limit("5") == (5.0, 1.0)
+    with pytest.raises(ValueError):
+        parse_limit("0/60")
+
+
+def test_bucket_allows_burst_then_refills():
+    store = MemoryBucketStore()
+    assert store.take("k", capacity=2, rate=20) == 0
+    assert store.take("k", capacity=2, rate=20) == 0
+    wait = store.take("k", capacity=2, rate=20)
+    assert 0 < wait <= 0.05
+
+    time.sleep(0.06)
+    assert store.take("k", capacity=2, rate=20) == 0
+    assert store.take("other", capacity=2, rate=20) == 0
+
+
+def test_sweep_drops_refilled_buckets():
+    store = MemoryBucketStore(sweep_every=3)
+    store.take("a", capacity=1, rate=100)
+    time.sleep(0.02)
+    store.take("b", capacity=1, rate=100)
+    store.take("b", capacity=1, rate=100)
+    assert set(store._buckets) == {"b"}
+
+
+def test_limiter_matches_first_group_and_counts_rejections():
+    limiter = RateLimiter([make_group(capacity=1)], MemoryBucketStore())
+    assert limiter.group_for("GET", "/limited") is None
+    assert limiter.group_for("POST", "/other") is None
+    group = limiter.group_for("POST", "/limited/x")
+    assert group is not None
+
+    assert limiter.check(group, "ip:1") == 0
+    assert limiter.check(group, "ip:1") > 0
+    assert limiter.limited == 1
+
+    limiter.enabled = False
+    assert limiter.group_for("POST", "/limited") is None
+
+
+def test_redis_store_runs_script_atomically():
+    class StubClient:
+        def __init__(self):
+            self.calls = []
+
+        def execute(self, *args):
+            self.calls.append(args)
+            return 1500
+
+    client = StubClient()
+    store = RedisBucketStore(client)
+    assert store.take("auth:ip:1", capacity=10, rate=0.5) == 1.5
+    command, _, numkeys, key, capacity, rate, _ = client.calls[0]
+    assert (command, numkeys, key, capacity, rate) == ("EVAL", 1, "ratelimit:auth:ip:1", 10, 0.5)
+
+
+def test_redis_store_fails_open_while_redis_is_down():
+    class DownClient:
+        calls = 0
+
+        def execute(self, *args):
+            DownClient.calls += 1
+            raise TimeoutError("timed out")
+
+    store = RedisBucketStore(DownClient(), breaker=CircuitBreaker(min_calls=2, open_seconds=60))
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            store.take("auth:ip:1", capacity=10, rate=0.5)
+    # The breaker is open: no more waiting on Redis, and nothing is limited
+    assert store.take("auth:ip:1", capacity=10, rate=0.5) == 0
+    assert DownClient.calls == 2
+
+
+def _call(middleware, path="/limited", headers=(), client=("10.0.0.1", 1234)):
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": path,
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+        "client": client,
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    start = sent[0]
+    return start["status"], dict((k.decode(), v.decode()) for k, v in start["headers"])
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def test_middleware_returns_429_with_retry_after():
+    limiter = RateLimiter([make_group(capacity=1, period=30)], MemoryBucketStore())
+    middleware = RateLimitMiddleware(ok_app, limiter)
+
+    assert _call(middleware)[0] == 200
+    status, headers = _call(middleware)
+    assert status == 429
+    assert headers["retry-after"] == "30"
+    # Other clients have their own bucket
+    assert _call(middleware, client=("10.0.0.2", 1234))[0] == 200
+
+
+def test_middleware_keys_by_user_and_fails_open():
+    from app.services.auth import create_access_token
+
+    limiter = RateLimiter([make_group(capacity=1, period=30, per_user=True)], MemoryBucketStore())
+    middleware = RateLimitMiddleware(ok_app, limiter)
+    alice = ("authorization", f"Bearer {create_access_token({'sub': 'alice'})}")
+    bob = ("authorization", f"Bearer {create_access_token({'sub': 'bob'})}")
+
+    assert _call(middleware, headers=[alice])[0] == 200
+    assert _call(middleware, headers=[alice])[0] == 429
+    assert _call(middleware, headers=[bob])[0] == 200
+
+    class BrokenStore:
+        def take(self, *args):
+            raise ConnectionError("redis down")
+
+    limiter.store = BrokenStore()
+    assert _call(middleware, headers=[alice])[0] == 200
+
+
+def test_shared_store_is_called_off_the_event_loop():
+    class SlowSharedStore:
+        shared = True
+        threads = []
+
+        def take(self, *args):
+            SlowSharedStore.threads.append(threading.get_ident())
+            time.sleep(0.05)
+            return 0
+
+    limiter = RateLimiter([make_group()], SlowSharedStore())
+    middleware = RateLimitMiddleware(ok_app, limiter)
+
+    assert _call(middleware)[0] == 200
+    assert SlowSharedStore.threads and threading.get_ident() not in SlowSharedStore.threads
@@ -0,0 +1,50 @@
+"""Unit tests for the JSON response helpers"""
+import json
+from datetime import date
+from types import SimpleNamespace
+
+from fastapi.responses import Response
+
+from app.schemas.food_entry import FoodItemResponse, MealType, NutritionTotals
+from app.utils.serialization import FastJSONResponse, ResponseSerializer, dumps, serialized
+
+
+def test_dumps_handles_dates_enums_and_models():
+    totals = NutritionTotals(calories=1, protein_g=2, carbs_g=3, fat_g=4, fiber_g=5, sodium_mg=6)
+    encoded = dumps({"date": date(2030, 1, 2), "meal": MealType.LUNCH, "totals": totals, 1: "x"})
+    assert json.loads(encoded) == {
+        "date": "2030-01-02",
+        "meal": "lunch",
+        "totals": totals.model_dump(),
+        "1": "x",
+    }
+    assert b" " not in encoded
+
+
+def test_fast_json_response_renders_compact_json():
+    response = FastJSONResponse({"a": [1, 2]})
+    assert response.body == b'{"a":[1,2]}'
+    assert response.media_type == "application/json"
+
+
+def test_serializer_accepts_orm_objects():
+    orm_row = SimpleNamespace(
+        id=1, name="Rice", serving_size="100g", serving_size_grams=100.0, source="custom",
+        external_id=None, calories=130.0, protein_g=2.7, carbs_g=28.0, fat_g=0.3, fiber_g=0.4, sodium_mg=1.0,
+    )
+    encoded = ResponseSerializer(list[FoodItemResponse]).encode([orm_row])
+    assert json.loads(encoded)[0]["name"] == "Rice"
+
+
+def test_serialized_decorator_wraps_results_but_passes_responses_through():
+    @serialized(NutritionTotals)
+    def endpoint(raw: bool = False):
+        if raw:
+            return Response(b"raw")
+        return {"calories": 1, "protein_g": 0, "carbs_g": 0, "fat_g": 0, "fiber_g": 0, "sodium_mg": 0}
+
+    response = endpoint()
+    assert response.media_type == "application/json"
+    assert json.loads(response.body)["calories"] == 1.0
+    assert endpoint(raw=True).body == b"raw"
+    assert endpoint.__wrapped__.__name__ == "endpoint"
@@ -0,0 +1,62 @@
+"""Tests for the pre-forking production server"""
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from benchmarks.server_workers import free_port, process_tree, wait_until_up
+
+BACKEND = Path(__file__).resolve().parents[2]
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-forking needs os.fork")
+
+
+@pytest.fixture
+def server(tmp_path):
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmp_path / 'server.db'}",
+        RATE_LIMIT_ENABLED="false",
+        LOGIN_WARM_SET="",
+    )
+    command = [
+        sys.executable, "-m", "app.server", "--host", "127.0.0.1", "--port", str(port),
+        "--workers", "2", "--max-requests", "3", "--max-requests-jitter", "0", "--graceful-timeout", "5",
+    ]
+    process = subprocess.Popen(command, cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(base_url, process)
+        yield process, base_url
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def test_recycles_workers_and_stops_gracefully(server):
+    process, base_url = server
+    initial = set(process_tree(process.pid)) - {process.pid}
+    assert len(initial) == 2
+
+    # Each worker exits after 3 requests; the parent keeps replacing them
+    for _ in range(12):
+        assert httpx.get(f"{base_url}/health", timeout=10).status_code == 200
+        time.sleep(0.05)
+    # The last recycled worker's replacement may still be starting
+    deadline = time.monotonic() + 10
+    current = set(process_tree(process.pid)) - {process.pid}
+    while len(current) != 2 and time.monotonic() < deadline:
+        time.sleep(0.1)
+        current = set(process_tree(process.pid)) - {process.pid}
+    assert len(current) == 2
+    assert current != initial
+
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(timeout=15) == 0
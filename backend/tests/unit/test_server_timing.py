@@ -0,0 +1,89 @@
+"""Unit tests for Server-Timing accounting and middleware"""
+import re
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.middleware.server_timing import ServerTimingMiddleware
+from app.services.metrics import install_metrics
+from app.utils.serialization import serialized
+from app.utils.server_timing import AUTH, DB, RequestTimings, current_timings, record, timed, timed_function
+
+
+def durations(header: str) -> dict[str, float]:
+    return {name: float(value) for name, value in re.findall(r"(\w+);dur=([\d.]+)", header)}
+
+
+def test_recordings_inside_a_section_are_folded_into_it() -> None:
+    timings = RequestTimings()
+    token = current_timings.set(timings)
+    try:
+        with timed(AUTH):
+            record(DB, 5.0)
+        record(DB, 0.25)
+    finally:
+        current_timings.reset(token)
+
+    assert set(timings.durations) == {AUTH, DB}
+    assert timings.durations[DB] == 0.25
+    assert timings.durations[AUTH] < 5.0
+
+
+def test_recording_without_a_request_is_a_no_op() -> None:
+    record(DB, 1.0)
+    with timed(AUTH):
+        pass
+    assert current_timings.get() is None
+
+
+def test_header_lists_segments_app_remainder_and_total() -> None:
+    timings = RequestTimings()
+    timings.add(DB, 10.0)
+
+    header = timings.header()
+
+    assert header.startswith('db;dur=10000.0;desc="SQL"')
+    parsed = durations(header)
+    assert set(parsed) == {"db", "app", "total"}
+    assert parsed["app"] == 0.0  # less wall time passed than was recorded
+
+
+def make_client(enabled: bool) -> TestClient:
+    install_metrics()
+    engine = create_engine("sqlite://")
+    test_app = FastAPI()
+
+    @timed_function(AUTH)
+    def current_user() -> str:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return "alice"
+
+    @test_app.get("/items")
+    @serialized(list[dict])
+    def items(user: str = Depends(current_user)):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 2"))
+        return [{"owner": user, "index": i} for i in range(100)]
+
+    test_app.add_middleware(ServerTimingMiddleware, enabled=enabled)
+    return TestClient(test_app)
+
+
+def test_middleware_reports_each_segment() -> None:
+    response = make_client(enabled=True).get("/items")
+
+    assert response.status_code == 200
+    assert response.headers["timing-allow-origin"] == "*"
+    parsed = durations(response.headers["server-timing"])
+    assert {"auth", "db", "serialization", "app", "total"} <= set(parsed)
+    segments = sum(value for name, value in parsed.items() if name != "total")
+    assert abs(segments - parsed["total"]) < 0.5
+
+
+def test_middleware_disabled_adds_nothing() -> None:
+    response = make_client(enabled=False).get("/items")
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
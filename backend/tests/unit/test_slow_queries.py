@@ -0,0 +1,145 @@
+"""Unit tests for the slow query log and its report"""
+import json
+import logging
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import slow_query_report
+from app.services.metrics import install_metrics
+from app.services.slow_queries import (
+    SlowQueryLog,
+    fingerprint,
+    get_slow_query_log,
+    normalize_statement,
+    parameter_shape,
+    slow_log,
+)
+
+
+class Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.entries = []
+
+    def emit(self, record):
+        self.entries.append(json.loads(record.getMessage()))
+
+
+@pytest.fixture
+def captured(monkeypatch):
+    install_metrics()
+    log = SlowQueryLog(threshold_ms=0.000001, explain_rate=1.0, explain_interval=300)
+    monkeypatch.setattr("app.services.metrics.get_slow_query_log", lambda: log)
+    handler = Capture()
+    # Replace (not add to) the app's file handler so tests do not write the real log
+    monkeypatch.setattr(slow_log, "handlers", [handler])
+    monkeypatch.setattr(slow_log, "level", logging.WARNING)
+    yield handler.entries
+
+
+def test_fingerprint_ignores_literals_placeholders_and_in_list_length() -> None:
+    assert fingerprint("SELECT * FROM users WHERE id = 5") == fingerprint("select * from users where id = ?")
+    assert normalize_statement("SELECT a FROM t WHERE b IN (?, ?, ?) AND c = 'x'") == (
+        "SELECT a FROM t WHERE b IN (?+) AND c = ?"
+    )
+    assert fingerprint("SELECT a FROM t WHERE b IN (?)") == fingerprint("SELECT a FROM t WHERE b IN (?, ?)")
+    assert fingerprint("SELECT a FROM t") != fingerprint("SELECT b FROM t")
+
+
+def test_parameter_shape_hides_values() -> None:
+    assert parameter_shape(("alice", 3, None, [1, 2])) == ["str(5)", "int", "null", "list[2]"]
+    assert parameter_shape({"username": "alice"}) == {"username": "str(5)"}
+
+
+def test_slow_select_is_logged_with_plan_once_per_interval(captured) -> None:
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE foods (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("SELECT name FROM foods WHERE id = :id"), {"id": 1})
+        conn.execute(text("SELECT name FROM foods WHERE id = :id"), {"id": 2})
+
+    selects = [entry for entry in captured if entry["statement"].startswith("SELECT name")]
+    assert len(selects) == 2
+    first, second = selects
+    assert first["fingerprint"] == second["fingerprint"]
+    assert first["params"] == ["int"]
+    assert first["route"] is None
+    assert any("foods" in line for line in first["plan"])
+    assert "plan" not in second
+
+
+class AbortingCursor:
+    """Cursor that behaves like PostgreSQL: after an error, only a rollback is accepted"""
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, statement, *args):
+        if statement.startswith("ROLLBACK"):
+            self._connection.aborted = False
+        elif self._connection.aborted:
+            raise sqlite3.OperationalError("current transaction is aborted")
+        elif statement.startswith("EXPLAIN"):
+            self._connection.aborted = True
+            raise sqlite3.OperationalError("EXPLAIN failed")
+        return self._cursor.execute(statement, *args)
+
+
+class AbortingConnection:
+    def __init__(self):
+        self.raw = sqlite3.connect(":memory:", check_same_thread=False)
+        self.aborted = False
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def cursor(self):
+        return AbortingCursor(self)
+
+    def rollback(self):
+        self.aborted = False
+        self.raw.rollback()
+
+
+def test_failed_explain_does_not_abort_the_transaction(captured) -> None:
+    engine = create_engine("sqlite://", creator=AbortingConnection)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE foods (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO foods (name) VALUES ('Oats')"))
+        conn.execute(text("SELECT name FROM foods WHERE id = :id"), {"id": 1})
+        # Without the savepoint the failed EXPLAIN would have poisoned the transaction
+        assert conn.execute(text("SELECT count(*) FROM foods")).scalar() == 1
+
+    plans = [entry["plan"] for entry in captured if entry["statement"].startswith("SELECT name")]
+    assert plans == [None]
+
+
+def test_default_threshold_skips_fast_statements() -> None:
+    assert get_slow_query_log().threshold >= 0.1
+
+
+def test_report_groups_by_fingerprint(tmp_path) -> None:
+    log_path = tmp_path / "slow.jsonl"
+    rows = [
+        {"fingerprint": "a", "duration_ms": 900, "route": "GET /nutrition/daily", "statement": "SELECT 1", "ts": "1"},
+        {"fingerprint": "a", "duration_ms": 1100, "route": "GET /nutrition/daily", "statement": "SELECT 1", "ts": "2"},
+        {"fingerprint": "b", "duration_ms": 600, "route": None, "statement": "UPDATE x", "ts": "3"},
+    ]
+    log_path.write_text("\n".join(json.dumps(row) for row in rows[:2]) + "\n")
+    (tmp_path / "slow.jsonl.1").write_text(json.dumps(rows[2]) + "\n")
+
+    summary = {group["fingerprint"]: group for group in slow_query_report.summarize(
+        slow_query_report.read_entries(str(log_path))
+    )}
+
+    assert summary["a"]["count"] == 2
+    assert summary["a"]["total"] == 2000
+    assert summary["a"]["max"] == 1100
+    assert summary["a"]["routes"] == [("GET /nutrition/daily", 2)]
+    assert summary["b"]["routes"] == [("(no request)", 1)]
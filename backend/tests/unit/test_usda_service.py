@@ -1,8 +1,13 @@
+import threading
+import time
+
 import httpx
 import pytest
 from fastapi import HTTPException
 
 from app.services.usda import UsdaService
+from app.utils.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+from app.utils.singleflight import SingleFlight
 
 
 class DummyResponse:
@@ -43,6 +48,26 @@ class DummyErrorClient:
         raise httpx.RequestError("Network error", request=request)
 
 
+@pytest.fixture(autouse=True)
+def fresh_breaker(monkeypatch):
+    breaker = CircuitBreaker(window=4, min_calls=2, failure_rate=0.5, open_seconds=60)
+    monkeypatch.setattr(UsdaService, "_breaker", breaker)
+    return breaker
+
+
+class CountingClient(DummyClient):
+    def __init__(self, response: DummyResponse):
+        super().__init__(response)
+        self.calls = 0
+
+    def __call__(self, timeout=10):
+        return self
+
+    def get(self, url, params=None):
+        self.calls += 1
+        return self.response
+
+
 def test_search_foods_success(monkeypatch):
     monkeypatch.setenv("USDA_API_KEY", "test-key")
     response = DummyResponse(200, {"foods": [{"fdcId": 1}]})
@@ -71,6 +96,154 @@ def test_get_food_request_error(monkeypatch):
     assert "USDA request failed" in exc.value.detail
 
 
+class BlockingClient:
+    """Client whose requests wait until released, counting upstream calls"""
+
+    def __init__(self, response: DummyResponse):
+        self.response = response
+        self.release = threading.Event()
+        self.calls = []
+
+    def __call__(self, timeout=10):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def get(self, url, params=None):
+        self.calls.append(params)
+        self.release.wait(timeout=5)
+        return self.response
+
+
+def _run_concurrently(fn, count):
+    results, errors = [], []
+
+    def target():
+        try:
+            results.append(fn())
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def _wait_for_coalesced(flight: SingleFlight, count: int):
+    deadline = time.monotonic() + 5
+    while flight.coalesced < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_concurrent_searches_share_one_upstream_call(monkeypatch):
+    monkeypatch.setenv("USDA_API_KEY", "test-key")
+    flight = SingleFlight()
+    monkeypatch.setattr(UsdaService, "_flight", flight)
+    client = BlockingClient(DummyResponse(200, {"foods": [{"fdcId": 7}]}))
+    monkeypatch.setattr(httpx, "Client", client)
+
+    queries = iter(["Apple", "apple ", "  APPLE", "apple", "Apple"])
+    threads, results, errors = _run_concurrently(
+        lambda: UsdaService.search_foods(next(queries)), 5
+    )
+    _wait_for_coalesced(flight, 4)
+    client.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(client.calls) == 1
+    assert client.calls[0]["query"] == "apple"
+    assert all(result["foods"][0]["fdcId"] == 7 for result in results)
+    assert UsdaService.coalescing_stats() == {"executions": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_concurrent_food_lookups_share_upstream_error(monkeypatch):
+    monkeypatch.setenv("USDA_API_KEY", "test-key")
+    flight = SingleFlight()
+    monkeypatch.setattr(UsdaService, "_flight", flight)
+    client = BlockingClient(DummyResponse(500, {"message": "server error"}))
+    monkeypatch.setattr(httpx, "Client", client)
+
+    threads, results, errors = _run_concurrently(lambda: UsdaService.get_food(123), 3)
+    _wait_for_coalesced(flight, 2)
+    client.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(client.calls) == 1
+    assert results == []
+    assert len(errors) == 3
+    assert all("USDA food request failed" in exc.detail for exc in errors)
+
+    # The next lookup after the failure goes upstream again
+    client.release.set()
+    with pytest.raises(HTTPException):
+        UsdaService.get_food(123)
+    assert len(client.calls) == 2
+
+
+def test_unknown_food_is_negatively_cached(monkeypatch):
+    monkeypatch.setenv("USDA_API_KEY", "test-key")
+    client = CountingClient(DummyResponse(404, {"message": "not found"}))
+    monkeypatch.setattr(httpx, "Client", client)
+
+    for _ in range(3):
+        with pytest.raises(HTTPException) as exc:
+            UsdaService.get_food(999)
+        assert exc.value.status_code == 404
+    assert client.calls == 1
+    assert UsdaService.breaker_stats()["recent_failures"] == 0
+
+
+def test_searches_are_cached_including_empty_results(monkeypatch):
+    monkeypatch.setenv("USDA_API_KEY", "test-key")
+    client = CountingClient(DummyResponse(200, {"foods": []}))
+    monkeypatch.setattr(httpx, "Client", client)
+
+    assert UsdaService.search_foods("zzz unknown")["foods"] == []
+    assert UsdaService.search_foods("ZZZ  unknown")["foods"] == []
+    assert client.calls == 1
+
+
+def test_breaker_opens_and_short_circuits_upstream(monkeypatch, fresh_breaker):
+    monkeypatch.setenv("USDA_API_KEY", "test-key")
+    client = CountingClient(DummyResponse(503, text="unavailable"))
+    monkeypatch.setattr(httpx, "Client", client)
+
+    for query in ("a", "b"):
+        with pytest.raises(HTTPException) as exc:
+            UsdaService.search_foods(query)
+        assert exc.value.status_code == 502
+    assert fresh_breaker.state == OPEN
+
+    with pytest.raises(HTTPException) as exc:
+        UsdaService.search_foods("c")
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "60"
+    assert client.calls == 2
+    assert UsdaService.breaker_stats()["rejected"] == 1
+
+
+def test_breaker_half_open_probe_closes_on_success(monkeypatch, fresh_breaker):
+    monkeypatch.setenv("USDA_API_KEY", "test-key")
+    fresh_breaker.open_seconds = 0.05
+    for _ in range(2):
+        fresh_breaker.record_failure()
+    assert fresh_breaker.state == OPEN
+
+    time.sleep(0.06)
+    client = CountingClient(DummyResponse(200, {"foods": [{"fdcId": 1}]}))
+    monkeypatch.setattr(httpx, "Client", client)
+    assert UsdaService.search_foods("apple")["foods"][0]["fdcId"] == 1
+    assert fresh_breaker.state == CLOSED
+
+
 def test_extract_nutrients_handles_units():
     food = {
         "foodNutrients": [
@@ -114,3 +287,45 @@ def test_get_serving_size_grams():
     assert UsdaService.get_serving_size_grams(food) == 40
     food = {"servingSize": 1, "servingSizeUnit": "oz"}
     assert UsdaService.get_serving_size_grams(food) is None
+
+
+def test_breaker_half_open_probe_that_fails_to_decode_reopens(monkeypatch, fresh_breaker):
+    monkeypatch.setenv("USDA_API_KEY", "test-key")
+    fresh_breaker.open_seconds = 0.05
+    for _ in range(2):
+        fresh_breaker.record_failure()
+    time.sleep(0.06)
+
+    # A 200 with a body that is not JSON: not a RequestError, but still a failed probe
+    client = CountingClient(DummyResponse(200, text="<html>maintenance</html>"))
+    monkeypatch.setattr(httpx, "Client", client)
+    with pytest.raises(HTTPException) as exc:
+        UsdaService.search_foods("apple")
+    assert exc.value.status_code == 502
+    assert fresh_breaker.state == OPEN
+
+    # The probe slot was handed back: once open_seconds pass, the next probe goes through
+    time.sleep(0.06)
+    client.response = DummyResponse(200, {"foods": [{"fdcId": 1}]})
+    assert UsdaService.search_foods("apple")["foods"][0]["fdcId"] == 1
+    assert fresh_breaker.state == CLOSED
+    assert client.calls == 2
+
+
+def test_unexpected_error_in_probe_still_records_outcome(monkeypatch, fresh_breaker):
+    monkeypatch.setenv("USDA_API_KEY", "test-key")
+    fresh_breaker.open_seconds = 0.05
+    for _ in range(2):
+        fresh_breaker.record_failure()
+    time.sleep(0.06)
+
+    class ExplodingClient(CountingClient):
+        def get(self, url, params=None):
+            self.calls += 1
+            raise RuntimeError("unexpected")
+
+    monkeypatch.setattr(httpx, "Client", ExplodingClient(DummyResponse(200)))
+    with pytest.raises(RuntimeError):
+        UsdaService.search_foods("pear")
+    assert fresh_breaker.state == OPEN
+    assert fresh_breaker.stats()["times_opened"] == 2
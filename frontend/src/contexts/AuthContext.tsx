@@ -1,5 +1,12 @@
-import React, { createContext, useContext, useState, useEffect } from "react";
-import { authApi } from "../services/api";
+import React, { createContext, useContext, useState, useEffect, useRef } from "react";
+import { ApiError, authApi } from "../services/api";
+
+// Access tokens last 30 minutes; swap them early using the refresh token
+const REFRESH_INTERVAL_MS = 25 * 60 * 1000;
+// After a network error or 5xx, try again this soon instead of signing out
+const REFRESH_RETRY_MS = 30 * 1000;
+// How long another tab may take to store tokens it has just rotated
+const ROTATION_GRACE_MS = 1000;
 
 interface User {
   id: number;
@@ -23,6 +30,56 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({
   const [user, setUser] = useState<User | null>(null);
   const [token, setToken] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
+  const retryTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
+
+  const cancelRetry = () => {
+    if (retryTimer.current !== null) {
+      clearTimeout(retryTimer.current);
+      retryTimer.current = null;
+    }
+  };
+
+  const storeTokens = (accessToken: string, refreshToken?: string) => {
+    setToken(accessToken);
+    localStorage.setItem("token", accessToken);
+    if (refreshToken) {
+      localStorage.setItem("refreshToken", refreshToken);
+    }
+  };
+
+  const clearSession = () => {
+    cancelRetry();
+    setToken(null);
+    setUser(null);
+    localStorage.removeItem("token");
+    localStorage.removeItem("refreshToken");
+    localStorage.removeItem("user");
+  };
+
+  const refreshSession = async () => {
+    cancelRetry();
+    const refreshToken = localStorage.getItem("refreshToken");
+    if (!refreshToken) return;
+    try {
+      const response = await authApi.refresh(refreshToken);
+      storeTokens(response.access_token, response.refresh_token);
+    } catch (err) {
+      if (err instanceof ApiError && err.status === 401) {
+        // Another tab may have rotated the token first and our request lost the
+        // race. Give it a moment to store its tokens, then adopt them instead.
+        await new Promise((resolve) => setTimeout(resolve, ROTATION_GRACE_MS));
+        if (localStorage.getItem("refreshToken") !== refreshToken) {
+          const current = localStorage.getItem("token");
+          if (current) setToken(current);
+          return;
+        }
+        clearSession();
+        return;
+      }
+      // Offline, 5xx or 503 from load shedding: keep the session and try again
+      retryTimer.current = setTimeout(refreshSession, REFRESH_RETRY_MS);
+    }
+  };
 
   useEffect(() => {
     // Check for stored token on mount
@@ -31,16 +88,27 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({
     if (storedToken && storedUser) {
       setToken(storedToken);
       setUser(JSON.parse(storedUser));
+      // The stored access token may have expired while the app was closed
+      refreshSession().finally(() => setIsLoading(false));
+      return;
     }
     setIsLoading(false);
   }, []);
 
+  useEffect(() => {
+    if (!user) return;
+    const interval = setInterval(refreshSession, REFRESH_INTERVAL_MS);
+    return () => {
+      clearInterval(interval);
+      cancelRetry();
+    };
+  }, [user]);
+
   const login = async (username: string, password: string) => {
     const response = await authApi.login({ username, password });
     const userData = { id: 0, username }; // Basic user data, could fetch full profile later
-    setToken(response.access_token);
+    storeTokens(response.access_token, response.refresh_token);
     setUser(userData);
-    localStorage.setItem("token", response.access_token);
     localStorage.setItem("user", JSON.stringify(userData));
   };
 
@@ -53,10 +121,11 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({
   };
 
   const logout = () => {
-    setToken(null);
-    setUser(null);
-    localStorage.removeItem("token");
-    localStorage.removeItem("user");
+    const refreshToken = localStorage.getItem("refreshToken");
+    if (refreshToken) {
+      authApi.logout(refreshToken).catch(() => undefined);
+    }
+    clearSession();
   };
 
   return (
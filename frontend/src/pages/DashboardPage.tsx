@@ -50,10 +50,15 @@ const DashboardPage: React.FC = () => {
   };
 
   useEffect(() => {
-    // Health check: verify backend is reachable before loading nutrition data
+    // Readiness check: wait for the backend and its database (a cold Neon
+    // compute answers 503 for a few seconds) before loading nutrition data
     const checkBackendHealth = async () => {
       try {
-        const response = await fetch(`${getApiBaseUrl()}/health`);
+        let response = await fetch(`${getApiBaseUrl()}/health/ready`);
+        for (let attempt = 1; response.status === 503 && attempt < 5; attempt++) {
+          await new Promise((resolve) => setTimeout(resolve, 2000));
+          response = await fetch(`${getApiBaseUrl()}/health/ready`);
+        }
         if (!response.ok) {
           throw new Error("Backend returned error");
         }
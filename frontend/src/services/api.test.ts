@@ -1,7 +1,31 @@
-import { describe, it, expect } from 'vitest';
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import { ApiError, authApi } from './api';
 
 describe('API Service', () => {
   it('should pass basic test', () => {
     expect(true).toBe(true);
   });
 });
+
+describe('authApi.refresh', () => {
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
+
+  const stubFetch = (status: number) =>
+    vi.stubGlobal('fetch', vi.fn().mockResolvedValue(new Response('{}', { status })));
+
+  it('reports a rejected refresh token as a 401', async () => {
+    stubFetch(401);
+    const error = await authApi.refresh('old-token').catch((err) => err);
+    expect(error).toBeInstanceOf(ApiError);
+    expect(error.status).toBe(401);
+  });
+
+  it('keeps the status of transient failures', async () => {
+    stubFetch(503);
+    const error = await authApi.refresh('token').catch((err) => err);
+    expect(error).toBeInstanceOf(ApiError);
+    expect(error.status).toBe(503);
+  });
+});
@@ -47,6 +47,7 @@ interface RegisterData {
 interface TokenResponse {
   access_token: string;
   token_type: string;
+  refresh_token?: string;
 }
 
 interface UserResponse {
@@ -64,6 +65,17 @@ interface UserResponse {
   custom_fat_percent?: number;
 }
 
+// Carries the HTTP status so callers can tell a rejected request from a transient failure
+export class ApiError extends Error {
+  status: number;
+
+  constructor(message: string, status: number) {
+    super(message);
+    this.name = "ApiError";
+    this.status = status;
+  }
+}
+
 export const authApi = {
   register: async (data: RegisterData): Promise<UserResponse> => {
     const response = await fetch(`${API_BASE_URL}/auth/register`, {
@@ -90,6 +102,29 @@ export const authApi = {
     }
     return response.json();
   },
+
+  refresh: async (refreshToken: string): Promise<TokenResponse> => {
+    const response = await fetch(`${API_BASE_URL}/auth/refresh`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    });
+    if (!response.ok) {
+      throw new ApiError(
+        response.status === 401 ? "Session expired" : "Could not refresh session",
+        response.status
+      );
+    }
+    return response.json();
+  },
+
+  logout: async (refreshToken: string): Promise<void> => {
+    await fetch(`${API_BASE_URL}/auth/logout`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    });
+  },
 };
 
 export const api = {
@@ -113,15 +148,29 @@ export const api = {
   },
 
   post: async (url: string, data: any, token?: string) => {
-    const headers: HeadersInit = { "Content-Type": "application/json" };
+    // Retries reuse the key, so the backend replays the first response instead of writing twice
+    const headers: HeadersInit = {
+      "Content-Type": "application/json",
+      "Idempotency-Key": crypto.randomUUID(),
+    };
     if (token) {
       headers["Authorization"] = `Bearer ${token}`;
     }
-    const response = await fetch(`${API_BASE_URL}${url}`, {
-      method: "POST",
-      headers,
-      body: JSON.stringify(data),
-    });
+    const body = JSON.stringify(data);
+    const send = async (): Promise<Response> => {
+      for (let attempt = 0; ; attempt++) {
+        try {
+          const response = await fetch(`${API_BASE_URL}${url}`, { method: "POST", headers, body });
+          // 409: the first attempt is still being processed
+          if (response.status !== 409 || attempt >= 2) return response;
+        } catch (err) {
+          // Network error: the request may or may not have reached the server
+          if (attempt >= 2) throw err;
+        }
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+      }
+    };
+    const response = await send();
     if (!response.ok) {
       let detail = response.statusText || "Request failed";
       try {